@@ -21,6 +21,7 @@ depending on tag or format. They may also be entirely different objects
 for certain keys, again depending on format.
 """
 
+import threading
 import warnings
 
 import mutagen._util
@@ -29,6 +30,24 @@ version = (1, 20, -1)
 version_string = ".".join(map(str, version))
 
 
+_skipped_saves = 0
+_skipped_lock = threading.Lock()
+
+def skipped_saves():
+    """Return how many saves found the tags already in the file and
+    did nothing.
+
+    Tags remember what they loaded and saved; saving again without
+    changing them, with the default padding, doesn't touch the file.
+    """
+    return _skipped_saves
+
+def _skip_save():
+    global _skipped_saves
+    _skipped_lock.acquire()
+    try: _skipped_saves += 1
+    finally: _skipped_lock.release()
+
 class Metadata(object):
     """An abstract dict-like object.
 
@@ -61,11 +80,23 @@ class FileType(mutagen._util.DictMixin):
     FileTypes implement an interface very similar to Metadata; the
     dict interface, save, load, and delete calls on a FileType call
     the appropriate methods on its tag data.
+
+    load also takes a fileobj keyword argument, an already open file
+    to read filename's contents from instead of opening it again.
+    filename itself may be a file object or a bytes-like object; see
+    mutagen.File.
+
+    load also takes tags and info keyword arguments. If tags is false,
+    tags are not read and are None; such a file can't be saved, and
+    add_tags and delete raise ValueError. If info is false, stream
+    information is not read and info is None, except for FLAC, where
+    it is a metadata block that has to be read anyway.
     """
 
     info = None
     tags = None
     filename = None
+    _tags_skipped = False
     _mimes = ["application/octet-stream"]
 
     def __init__(self, filename=None, *args, **kwargs):
@@ -112,8 +143,19 @@ class FileType(mutagen._util.DictMixin):
         if self.tags is None: return []
         else: return list(self.tags.keys())
 
+    def values(self):
+        """Return a list of values in the metadata tag."""
+        if self.tags is None: return []
+        else: return self.tags.values()
+
+    def items(self):
+        """Return a list of (key, value) pairs in the metadata tag."""
+        if self.tags is None: return []
+        else: return self.tags.items()
+
     def delete(self, filename=None):
         """Remove tags from a file."""
+        self._check_tags()
         if self.tags is not None:
             if filename is None:
                 filename = self.filename
@@ -125,9 +167,10 @@ class FileType(mutagen._util.DictMixin):
 
     def save(self, filename=None, **kwargs):
         """Save metadata tags."""
+        self._check_tags()
         if filename is None:
             filename = self.filename
-        else:
+        elif not isinstance(filename, mutagen._util.Overlay):
             warnings.warn(
                 "save(filename=...) is deprecated, reload the file",
                 DeprecationWarning)
@@ -135,6 +178,52 @@ class FileType(mutagen._util.DictMixin):
             return self.tags.save(filename, **kwargs)
         else: raise ValueError("no tags in file")
 
+    def save_to(self, dest, **kwargs):
+        """Save a copy of the file with the current tags to dest.
+
+        dest is a filename or a file object open for writing, which
+        is written from its position. The loaded file is left as it
+        is. Its audio data is read only once, straight into dest,
+        by the kernel if both are files (see mutagen._util.copy_bytes).
+        The exception is an Ogg stream whose tags change their number
+        of pages: the later pages are also read to renumber them,
+        though only their headers are written. Other keyword
+        arguments are passed to save.
+        """
+        source = self.__open_source()
+        try: self.__save_overlay(source, kwargs).write_to(dest)
+        finally: source.close()
+
+    def plan_save(self, **kwargs):
+        """Return a SavePlan saying what save would do, without
+        changing the file.
+
+        Keyword arguments are passed to save. Like save, this may
+        change the loaded tags to the form they would be saved in.
+        """
+        source = self.__open_source()
+        try: return SavePlan(self.__save_overlay(source, kwargs))
+        finally: source.close()
+
+    def __open_source(self):
+        self._check_tags()
+        if self.filename is None:
+            raise ValueError("%r was not loaded from a filename" % self)
+        return open(self.filename, "rb")
+
+    def __save_overlay(self, source, kwargs):
+        overlay = mutagen._util.Overlay(source)
+        self.save(overlay, **kwargs)
+        return overlay
+
+    def save_async(self, *args, **kwargs):
+        """Return an awaitable that saves in an executor.
+
+        See mutagen.aio.save; this needs Python 3.7 or newer.
+        """
+        from mutagen.aio import save
+        return save(self, *args, **kwargs)
+
     def pprint(self):
         """Print stream information and comment key=value pairs."""
         stream = "%s (%s)" % (self.info.pprint(), self.mime[0])
@@ -144,8 +233,13 @@ class FileType(mutagen._util.DictMixin):
         else: return stream + ((tags and "\n" + tags) or "")
 
     def add_tags(self):
+        self._check_tags()
         raise NotImplementedError
 
+    def _check_tags(self):
+        if self._tags_skipped:
+            raise ValueError("%r was loaded with tags=False" % self)
+
     def __get_mime(self):
         mimes = []
         for Kind in type(self).__mro__:
@@ -156,62 +250,310 @@ class FileType(mutagen._util.DictMixin):
 
     mime = property(__get_mime)
 
-def File(filename, options=None, easy=False):
+class PaddingInfo(object):
+    """What a format knows when choosing how much padding to leave
+    after its tags, passed to PaddingPolicy.padding.
+
+    Attributes:
+    available -- bytes of padding there would be if the new tags were
+                 written in the space of the old ones; negative if
+                 they don't fit
+    size -- bytes of data after the tags, which have to be moved if
+            the space for the tags changes
+    default -- the padding the format itself gives tags that grow
+    """
+
+    def __init__(self, available, size, default):
+        self.available = available
+        self.size = size
+        self.default = default
+
+    def __repr__(self):
+        return "<%s available=%d size=%d default=%d>" % (
+            type(self).__name__, self.available, self.size, self.default)
+
+    def choose(self, policy=None, in_place_only=False):
+        """Return the padding policy asks for, as a count of bytes.
+
+        If policy is None, KeepPadding is used. If in_place_only is
+        true, the policy is not asked: the padding is what is available,
+        and MoveRequiredError is raised if the tags don't fit.
+        """
+        if in_place_only:
+            if self.available < 0: raise MoveRequiredError(-self.available)
+            return self.available
+        if policy is None: policy = KeepPadding()
+        return max(0, int(policy.padding(self)))
+
+class MoveRequiredError(ValueError):
+    """Raised by save(in_place_only=True) when the tags can't be saved
+    without moving the data after them. Nothing has been written.
+
+    Attributes:
+    needed -- how many more bytes of space the tags would need; 0 if
+              no amount of padding would do, as for APEv2 tags at the
+              start of a file
+    """
+
+    def __init__(self, needed):
+        super(MoveRequiredError, self).__init__(
+            "saving in place needs %d more bytes of space" % needed)
+        self.needed = needed
+
+class PaddingPolicy(object):
+    """Decides how much padding saves leave after tags.
+
+    Pass one to save as its padding keyword argument. ID3, FLAC, MP4,
+    ASF, and Ogg Vorbis, Speex and Theora honour it; APEv2 tags are
+    at the end of the file and Ogg FLAC comments can't be padded, so
+    those accept and ignore it. Formats may round the padding up to
+    what their containers need, or to whole filesystem blocks when
+    space has to be inserted anyway (see mutagen._util.insert_size).
+
+    All of these saves also take in_place_only. If it is true, the
+    tags are written over the old ones and the padding fills the rest
+    of their space, whatever the policy; if they don't fit, save
+    raises MoveRequiredError before changing the file.
+    """
+
+    def padding(self, info):
+        """Return the bytes of padding to leave, given a PaddingInfo."""
+        raise NotImplementedError
+
+class KeepPadding(PaddingPolicy):
+    """Keep the existing space if the tags fit, so nothing is moved.
+
+    Otherwise leave grow bytes of padding, or the format's default
+    if grow is None. This is what save does without a policy.
+    """
+
+    def __init__(self, grow=None):
+        self.grow = grow
+
+    def padding(self, info):
+        if info.available >= 0: return info.available
+        elif self.grow is None: return info.default
+        else: return self.grow
+
+class ProportionalPadding(PaddingPolicy):
+    """Padding in proportion to the data after the tags.
+
+    The existing space is kept if the tags fit and it leaves at most
+    maximum bytes of padding. Otherwise the padding becomes ratio
+    times the size of the data after the tags, but at least minimum
+    and at most maximum bytes. Big files, where moving the audio is
+    expensive, get more room to grow.
+    """
+
+    def __init__(self, ratio=0.001, minimum=1024, maximum=2**20):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def padding(self, info):
+        if 0 <= info.available <= self.maximum: return info.available
+        return max(self.minimum, min(self.maximum, int(info.size * self.ratio)))
+
+class FixedPadding(PaddingPolicy):
+    """Always leave exactly size bytes of padding.
+
+    With the default of 0, files are as small as they can be, but
+    almost every change to the tags moves the data after them.
+    """
+
+    def __init__(self, size=0):
+        self.size = size
+
+    def padding(self, info):
+        return self.size
+
+class SavePlan(object):
+    """What saving a file would do, from FileType.plan_save.
+
+    Attributes:
+    size -- the size of the file now
+    new_size -- its size after saving
+    written -- bytes of tags and headers that would be written
+    moved -- bytes after the tags (mostly audio data) that would be
+             moved to make room or close a gap; 0 if the tags fit
+    padding -- bytes of padding left after saving, or None for
+               formats that don't pad their tags
+    io -- expected bytes of I/O: moved bytes are read and written
+    """
+
+    def __init__(self, overlay):
+        self.size = overlay.source_size
+        self.new_size = overlay.size()
+        self.written = overlay.written
+        self.moved = overlay.moved
+        self.padding = overlay.padding
+        self.io = self.written + 2 * self.moved
+
+    in_place = property(lambda s: not s.moved,
+                        doc="True if no data has to be moved")
+
+    def __repr__(self):
+        return "<%s size=%d new_size=%d written=%d moved=%d padding=%r>" % (
+            type(self).__name__, self.size, self.new_size, self.written,
+            self.moved, self.padding)
+
+# What File needs to know about each format without importing it:
+# the classes to use, and what makes their score methods positive - a
+# header starting with one of the prefixes and containing one of the
+# header strings (where given), a footer (the last 160 bytes)
+# containing some bytes, or a filename extension. Checking a footer
+# takes another read, so formats found by one also give the best
+# score they can get; the footer is only read if that could win.
+def _format(kind, easy=None, prefix=(), header=(), footer=(), ext=(),
+            best=None):
+    return (kind, easy or kind, prefix, header, footer, ext, best)
+
+_formats = [
+    _format("mp3.MP3", "mp3.EasyMP3", prefix=[b"ID3"],
+            ext=[".mp3", ".mp2", ".mpg", ".mpeg"]),
+    _format("trueaudio.TrueAudio", "trueaudio.EasyTrueAudio",
+            prefix=[b"ID3", b"TTA"], ext=[".tta"]),
+    _format("oggtheora.OggTheora", prefix=[b"OggS"],
+            header=[b"\x80theora", b"\x81theora"]),
+    _format("oggspeex.OggSpeex", prefix=[b"OggS"], header=[b"Speex   "]),
+    _format("oggvorbis.OggVorbis", prefix=[b"OggS"], header=[b"\x01vorbis"]),
+    _format("oggflac.OggFLAC", prefix=[b"OggS"], header=[b"FLAC", b"fLaC"]),
+    _format("flac.FLAC", prefix=[b"fLaC"], ext=[".flac"]),
+    _format("apev2.APEv2File", footer=[b"APETAGEX"], best=1),
+    _format("mp4.MP4", "easymp4.EasyMP4", header=[b"ftyp", b"mp4"]),
+    _format("id3.ID3FileType", "easyid3.EasyID3FileType", prefix=[b"ID3"]),
+    _format("wavpack.WavPack", prefix=[b"wvpk"]),
+    _format("musepack.Musepack", prefix=[b"MP+"], ext=[".mpc"]),
+    _format("monkeysaudio.MonkeysAudio", prefix=[b"MAC "], ext=[".ape"]),
+    _format("optimfrog.OptimFROG", prefix=[b"OFR"], ext=[".ofr", ".ofs"]),
+    _format("asf.ASF", prefix=[b"\x30\x26\xB2\x75\x8E\x66\xCF\x11"
+                               b"\xA6\xD9\x00\xAA\x00\x62\xCE\x6C"]),
+    ]
+
+def _index(formats):
+    """Index formats by the first three bytes of their prefixes (none
+    are shorter) and by extension. Formats found only by header
+    contents or by footers are listed separately."""
+    by_prefix, by_ext, by_header, by_footer = {}, {}, [], []
+    for fmt in formats:
+        kind, easy, prefix, header, footer, ext, best = fmt
+        for magic in prefix:
+            by_prefix.setdefault(magic[:3], []).append(fmt)
+        for extension in ext:
+            by_ext.setdefault(extension, []).append(fmt)
+        if header and not prefix: by_header.append(fmt)
+        if footer: by_footer.append(fmt)
+    return by_prefix, by_ext, by_header, by_footer
+_by_prefix, _by_ext, _by_header, _by_footer = _index(_formats)
+
+def _kind(fmt, easy):
+    """Import and return a format's class."""
+    module, name = fmt[easy and 1 or 0].split(".")
+    module = __import__("mutagen." + module, fromlist=[name])
+    return getattr(module, name)
+
+_takes_fileobj = {}
+
+def _loads_fileobj(Kind):
+    """Return whether Kind's load takes a fileobj argument; FileTypes
+    from elsewhere may only take a filename."""
+    try: return _takes_fileobj[Kind]
+    except KeyError: pass
+    load = getattr(Kind, "load", Kind)
+    try: from inspect import signature
+    except ImportError:
+        from inspect import getargspec
+        spec = getargspec(load)
+        takes = "fileobj" in spec.args or spec.keywords is not None
+    else:
+        params = signature(load).parameters
+        takes = "fileobj" in params or [
+            p for p in params.values() if p.kind == p.VAR_KEYWORD] != []
+    _takes_fileobj[Kind] = takes
+    return takes
+
+def _best(options, filename, fileobj, header):
+    """Score every Kind in options; return ((score, name), Kind) for
+    the best one."""
+    # Sort by name after score. Otherwise import order affects
+    # Kind sort order, which affects treatment of things with
+    # equals scores.
+    results = [(Kind.score(filename, fileobj, header), Kind.__name__)
+               for Kind in options]
+    return max(zip(results, options))
+
+def _dispatch(filename, fileobj, header, easy):
+    """Like _best for the default formats, but only score the ones
+    the index finds. Returns None if none of them could match."""
+    found = [fmt for fmt in _by_prefix.get(header[:3], ())
+             if [m for m in fmt[2] if header.startswith(m)] and
+             (not fmt[3] or [m for m in fmt[3] if m in header])]
+    dot = filename.rfind(".")
+    if dot >= 0: found.extend(_by_ext.get(filename[dot:].lower(), ()))
+    found.extend([fmt for fmt in _by_header
+                  if [m for m in fmt[3] if m in header]])
+    unique = []
+    for fmt in found:
+        if fmt not in unique: unique.append(fmt)
+    result = None
+    if unique:
+        kinds = [_kind(fmt, easy) for fmt in unique]
+        result = _best(kinds, filename, fileobj, header)
+
+    footer = None
+    for fmt in _by_footer:
+        if fmt in found: continue
+        name = fmt[easy and 1 or 0].split(".")[1]
+        if (result is not None and fmt[6] is not None and
+            result[0] > (fmt[6], name)): continue
+        if footer is None:
+            try: fileobj.seek(-160, 2)
+            except IOError: fileobj.seek(0)
+            footer = fileobj.read()
+        if [m for m in fmt[4] if m in footer]:
+            other = _best([_kind(fmt, easy)], filename, fileobj, header)
+            if result is None or other > result: result = other
+    return result
+
+def File(filename, options=None, easy=False, tags=True, info=True):
     """Guess the type of the file and try to open it.
 
     The file type is decided by several things, such as the first 128
     bytes (which usually contains a file type identifier), the
     filename extension, and the presence of existing tags.
 
+    Instead of a filename, a seekable file object or a bytes-like
+    object (bytes, bytearray, memoryview, mmap) with the file's
+    contents may be given. Such files can be read but not saved
+    unless a filename is passed to save. Formats that are only
+    recognized by their extension, like MP3s without an ID3 tag,
+    are not found without a filename.
+
+    If tags or info is false, the file's tags or stream information
+    are not read (see FileType).
+
     If no appropriate type could be found, None is returned.
     """
 
-    if options is None:
-        from mutagen.asf import ASF
-        from mutagen.apev2 import APEv2File
-        from mutagen.flac import FLAC
-        if easy:
-            from mutagen.easyid3 import EasyID3FileType as ID3FileType
-        else:
-            from mutagen.id3 import ID3FileType
-        if easy:
-            from mutagen.mp3 import EasyMP3 as MP3
-        else:
-            from mutagen.mp3 import MP3
-        from mutagen.oggflac import OggFLAC
-        from mutagen.oggspeex import OggSpeex
-        from mutagen.oggtheora import OggTheora
-        from mutagen.oggvorbis import OggVorbis
-        if easy:
-            from mutagen.trueaudio import EasyTrueAudio as TrueAudio
-        else:
-            from mutagen.trueaudio import TrueAudio
-        from mutagen.wavpack import WavPack
-        if easy:
-            from mutagen.easymp4 import EasyMP4 as MP4
-        else:
-            from mutagen.mp4 import MP4
-        from mutagen.musepack import Musepack
-        from mutagen.monkeysaudio import MonkeysAudio
-        from mutagen.optimfrog import OptimFROG
-        options = [MP3, TrueAudio, OggTheora, OggSpeex, OggVorbis, OggFLAC,
-                   FLAC, APEv2File, MP4, ID3FileType, WavPack, Musepack,
-                   MonkeysAudio, OptimFROG, ASF]
-
-    if not options:
+    if options is not None and not options:
         return None
 
-    fileobj = open(filename, "rb")
+    fileobj, opened = mutagen._util.open_fileobj(filename)
     try:
         header = fileobj.read(128)
-        # Sort by name after score. Otherwise import order affects
-        # Kind sort order, which affects treatment of things with
-        # equals scores.
-        results = [(Kind.score(filename, fileobj, header), Kind.__name__)
-                   for Kind in options]
+        name = mutagen._util.source_name(filename) or ""
+        if options is None:
+            result = _dispatch(name, fileobj, header, easy)
+            if result is None: return None
+        else: result = _best(options, name, fileobj, header)
+        (score, name), Kind = result
+        if score <= 0: return None
+        # Only pass the switches on when used, for FileTypes given
+        # in options that don't know about them.
+        kwargs = {}
+        if not tags: kwargs["tags"] = False
+        if not info: kwargs["info"] = False
+        if _loads_fileobj(Kind): kwargs["fileobj"] = fileobj
+        return Kind(filename, **kwargs)
     finally:
-        fileobj.close()
-    results = sorted(zip(results, options))
-    (score, name), Kind = results[-1]
-    if score > 0: return Kind(filename)
-    else: return None
+        if opened: fileobj.close()
@@ -12,8 +12,12 @@ You should not rely on the interfaces here being stable. They are
 intended for internal use in Mutagen only.
 """
 
+import os
 import sys
 import struct
+import time
+from bisect import bisect_right
+from hashlib import sha1
 from functools import total_ordering, wraps
 from zlib import decompress
 
@@ -55,13 +59,13 @@ class DictMixin(object):
     UserDict.DictMixin is not suitable for this purpose because it's
     an old-style class.
 
-    This class is not optimized for very large dictionaries; many
-    functions have linear memory requirements. I recommend you
-    override some of these functions if speed is required.
+    Nothing here copies the list keys() returns; the iter* methods
+    look values up as they go. Subclasses that have their own storage
+    can override __iter__, __len__ and __contains__ to use it directly.
     """
 
     def __iter__(self):
-        return iter(list(self.keys()))
+        return iter(self.keys())
 
     def has_key(self, key):
         try: self[key]
@@ -69,18 +73,22 @@ class DictMixin(object):
         else: return True
     __contains__ = has_key
 
-    iterkeys = lambda self: iter(list(self.keys()))
+    iterkeys = lambda self: iter(self)
 
     def values(self):
-        return list(map(self.__getitem__, list(self.keys())))
-    itervalues = lambda self: iter(list(self.values()))
+        return [self[key] for key in self.keys()]
+
+    def itervalues(self):
+        for key in self.keys(): yield self[key]
 
     def items(self):
-        return list(zip(list(self.keys()), list(self.values())))
-    iteritems = lambda s: iter(list(s.items()))
+        return [(key, self[key]) for key in self.keys()]
+
+    def iteritems(self):
+        for key in self.keys(): yield (key, self[key])
 
     def clear(self):
-        list(map(self.__delitem__, list(self.keys())))
+        for key in list(self.keys()): del(self[key])
 
     def pop(self, key, *args):
         if len(args) > 1:
@@ -93,20 +101,21 @@ class DictMixin(object):
         return value
 
     def popitem(self):
-        try:
-            key = list(self.keys())[0]
+        for key in self:
             return key, self.pop(key)
-        except IndexError: raise KeyError("dictionary is empty")
+        raise KeyError("dictionary is empty")
 
     def update(self, other=None, **kwargs):
         if other is None:
             self.update(kwargs)
             other = {}
 
-        try: list(map(self.__setitem__, list(other.keys()), list(other.values())))
+        try: keys = other.keys
         except AttributeError:
             for key, value in other:
                 self[key] = value
+        else:
+            for key in keys(): self[key] = other[key]
 
     def setdefault(self, key, default=None):
         try: return self[key]
@@ -119,18 +128,18 @@ class DictMixin(object):
         except KeyError: return default
 
     def __repr__(self):
-        return repr(dict(list(self.items())))
+        return repr(dict(self.items()))
 
     def __eq__(self, other):
-        return {k:v for k,v in self.items()} == other
+        return dict(self.items()) == other
 
     def __lt__(self, other):
-        return {k:v for k,v in self.items()} < other
+        return dict(self.items()) < other
 
     __hash__ = object.__hash__
 
     def __len__(self):
-        return len(list(self.keys()))
+        return len(self.keys())
 
 class DictProxy(DictMixin):
     def __init__(self, *args, **kwargs):
@@ -149,6 +158,21 @@ class DictProxy(DictMixin):
     def keys(self):
         return list(self.__dict.keys())
 
+    def __iter__(self):
+        return iter(self.__dict)
+
+    def __len__(self):
+        return len(self.__dict)
+
+    def __contains__(self, key):
+        return key in self.__dict
+
+    def values(self):
+        return list(self.__dict.values())
+
+    def items(self):
+        return list(self.__dict.items())
+
 def struct_unpack(fmt, buf):
     return struct.unpack(fmt.encode(), buf)
 
@@ -238,19 +262,144 @@ def unlock(fileobj):
     import fcntl
     fcntl.lockf(fileobj, fcntl.LOCK_UN)
 
+# From linux/falloc.h.
+_FALLOC_FL_COLLAPSE_RANGE = 0x08
+_FALLOC_FL_INSERT_RANGE = 0x20
+
+_fallocate = None
+
+def _get_fallocate():
+    """Return libc's fallocate, or False if there isn't one."""
+    global _fallocate
+    if _fallocate is None:
+        _fallocate = False
+        if sys.platform.startswith("linux"):
+            try:
+                import ctypes
+                libc = ctypes.CDLL(None, use_errno=True)
+            except (ImportError, OSError): return _fallocate
+            # fallocate's offsets are off_t, which is only 64 bits wide
+            # everywhere with fallocate64 or on 64 bit systems.
+            func = getattr(libc, "fallocate64", None)
+            if func is None and ctypes.sizeof(ctypes.c_long) == 8:
+                func = getattr(libc, "fallocate", None)
+            if func is not None:
+                func.argtypes = [ctypes.c_int, ctypes.c_int,
+                                 ctypes.c_int64, ctypes.c_int64]
+                func.restype = ctypes.c_int
+                _fallocate = func
+    return _fallocate
+
+def _block_size(fobj):
+    """Return the block size fallocate works in for fobj, or None if
+    it can't be used on it."""
+    if not _get_fallocate(): return None
+    # An Overlay stands in for its source; see FileType.plan_save.
+    if isinstance(fobj, Overlay): fobj = fobj.source
+    try: return os.fstat(fobj.fileno()).st_blksize or None
+    except (AttributeError, ValueError, EnvironmentError): return None
+
+def insert_size(fobj, size, offset, MOVE_SIZE=2**20):
+    """Return the smallest size of at least size that insert_bytes can
+    insert at offset in fobj without moving the data after it through
+    memory.
+
+    Formats that pad their tags can grow by this much instead. If
+    less than MOVE_SIZE bytes would be moved, size is returned as is;
+    that's quick enough anyway.
+    """
+    fobj.seek(0, 2)
+    if fobj.tell() - offset < MOVE_SIZE: return size
+    block = _block_size(fobj)
+    if block is None: return size
+    return (size + block - 1) // block * block
+
+def _fallocate_range(fobj, mode, size, offset):
+    """Insert or collapse size bytes at offset with fallocate, and
+    return whether it could be done.
+
+    fallocate only works on whole blocks, so the range is moved back
+    to the start of offset's block, and the bytes between there and
+    offset are written back afterwards.
+    """
+    block = _block_size(fobj)
+    if block is None or size % block: return False
+    start = offset - offset % block
+    fobj.seek(start)
+    head = fobj.read(offset - start)
+    fobj.flush()
+    if _get_fallocate()(fobj.fileno(), mode, start, size) != 0:
+        return False
+    # Drop anything buffered from before the change.
+    fobj.seek(0, 2)
+    if head:
+        fobj.seek(start)
+        fobj.write(head)
+        fobj.flush()
+    return True
+
+def _copy_range(fobj, size, src, dst):
+    """Copy size bytes from src to dst in fobj with copy_file_range,
+    in pieces that don't overlap; return False if the first piece
+    can't be copied that way.
+
+    When moving data forward, pieces are copied from the end.
+    """
+    copy = getattr(os, "copy_file_range", None)
+    if copy is None: return False
+    fd = fobj.fileno()
+    piece = min(abs(dst - src), 2**30)
+    done, first = 0, True
+    while done < size:
+        count = min(piece, size - done)
+        if dst > src: offset = size - done - count
+        else: offset = done
+        moved = 0
+        while moved < count:
+            try:
+                n = copy(fd, fd, count - moved,
+                         src + offset + moved, dst + offset + moved)
+            except OSError:
+                if first: return False
+                raise
+            first = False
+            if not n: raise IOError("unexpected end of file")
+            moved += n
+        done += count
+    return True
+
 def insert_bytes(fobj, size, offset, BUFFER_SIZE=2**16):
     """Insert size bytes of empty space starting at offset.
 
-    fobj must be an open file object, open rb+ or
-    equivalent. Mutagen tries to use mmap to resize the file, but
-    falls back to a significantly slower method if mmap fails.
+    fobj must be an open file object, open rb+ or equivalent.
+
+    On Linux, if size is a multiple of the filesystem block size
+    (see insert_size), the space is inserted with fallocate and the
+    data after it isn't moved at all; for other large sizes, the
+    kernel moves it with copy_file_range. Otherwise Mutagen tries to
+    use mmap to move it, but falls back to a significantly slower
+    method if mmap fails.
     """
     assert 0 < size
+    if isinstance(fobj, Overlay):
+        return fobj.insert(size, offset)
     assert 0 <= offset
     locked = False
     fobj.seek(0, 2)
     filesize = fobj.tell()
     movesize = filesize - offset
+    fobj.flush()
+    if movesize > 0:
+        if _fallocate_range(fobj, _FALLOC_FL_INSERT_RANGE, size, offset):
+            return
+        if size >= BUFFER_SIZE:
+            fobj.truncate(filesize + size)
+            fobj.flush()
+            if _copy_range(fobj, movesize, offset, offset + size):
+                fobj.seek(0, 2)
+                return
+            fobj.truncate(filesize)
+        fobj.seek(0, 2)
     fobj.write(b'\x00' * size)
     fobj.flush()
     try:
@@ -301,13 +450,14 @@ def insert_bytes(fobj, size, offset, BUFFER_SIZE=2**16):
 def delete_bytes(fobj, size, offset, BUFFER_SIZE=2**16):
     """Delete size bytes of empty space starting at offset.
 
-    fobj must be an open file object, open rb+ or
-    equivalent. Mutagen tries to use mmap to resize the file, but
-    falls back to a significantly slower method if mmap fails.
+    fobj must be an open file object, open rb+ or equivalent. The
+    data after the space is moved like in insert_bytes.
     """
     locked = False
     assert 0 < size
     assert 0 <= offset
+    if isinstance(fobj, Overlay):
+        return fobj.delete(size, offset)
     fobj.seek(0, 2)
     filesize = fobj.tell()
     movesize = filesize - offset - size
@@ -315,6 +465,14 @@ def delete_bytes(fobj, size, offset, BUFFER_SIZE=2**16):
     try:
         if movesize > 0:
             fobj.flush()
+            if _fallocate_range(
+                fobj, _FALLOC_FL_COLLAPSE_RANGE, size, offset):
+                return
+            if (size >= BUFFER_SIZE and
+                _copy_range(fobj, movesize, offset + size, offset)):
+                fobj.seek(0, 2)
+                movesize = 0
+        if movesize > 0:
             try:
                 import mmap
                 memmap = mmap.mmap(fobj.fileno(), filesize)
@@ -337,6 +495,52 @@ def delete_bytes(fobj, size, offset, BUFFER_SIZE=2**16):
         if locked:
             unlock(fobj)
 
+def copy_bytes(src, offset, size, dst, BUFFER_SIZE=2**16):
+    """Copy size bytes starting at offset in src to dst.
+
+    They are written at dst's position, which is moved past them. If
+    both are files, the kernel copies the data with copy_file_range
+    or sendfile where it can; otherwise it is read and written in
+    BUFFER_SIZE pieces. src's position is undefined afterwards.
+    """
+    done = 0
+    try:
+        sfd, dfd = src.fileno(), dst.fileno()
+        dst.flush()
+        pos = dst.tell()
+    except (AttributeError, ValueError, EnvironmentError): pass
+    else:
+        for copy in [_kernel_copy, _kernel_send]:
+            try: done = copy(sfd, dfd, offset, size, pos)
+            except (AttributeError, EnvironmentError): continue
+            break
+        dst.seek(pos + done)
+    src.seek(offset + done)
+    while done < size:
+        data = src.read(min(BUFFER_SIZE, size - done))
+        if not data: raise IOError("unexpected end of file")
+        dst.write(data)
+        done += len(data)
+
+def _kernel_copy(sfd, dfd, offset, size, pos):
+    done = 0
+    while done < size:
+        count = os.copy_file_range(
+            sfd, dfd, size - done, offset + done, pos + done)
+        if not count: raise IOError("unexpected end of file")
+        done += count
+    return done
+
+def _kernel_send(sfd, dfd, offset, size, pos):
+    # sendfile writes at dfd's position.
+    os.lseek(dfd, pos, 0)
+    done = 0
+    while done < size:
+        count = os.sendfile(dfd, sfd, offset + done, size - done)
+        if not count: raise IOError("unexpected end of file")
+        done += count
+    return done
+
 def utf8(data):
     """Convert a basestring to a valid UTF-8 str."""
     if isinstance(data, byte_types):
@@ -345,6 +549,436 @@ def utf8(data):
         return bytearray(data.encode("utf-8"))
     else: raise TypeError("only unicode/str types can be converted to UTF-8")
 
+class BytesFile(object):
+    """A read-only file object over a bytes-like object.
+
+    The data (bytes, bytearray, memoryview, mmap, ...) is not copied;
+    read returns copies of the requested ranges only. Like real files,
+    seeking before the start raises IOError.
+    """
+
+    def __init__(self, data):
+        self.__data = memoryview(data)
+        if self.__data.itemsize != 1: self.__data = self.__data.cast("B")
+        self.__pos = 0
+
+    def read(self, size=-1):
+        pos = self.__pos
+        if size is None or size < 0: end = len(self.__data)
+        else: end = min(pos + size, len(self.__data))
+        if end <= pos: return b""
+        self.__pos = end
+        return self.__data[pos:end].tobytes()
+
+    def seek(self, offset, whence=0):
+        if whence == 1: offset += self.__pos
+        elif whence == 2: offset += len(self.__data)
+        if offset < 0:
+            from errno import EINVAL
+            raise IOError(EINVAL, "Invalid argument")
+        self.__pos = offset
+
+    def tell(self):
+        return self.__pos
+
+    def close(self):
+        self.__data.release()
+
+class BufferedReader(object):
+    """A read-only file object that reads another one in aligned chunks.
+
+    Small reads are answered from the last few chunks read, and
+    seeking only moves a position, so parsers can read a few bytes at
+    a time, or go back and forth between a header and a footer,
+    without a read or seek call on the underlying file each time.
+    Reads of a chunk or more go to the underlying file directly, but
+    are kept in the same way.
+
+    The underlying file must not be moved by anything else while it
+    is read through this; close closes it.
+    """
+
+    CHUNK = 8192
+    SLOTS = 3
+
+    def __init__(self, fileobj, chunk=None):
+        self.fileobj = fileobj
+        self.__chunk = chunk or self.CHUNK
+        # (offset, data) pairs, most recently used first
+        self.__bufs = [(0, b"")]
+        self.__pos = self.__raw = fileobj.tell()
+        self.__size = None
+        name = getattr(fileobj, "name", None)
+        if name is not None: self.name = name
+
+    def read(self, size=-1):
+        if size is None: size = -1
+        pos = self.__pos
+        start, buf = self.__bufs[0]
+        offset = pos - start
+        if 0 <= offset and 0 <= size and offset + size <= len(buf):
+            self.__pos = pos + size
+            return buf[offset:offset + size]
+        data = self.__read(pos, size)
+        self.__pos = pos + len(data)
+        return data
+
+    def __read(self, pos, size):
+        # Take what the buffers have, then read the rest.
+        head = b""
+        found = True
+        while found:
+            found = False
+            for i, (start, buf) in enumerate(self.__bufs):
+                if start <= pos < start + len(buf):
+                    self.__bufs.insert(0, self.__bufs.pop(i))
+                    head += buf[pos - start:]
+                    if 0 <= size <= len(head): return head[:size]
+                    pos = start + len(buf)
+                    found = True
+                    break
+        if self.__size is not None and pos >= self.__size: return head
+
+        chunk = self.__chunk
+        if size < 0: return head + self.__fetch(pos, -1)
+        want = size - len(head)
+        if want >= chunk: return head + self.__fetch(pos, want)
+        start = pos - pos % chunk
+        data = self.__fetch(
+            start, (pos + want - start + chunk - 1) // chunk * chunk)
+        return head + data[pos - start:pos - start + want]
+
+    def __fetch(self, offset, size):
+        if offset != self.__raw: self.fileobj.seek(offset)
+        if size < 0: data = self.fileobj.read()
+        else: data = self.fileobj.read(size)
+        self.__raw = offset + len(data)
+        if size < 0 or len(data) < size: self.__size = self.__raw
+        self.__bufs.insert(0, (offset, data))
+        del(self.__bufs[self.SLOTS:])
+        return data
+
+    def seek(self, offset, whence=0):
+        if whence == 1: offset += self.__pos
+        elif whence == 2:
+            if self.__size is None:
+                self.fileobj.seek(0, 2)
+                self.__size = self.__raw = self.fileobj.tell()
+            offset += self.__size
+        if offset < 0:
+            from errno import EINVAL
+            raise IOError(EINVAL, "Invalid argument")
+        self.__pos = offset
+
+    def tell(self):
+        return self.__pos
+
+    def close(self):
+        self.fileobj.close()
+
+class Overlay(object):
+    """A file object that records changes to another file instead of
+    making them.
+
+    Reads, writes, truncate, and insert_bytes and delete_bytes on it
+    behave as on a copy of the source file, which is only read from.
+    write_to writes that copy out: the changed bytes, and the
+    unchanged ranges copied from the source with copy_bytes. The
+    source must not change while the overlay is in use.
+
+    It also counts what the changes would cost on the real file:
+    written is the number of bytes written, and moved the number
+    of bytes insert_bytes and delete_bytes would have to move.
+    Formats that pad their tags set padding to the number of bytes
+    of padding they left (see report_padding). source is the source
+    file object, and source_size its size.
+    """
+
+    written = 0
+    moved = 0
+    padding = None
+
+    def __init__(self, source):
+        self.source = source
+        self.__reader = BufferedReader(source)
+        self.__reader.seek(0, 2)
+        self.__size = self.__reader.tell()
+        self.source_size = self.__size
+        self.__pos = 0
+        # Extents covering the file in order. Each piece is the
+        # offset of an unchanged range in the source, the bytes
+        # written there, or None for inserted space.
+        self.__starts, self.__lengths, self.__pieces = [], [], []
+        if self.__size:
+            self.__starts, self.__lengths, self.__pieces = (
+                [0], [self.__size], [0])
+
+    def __splice(self, i, j, extents):
+        """Replace extents i to j with (length, piece) pairs covering
+        the same range."""
+        if i < len(self.__starts): start = self.__starts[i]
+        else: start = self.__size
+        starts = []
+        for (length, piece) in extents:
+            starts.append(start)
+            start += length
+        self.__starts[i:j] = starts
+        self.__lengths[i:j] = [length for (length, piece) in extents]
+        self.__pieces[i:j] = [piece for (length, piece) in extents]
+
+    def __shift(self, i, delta):
+        self.__starts[i:] = [start + delta for start in self.__starts[i:]]
+
+    def __split(self, pos):
+        """Return the index of the extent starting at pos, splitting
+        the one containing it if needed."""
+        if pos >= self.__size: return len(self.__starts)
+        i = bisect_right(self.__starts, pos) - 1
+        start, length, piece = (
+            self.__starts[i], self.__lengths[i], self.__pieces[i])
+        if start == pos: return i
+        head = pos - start
+        if piece is None: pieces = [None, None]
+        elif isinstance(piece, bytes): pieces = [piece[:head], piece[head:]]
+        else: pieces = [piece, piece + head]
+        self.__starts[i:i + 1] = [start, pos]
+        self.__lengths[i:i + 1] = [head, length - head]
+        self.__pieces[i:i + 1] = pieces
+        return i + 1
+
+    def read(self, size=-1):
+        end = self.__size
+        if size is not None and size >= 0:
+            end = min(end, self.__pos + size)
+        pos = self.__pos
+        data = []
+        i = bisect_right(self.__starts, pos) - 1
+        while pos < end:
+            start, length, piece = (
+                self.__starts[i], self.__lengths[i], self.__pieces[i])
+            head = pos - start
+            count = min(length - head, end - pos)
+            if piece is None: data.append(b"\x00" * count)
+            elif isinstance(piece, bytes):
+                data.append(piece[head:head + count])
+            else:
+                self.__reader.seek(piece + head)
+                data.append(self.__reader.read(count))
+            pos += count
+            i += 1
+        self.__pos = max(pos, self.__pos)
+        return b"".join(data)
+
+    def write(self, data):
+        data = bytes(data)
+        if not data: return
+        if self.__pos > self.__size: self.truncate(self.__pos)
+        end = self.__pos + len(data)
+        i = self.__split(self.__pos)
+        j = self.__split(end)
+        self.__splice(i, j, [(len(data), data)])
+        self.__size = max(self.__size, end)
+        self.__pos = end
+        self.written += len(data)
+
+    def insert(self, size, offset):
+        """Insert size bytes of empty space at offset."""
+        self.moved += max(0, self.__size - offset)
+        i = self.__split(offset)
+        self.__splice(i, i, [(size, None)])
+        self.__shift(i + 1, size)
+        self.__size += size
+
+    def delete(self, size, offset):
+        """Delete size bytes starting at offset."""
+        self.moved += max(0, self.__size - offset - size)
+        i = self.__split(offset)
+        j = self.__split(offset + size)
+        self.__splice(i, j, [])
+        self.__shift(i, -size)
+        self.__size -= size
+
+    def truncate(self, size=None):
+        if size is None: size = self.__pos
+        if size < self.__size:
+            i = self.__split(size)
+            self.__splice(i, len(self.__starts), [])
+        elif size > self.__size:
+            end = len(self.__starts)
+            self.__splice(end, end, [(size - self.__size, None)])
+        self.__size = size
+
+    def seek(self, offset, whence=0):
+        if whence == 1: offset += self.__pos
+        elif whence == 2: offset += self.__size
+        if offset < 0:
+            from errno import EINVAL
+            raise IOError(EINVAL, "Invalid argument")
+        self.__pos = offset
+
+    def tell(self):
+        return self.__pos
+
+    def size(self):
+        """Return the size of the changed file."""
+        return self.__size
+
+    def flush(self):
+        pass
+
+    def write_to(self, dest):
+        """Write the changed file to dest, a filename or a file object
+        open for writing.
+
+        A file object is written from its position. Writing over the
+        source file raises ValueError.
+        """
+        try: source = os.fstat(self.source.fileno())
+        except (AttributeError, ValueError, EnvironmentError): source = None
+        try:
+            if isinstance(dest, string_types): target = os.stat(dest)
+            else: target = os.fstat(dest.fileno())
+        except (AttributeError, ValueError, EnvironmentError): target = None
+        if (source is not None and target is not None and
+            (source.st_dev, source.st_ino) == (target.st_dev, target.st_ino)):
+            raise ValueError("can't write a file over itself")
+
+        if isinstance(dest, string_types): fileobj = open(dest, "wb")
+        else: fileobj = dest
+        try:
+            for (length, piece) in zip(self.__lengths, self.__pieces):
+                if piece is None:
+                    while length:
+                        count = min(length, 2**16)
+                        fileobj.write(b"\x00" * count)
+                        length -= count
+                elif isinstance(piece, bytes): fileobj.write(piece)
+                else: copy_bytes(self.source, piece, length, fileobj)
+            fileobj.flush()
+        finally:
+            if fileobj is not dest: fileobj.close()
+
+def write_changed(fobj, data, CHUNK=2**12):
+    """Write data at fobj's position, but only the part of it that
+    differs from what is already there.
+
+    fobj's position is moved past data either way. Returns the number
+    of bytes written.
+    """
+    pos = fobj.tell()
+    old = fobj.read(len(data))
+    start, end = 0, len(data)
+    while start < end and old[start:start + CHUNK] == data[start:start + CHUNK]:
+        start = min(start + CHUNK, end)
+    if len(old) == len(data):
+        while end > start:
+            low = max(start, end - CHUNK)
+            if old[low:end] != data[low:end]: break
+            end = low
+    # Narrow the chunks down to the bytes that differ.
+    while start < end and old[start:start + 1] == data[start:start + 1]:
+        start += 1
+    while end > start and old[end - 1:end] == data[end - 1:end]:
+        end -= 1
+    if start < end:
+        fobj.seek(pos + start)
+        fobj.write(data[start:end])
+    fobj.seek(pos + len(data))
+    return end - start
+
+RACY = 2.0
+
+def save_state(filename, *parts):
+    """Return what is needed to tell that a file still holds the given
+    tag data: the file's identity, size and modification time, and a
+    digest of the data.
+
+    Tag objects keep this from load and save. If saving would give
+    the same state, there is nothing to save. Returns None if filename
+    is not the name of a file that can be examined, or if it was
+    modified in the last RACY seconds, since a second change within
+    the same timestamp tick could go unnoticed (as in mutagen.cache).
+    """
+    if not isinstance(filename, string_types): return None
+    try: stat = os.stat(filename)
+    except EnvironmentError: return None
+    if time.time() - RACY <= stat.st_mtime: return None
+    digest = sha1()
+    for part in parts:
+        digest.update(struct_pack(">Q", len(part)))
+        digest.update(part)
+    return (stat.st_dev, stat.st_ino, stat.st_size,
+            getattr(stat, "st_mtime_ns", stat.st_mtime), digest.digest())
+
+def report_padding(fobj, size):
+    """Record that a save left size bytes of padding in fobj.
+
+    Only an Overlay keeps this; for other files it does nothing.
+    """
+    if isinstance(fobj, Overlay): fobj.padding = size
+
+def source_name(source):
+    """Return the filename for a load source, or None if it has none.
+
+    Paths are given as their full filename. Open files know their
+    name; buffers and other file objects don't.
+    """
+    if isinstance(source, string_types): return source
+    if hasattr(source, "__fspath__"):
+        return getattr(os, "fspath", type(source).__fspath__)(source)
+    name = getattr(source, "name", None)
+    if isinstance(name, string_types): return name
+    return None
+
+def open_fileobj(filename, fileobj=None):
+    """Return a file object to read a load source from, and whether
+    it's new.
+
+    The source may be a filename, a seekable file object, or a
+    bytes-like object holding the file's contents. If fileobj is
+    given, it is used instead, so that a file opened once can be read
+    by several parsers. The file object is rewound; the caller must
+    close it if it is new.
+
+    Files and file objects are read through a BufferedReader; a new
+    one is returned for a file object that isn't one already, which
+    the caller must not close.
+    """
+    if fileobj is None:
+        if isinstance(filename, string_types):
+            return BufferedReader(open(filename, "rb", 0)), True
+        if hasattr(filename, "getbuffer"):
+            # BytesIO; share its buffer rather than its position
+            filename = filename.getbuffer()
+        try: return BytesFile(filename), True
+        except TypeError:
+            if not hasattr(filename, "read"):
+                return BufferedReader(open(filename, "rb", 0)), True
+            fileobj = filename
+    if not isinstance(fileobj, (BufferedReader, BytesFile)):
+        fileobj.seek(0)
+        return BufferedReader(fileobj), False
+    fileobj.seek(0)
+    return fileobj, False
+
+def open_for_update(filename, create=False):
+    """Return a file object to change a file in place, and whether
+    it's new.
+
+    filename may also be a file object open for reading and writing,
+    such as an Overlay, which is returned as is. If create is true, a
+    missing file is created. The caller must close the file object if
+    it is new.
+    """
+    if not isinstance(filename, string_types) and hasattr(filename, "write"):
+        return filename, False
+    try: return open(filename, "rb+"), True
+    except IOError as err:
+        from errno import ENOENT
+        if not create or err.errno != ENOENT: raise
+        open(filename, "ab").close()
+        return open(filename, "rb+"), True
+
 def dict_match(d, key, default=None):
     try:
         return d[key]
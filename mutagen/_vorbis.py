@@ -56,6 +56,7 @@ class VComment(mutagen.Metadata, list):
     """
 
     vendor = "Mutagen " + mutagen.version_string
+    _skipped = ()
 
     def __init__(self, data=None, *args, **kwargs):
         # Collect the args to pass to load, this lets child classes
@@ -70,7 +71,7 @@ class VComment(mutagen.Metadata, list):
                 raise TypeError("VComment requires string data or a file-like")
             self.load(data, *args, **kwargs)
 
-    def load(self, fileobj, errors='replace', framing=True):
+    def load(self, fileobj, errors='replace', framing=True, keys=None):
         """Parse a Vorbis comment from a file-like object.
 
         Keyword arguments:
@@ -78,20 +79,32 @@ class VComment(mutagen.Metadata, list):
           'strict', 'replace', or 'ignore'. This affects Unicode decoding
           and how other malformed content is interpreted.
         framing -- if true, fail if a framing bit is not present
+        keys -- if given, only decode comments with these keys. The
+                others are not visible, but are written back unless
+                their key is set or deleted.
 
         Framing bits are required by the Vorbis comment specification,
         but are not used in FLAC Vorbis comment blocks.
 
         """
+        wanted = None
+        if keys is not None:
+            wanted = {key.lower().encode('ascii') for key in keys}
+        self._skipped = []
         try:
             vendor_length = cdata.uint_le(fileobj.read(4))
             self.vendor = fileobj.read(vendor_length).decode('utf-8', errors)
             count = cdata.uint_le(fileobj.read(4))
             for i in range(count):
                 length = cdata.uint_le(fileobj.read(4))
-                try: string = fileobj.read(length).decode('utf-8', errors)
+                try: data = fileobj.read(length)
                 except (OverflowError, MemoryError):
                     raise error("cannot read %d bytes, too large" % length)
+                if (wanted is not None and
+                    data.split(b'=', 1)[0].lower() not in wanted):
+                    self._skipped.append(data)
+                    continue
+                string = data.decode('utf-8', errors)
                 try: tag, value = string.split('=', 1)
                 except ValueError as err:
                     if errors == "ignore":
@@ -142,6 +155,17 @@ class VComment(mutagen.Metadata, list):
         """Clear all keys from the comment."""
         for e in list(self):
             self.remove(e)
+        self._skipped = []
+
+    def _drop_skipped(self, key):
+        """Forget comments load skipped with this key; return whether
+        there were any."""
+        key = key.lower().encode('ascii')
+        skipped = [data for data in self._skipped
+                   if data.split(b'=', 1)[0].lower() != key]
+        dropped = len(skipped) != len(self._skipped)
+        self._skipped = skipped
+        return dropped
 
     def write(self, framing=True):
         """Return a string representation of the data.
@@ -158,11 +182,14 @@ class VComment(mutagen.Metadata, list):
         f = BytesIO()
         f.write(cdata.to_uint_le(len(self.vendor.encode('utf-8'))))
         f.write(self.vendor.encode('utf-8'))
-        f.write(cdata.to_uint_le(len(self)))
+        f.write(cdata.to_uint_le(len(self) + len(self._skipped)))
         for tag, value in self:
             comment = tag.encode('UTF-8') + b"=" + value.encode('UTF-8')
             f.write(cdata.to_uint_le(len(comment)))
             f.write(comment)
+        for comment in self._skipped:
+            f.write(cdata.to_uint_le(len(comment)))
+            f.write(comment)
         if framing: f.write(b"\x01")
         return f.getvalue()
 
@@ -199,7 +226,8 @@ class VCommentDict(VComment, DictMixin):
         """Delete all values associated with the key."""
         key.encode('ascii') # test if it's ascii
         to_delete = [x for x in self if x[0] == key.lower()]
-        if not to_delete:raise KeyError(key)
+        dropped = self._skipped and self._drop_skipped(key)
+        if not to_delete and not dropped: raise KeyError(key)
         else: list(map(self.remove, to_delete))
 
     def __contains__(self, key):
@@ -229,6 +257,20 @@ class VCommentDict(VComment, DictMixin):
         """Return all keys in the comment."""
         return self and list({k.lower() for k, v in self})
 
+    def __values(self):
+        values = {}
+        for key, value in self:
+            values.setdefault(key, []).append(value)
+        return values
+
+    def values(self):
+        values = self.__values()
+        return [values[key] for key in self.keys()]
+
+    def items(self):
+        values = self.__values()
+        return [(key, values[key]) for key in self.keys()]
+
     def as_dict(self):
         """Return a copy of the comment data in a real dict."""
-        return {key: self[key] for key in self.keys()}
+        return dict(self.items())
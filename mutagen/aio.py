@@ -0,0 +1,114 @@
+# Copyright 2026 agent
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Load and save files without blocking an asyncio event loop.
+
+    from mutagen import aio
+    audio = await aio.File(filename)
+    audio["title"] = "Title"
+    await audio.save_async()
+
+    async for path, result in aio.scan(paths):
+        ...
+
+Loading and saving run the normal format code in a thread pool,
+by default one shared pool of WORKERS threads; an executor argument
+picks another one. This module needs Python 3.7 or newer.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 4
+
+_pool = None
+
+def _executor(executor):
+    global _pool
+    if executor is not None:
+        return executor
+    if _pool is None:
+        _pool = ThreadPoolExecutor(WORKERS)
+    return _pool
+
+def _load(loader, path):
+    try: return loader(path)
+    except Exception as err: return err
+
+async def File(filename, options=None, easy=False, executor=None):
+    """Like mutagen.File, but run in an executor."""
+
+    from mutagen import File
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor(executor), File, filename, options, easy)
+
+async def save(filetype, *args, executor=None, **kwargs):
+    """Call filetype.save(*args, **kwargs) in an executor.
+
+    If the waiting task is cancelled before the save starts, the save
+    never runs. If it has already started, it can't be stopped halfway,
+    so the cancellation waits until the file is completely written
+    before it is raised.
+    """
+
+    future = _executor(executor).submit(filetype.save, *args, **kwargs)
+    try:
+        return await asyncio.shield(asyncio.wrap_future(future))
+    except asyncio.CancelledError:
+        if not future.cancel():
+            while not future.done():
+                try: await asyncio.wait([asyncio.wrap_future(future)])
+                except asyncio.CancelledError: pass
+        raise
+
+async def scan(paths, loader=None, executor=None, limit=WORKERS,
+               ordered=True):
+    """Load every path, yielding (path, result) pairs.
+
+    This is the asynchronous version of mutagen.scan.scan. result is
+    whatever loader (default: mutagen.File) returned for the path, or
+    the exception it raised. At most limit files are loaded at once;
+    paths are consumed no faster than that.
+
+    Results are yielded in the order of paths, unless ordered is
+    false, in which case they are yielded as soon as they are ready.
+    """
+
+    if loader is None:
+        from mutagen import File as loader
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    loop = asyncio.get_running_loop()
+    executor = _executor(executor)
+    paths = iter(paths)
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < limit:
+                for path in paths:
+                    future = loop.run_in_executor(
+                        executor, _load, loader, path)
+                    pending.append((path, future))
+                    break
+                else: break
+            if not pending:
+                break
+
+            if ordered: waiting = [pending[0]]
+            else: waiting = list(pending)
+            await asyncio.wait([f for (p, f) in waiting],
+                               return_when=asyncio.FIRST_COMPLETED)
+            for item in waiting:
+                path, future = item
+                if future.done():
+                    pending.remove(item)
+                    yield path, future.result()
+    finally:
+        for path, future in pending:
+            future.cancel()
@@ -32,7 +32,6 @@ http://wiki.hydrogenaudio.org/index.php?title=APEv2_specification.
 
 __all__ = ["APEv2", "APEv2File", "Open", "delete"]
 
-from io import BytesIO
 from functools import total_ordering
 
 from mutagen._util import struct_pack, utf8, text_type
@@ -58,8 +57,9 @@ class APENoHeaderError(error, ValueError): pass
 class APEUnsupportedVersionError(error, ValueError): pass
 class APEBadItemError(error, ValueError): pass
 
-from mutagen import Metadata, FileType
-from mutagen._util import DictMixin, cdata, utf8, delete_bytes
+import mutagen
+from mutagen import Metadata, FileType, MoveRequiredError
+from mutagen._util import DictMixin, cdata, utf8, delete_bytes, open_fileobj, open_for_update, save_state, write_changed, source_name
 
 class _APEv2Data(object):
     # Store offsets of the important parts of the file.
@@ -188,6 +188,7 @@ class APEv2(DictMixin, Metadata):
     """
 
     filename = None
+    __state = None
 
     def __init__(self, *args, **kwargs):
         self.__casemap = {}
@@ -205,14 +206,24 @@ class APEv2(DictMixin, Metadata):
         items = sorted(list(self.items()))
         return "\n".join(["%s=%s" % (k, v.pprint()) for k, v in items])
 
-    def load(self, filename):
-        """Load tags from a filename."""
-        self.filename = filename
-        fileobj = open(filename, "rb")
+    def load(self, filename, fileobj=None):
+        """Load tags from a filename, or an open file object for it."""
+        self.filename = source_name(filename)
+        self.__state = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
             data = _APEv2Data(fileobj)
+            # Only a tag with a header at the very end is saved back
+            # where it was.
+            fileobj.seek(0, 2)
+            if (data.tag and not data.is_at_start and
+                data.flags & HAS_HEADER and data.start == data.header and
+                data.end == fileobj.tell()):
+                fileobj.seek(data.start)
+                self.__state = save_state(
+                    self.filename, fileobj.read(data.end - data.start))
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
         if data.tag:
             self.clear()
             self.__casemap.clear()
@@ -221,24 +232,24 @@ class APEv2(DictMixin, Metadata):
             raise APENoHeaderError("No APE tag found")
 
     def __parse_tag(self, tag, count):
-        fileobj = BytesIO(tag)
-
+        pos = 0
         for i in range(count):
-            size = cdata.uint_le(fileobj.read(4))
-            flags = cdata.uint_le(fileobj.read(4))
+            size = cdata.uint_le(tag[pos:pos+4])
+            flags = cdata.uint_le(tag[pos+4:pos+8])
+            pos += 8
 
             # Bits 1 and 2 bits are flags, 0-3
             # Bit 0 is read/write flag, ignored
             kind = (flags & 6) >> 1
             if kind == 3:
                 raise APEBadItemError("value type must be 0, 1, or 2")
-            key = value = fileobj.read(1)
-            while key[-1:] != b'\x00' and value:
-                value = fileobj.read(1)
-                key += value
-            if key[-1:] == b"\x00":
-                key = key[:-1]
-            value = fileobj.read(size)
+            # The key runs up to a NUL byte, or the end of the tag.
+            end = tag.find(b"\x00", pos)
+            if end < 0: end = len(tag)
+            key = tag[pos:end]
+            pos = end + 1
+            value = tag[pos:pos+size]
+            pos += len(value)
             self[key.decode()] = APEValue(value, kind)
 
     def __getitem__(self, key):
@@ -290,32 +301,40 @@ class APEv2(DictMixin, Metadata):
         self.__casemap[key.lower()] = key
         self.__dict[key.lower()] = value
 
+    def __contains__(self, key):
+        return is_valid_apev2_key(key) and key.lower() in self.__dict
+
     def keys(self):
-        return [self.__casemap.get(key, key) for key in list(self.__dict.keys())]
+        return [self.__casemap.get(key, key) for key in self.__dict]
+
+    def __iter__(self):
+        return (self.__casemap.get(key, key) for key in self.__dict)
+
+    def __len__(self):
+        return len(self.__dict)
+
+    def values(self):
+        return list(self.__dict.values())
 
-    def save(self, filename=None):
+    def items(self):
+        return [(self.__casemap.get(key, key), value)
+                for (key, value) in self.__dict.items()]
+
+    def save(self, filename=None, padding=None, in_place_only=False):
         """Save changes to a file.
 
         If no filename is given, the one most recently loaded is used.
 
         Tags are always written at the end of the file, and include
-        a header and a footer.
+        a header and a footer. Nothing has to be moved when they
+        grow, so they aren't padded, and padding is ignored.
+
+        A tag at the start of the file is moved to the end, which moves
+        the audio; if in_place_only is true, mutagen.MoveRequiredError
+        is raised instead.
         """
 
         filename = filename or self.filename
-        try:
-            fileobj = open(filename, "r+b")
-        except IOError:
-            fileobj = open(filename, "w+b")
-        data = _APEv2Data(fileobj)
-
-        if data.is_at_start:
-            delete_bytes(fileobj, data.end - data.start, data.start)
-        elif data.start is not None:
-            fileobj.seek(data.start)
-            # Delete an ID3v1 tag if present, too.
-            fileobj.truncate()
-        fileobj.seek(0, 2)
 
         # "APE tags items should be sorted ascending by size... This is
         # not a MUST, but STRONGLY recommended. Actually the items should
@@ -327,15 +346,37 @@ class APEv2(DictMixin, Metadata):
         # tag string, version, tag size, item count, flags
         header = struct_pack("<8s 4I 8x", b"APETAGEX", 2000, len(tags)+32,
                              num_tags, HAS_HEADER|IS_HEADER)
-        fileobj.write(header)
-
-        fileobj.write(tags)
-
         # tag string, version, tag size, item count, flags
         footer = struct_pack("<8s 4I 8x", b"APETAGEX", 2000, len(tags) + 32,
                              num_tags, HAS_HEADER)
-        fileobj.write(footer)
-        fileobj.close()
+        tag = header + tags + footer
+
+        state = save_state(filename, tag)
+        if state is not None and state == self.__state:
+            mutagen._skip_save()
+            return
+        self.__state = None
+
+        fileobj, opened = open_for_update(filename, create=True)
+        data = _APEv2Data(fileobj)
+
+        if data.is_at_start and in_place_only:
+            if opened: fileobj.close()
+            raise MoveRequiredError(0)
+        elif data.is_at_start:
+            delete_bytes(fileobj, data.end - data.start, data.start)
+            fileobj.seek(0, 2)
+        elif data.start is not None:
+            fileobj.seek(data.start)
+        else: fileobj.seek(0, 2)
+
+        write_changed(fileobj, tag)
+        # Delete an ID3v1 tag if present, too.
+        end = fileobj.tell()
+        fileobj.seek(0, 2)
+        if fileobj.tell() != end: fileobj.truncate(end)
+        if opened: fileobj.close()
+        self.__state = save_state(filename, tag)
 
     def delete(self, filename=None):
         """Remove tags from a file."""
@@ -347,6 +388,7 @@ class APEv2(DictMixin, Metadata):
                 delete_bytes(fileobj, data.end - data.start, data.start)
         finally:
             fileobj.close()
+        self.__state = None
         self.clear()
 
 Open = APEv2
@@ -447,13 +489,22 @@ class APEv2File(FileType):
         def __init__(self, fileobj): pass
         pprint = staticmethod(lambda: "Unknown format with APEv2 tag.")
 
-    def load(self, filename):
-        self.filename = filename
-        self.info = self._Info(open(filename, "rb"))
-        try: self.tags = APEv2(filename)
-        except error: self.tags = None
+    def load(self, filename, fileobj=None, tags=True, info=True):
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        self.tags = self.info = None
+        fileobj, opened = open_fileobj(filename, fileobj)
+        try:
+            if info:
+                self.info = self._Info(fileobj)
+            if tags:
+                try: self.tags = APEv2(filename, fileobj=fileobj)
+                except error: pass
+        finally:
+            if opened: fileobj.close()
 
     def add_tags(self):
+        self._check_tags()
         if self.tags is None:
             self.tags = APEv2()
         else:
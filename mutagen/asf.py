@@ -12,8 +12,9 @@
 __all__ = ["ASF", "Open"]
 
 from functools import total_ordering
-from mutagen import FileType, Metadata
-from mutagen._util import insert_bytes, delete_bytes, DictMixin, struct_pack, struct_unpack, text_type, string_types
+import mutagen
+from mutagen import FileType, Metadata, PaddingInfo, MoveRequiredError
+from mutagen._util import insert_bytes, delete_bytes, DictMixin, struct_pack, struct_unpack, text_type, string_types, open_fileobj, open_for_update, report_padding, save_state, write_changed, source_name
 class error(IOError): pass
 class ASFError(error): pass
 class ASFHeaderError(error): pass
@@ -98,6 +99,12 @@ class ASFTags(list, DictMixin, Metadata):
             d.setdefault(key, []).append(value)
         return d
 
+    def values(self):
+        return list(self.as_dict().values())
+
+    def items(self):
+        return list(self.as_dict().items())
+
 
 @total_ordering
 class ASFBaseAttribute(object):
@@ -471,10 +478,7 @@ class HeaderExtensionObject(BaseObject):
         self.objects = []
         while datapos < datasize:
             guid, size = struct_unpack("<16sQ", data[22+datapos:22+datapos+24])
-            if guid in _object_types:
-                obj = _object_types[guid]()
-            else:
-                obj = UnknownObject(guid)
+            obj = _new_object(asf, guid)
             obj.parse(asf, data[22+datapos+24:22+datapos+size], fileobj, size)
             self.objects.append(obj)
             datapos += size
@@ -547,7 +551,23 @@ class MetadataLibraryObject(BaseObject):
                 data)
 
 
+class PaddingObject(BaseObject):
+    """Padding, the space tags can grow into."""
+    GUID = b"\x74\xD4\x06\x18\xDF\xCA\x09\x45\xA4\xBA\x9A\xAB\xCB\x96\xAA\xE8"
+
+    def __init__(self, size=24):
+        self.size = size
+
+    def parse(self, asf, data, fileobj, size):
+        self.size = size
+
+    def render(self, asf):
+        return (self.GUID + struct_pack("<Q", self.size) +
+                b"\x00" * (self.size - 24))
+
+
 _object_types = {
+    PaddingObject.GUID: PaddingObject,
     ExtendedContentDescriptionObject.GUID: ExtendedContentDescriptionObject,
     ContentDescriptionObject.GUID: ContentDescriptionObject,
     FilePropertiesObject.GUID: FilePropertiesObject,
@@ -557,16 +577,36 @@ _object_types = {
     MetadataObject.GUID: MetadataObject,
 }
 
+_tag_objects = [
+    ContentDescriptionObject.GUID, ExtendedContentDescriptionObject.GUID,
+    MetadataObject.GUID, MetadataLibraryObject.GUID,
+]
+
+_info_objects = [FilePropertiesObject.GUID, StreamPropertiesObject.GUID]
+
+
+def _new_object(asf, guid):
+    if guid in _object_types and guid not in asf._skip:
+        return _object_types[guid]()
+    else:
+        return UnknownObject(guid)
+
 
 class ASF(FileType):
     """An ASF file, probably containing WMA or WMV."""
 
+    _skip = frozenset()
     _mimes = ["audio/x-ms-wma", "audio/x-ms-wmv", "video/x-ms-asf",
               "audio/x-wma", "video/x-wmv"]
 
-    def load(self, filename):
-        self.filename = filename
-        fileobj = open(filename, "rb")
+    def load(self, filename, fileobj=None, tags=True, info=True):
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        # Objects holding what isn't wanted are kept, but not parsed.
+        self._skip = set()
+        if not tags: self._skip.update(_tag_objects)
+        if not info: self._skip.update(_info_objects)
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
             self.size = 0
             self.size1 = 0
@@ -578,9 +618,26 @@ class ASF(FileType):
             self.tags = ASFTags()
             self.__read_file(fileobj)
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
+        if not tags: self.tags = None
+        if not info: self.info = None
+
+    def save(self, filename=None, padding=None, in_place_only=False):
+        """Save tag changes back to the loaded file.
+
+        If no filename is given, the one most recently loaded is used.
 
-    def save(self):
+        padding is a mutagen.PaddingPolicy deciding the size of a
+        padding object at the end of the header. By default the old
+        header's space is kept if the new one fits, and otherwise it
+        gets no padding.
+
+        If in_place_only is true, the header is written in the space
+        of the old one, or mutagen.MoveRequiredError is raised if it
+        doesn't fit.
+        """
+        self._check_tags()
+        if filename is None: filename = self.filename
         # Move attributes to the right objects
         self.to_extended_content_description = {}
         self.to_metadata = {}
@@ -621,23 +678,46 @@ class ASF(FileType):
                 MetadataLibraryObject()
             self.header_extension_obj.objects.append(self.metadata_library_obj)
 
-        # Render the header
-        data = b"".join([obj.render(self) for obj in self.objects])
-        data = (HeaderObject.GUID +
-                struct_pack("<QL", len(data) + 30, len(self.objects)) +
-                b"\x01\x02" + data)
-
-        fileobj = open(self.filename, "rb+")
+        self.objects = [obj for obj in self.objects
+                        if not isinstance(obj, PaddingObject)]
+        rendered = [obj.render(self) for obj in self.objects]
+        if padding is None:
+            state = save_state(filename, *rendered)
+            if state is not None and state == self.__state:
+                mutagen._skip_save()
+                return
+        self.__state = None
+
+        fileobj, opened = open_for_update(filename)
         try:
+            # Render the header, with the padding asked for at the end.
+            size = 30 + sum(map(len, rendered))
+            fileobj.seek(0, 2)
+            info = PaddingInfo(
+                self.size - size, fileobj.tell() - self.size, 0)
+            extra = info.choose(padding, in_place_only)
+            if 0 < extra < 24 and in_place_only:
+                raise MoveRequiredError(24 - extra)
+            if extra:
+                # A padding object can't be smaller than its header.
+                self.objects.append(PaddingObject(max(extra, 24)))
+            report_padding(fileobj, extra and max(extra, 24))
+            data = b"".join([obj.render(self) for obj in self.objects])
+            data = (HeaderObject.GUID +
+                    struct_pack("<QL", len(data) + 30, len(self.objects)) +
+                    b"\x01\x02" + data)
+
             size = len(data)
             if size > self.size:
                 insert_bytes(fileobj, size - self.size, self.size)
             if size < self.size:
                 delete_bytes(fileobj, self.size - size, 0)
             fileobj.seek(0)
-            fileobj.write(data)
+            write_changed(fileobj, data)
+            if filename == self.filename: self.size = size
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
+        self.__state = save_state(filename, *rendered)
 
     def __read_file(self, fileobj):
         header = fileobj.read(30)
@@ -652,18 +732,27 @@ class ASF(FileType):
 
         self.size, self.num_objects = struct_unpack("<QL", header[16:28])
         self.objects = []
-        for i in range(self.num_objects):
-            self.__read_object(fileobj)
+        content = [self.__read_object(fileobj)
+                   for i in range(self.num_objects)]
+
+        # Saving writes the objects back as they are if any padding
+        # object comes last.
+        paddings = [obj for obj in self.objects
+                    if isinstance(obj, PaddingObject)]
+        self.__state = None
+        if (paddings in ([], self.objects[-1:]) and
+            header[28:] == b"\x01\x02"):
+            self.__state = save_state(
+                self.filename, *content[:len(self.objects) - len(paddings)])
 
     def __read_object(self, fileobj):
-        guid, size = struct_unpack("<16sQ", fileobj.read(24))
-        if guid in _object_types:
-            obj = _object_types[guid]()
-        else:
-            obj = UnknownObject(guid)
+        header = fileobj.read(24)
+        guid, size = struct_unpack("<16sQ", header)
+        obj = _new_object(self, guid)
         data = fileobj.read(size - 24)
         obj.parse(self, data, fileobj, size)
         self.objects.append(obj)
+        return header + data
 
     def score(filename, fileobj, header):
         return header.startswith(HeaderObject.GUID) * 2
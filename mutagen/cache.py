@@ -0,0 +1,192 @@
+# Copyright 2026 agent
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Remember loaded files between runs.
+
+    from mutagen.cache import Cache
+    cache = Cache("metadata.db")
+    for filename in filenames:
+        audio = cache.File(filename)
+    cache.close()
+
+A cache stores loaded files in a SQLite database, keyed by the
+file's device and inode, and checks the file's size and
+modification time before answering from it. An unchanged file is
+answered with a stat() call and without being opened.
+
+Saving or deleting tags changes the size or modification time, so
+the old entry no longer matches; nothing has to be told about it.
+Files modified in the last RACY seconds are not stored, because a
+second change within the same timestamp tick could go unnoticed.
+"""
+
+import os
+import time
+import zlib
+import pickle
+import threading
+
+from collections import OrderedDict
+
+class Cache(object):
+    """A cache of loaded files.
+
+    If filename is None, only size files are kept, in memory.
+    Otherwise the database is created if needed, and the size most
+    recently used files are also kept in memory.
+
+    Cached results are copies; changing one does not change what
+    the cache returns next time.
+
+    Attributes:
+    hits -- number of loads answered from the cache
+    misses -- number of loads that had to read the file
+    """
+
+    RACY = 2.0
+    COMMIT_EVERY = 1000
+
+    def __init__(self, filename=None, size=1024):
+        self.hits = 0
+        self.misses = 0
+        self.size = size
+        self.__memory = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__unsaved = 0
+        self.__db = None
+        if filename is not None:
+            import sqlite3
+            self.__db = sqlite3.connect(filename, check_same_thread=False)
+            self.__db.execute("CREATE TABLE IF NOT EXISTS files ("
+                              "dev INTEGER, ino INTEGER, kind TEXT, "
+                              "size INTEGER, mtime INTEGER, data BLOB, "
+                              "PRIMARY KEY (dev, ino, kind))")
+
+    def File(self, filename, options=None, easy=False):
+        """Return mutagen.File(filename, options, easy), cached."""
+
+        from mutagen import File
+        if options is None: kind = "File"
+        else: kind = "File:" + ",".join(sorted(map(_name, options)))
+        if easy: kind += ":easy"
+        return self.load(filename, kind, File, filename, options, easy)
+
+    def open(self, Kind, filename):
+        """Return Kind(filename), cached."""
+
+        return self.load(filename, _name(Kind), Kind, filename)
+
+    def load(self, filename, kind, loader, *args):
+        """Return loader(*args) for a file, cached under kind.
+
+        The result must be picklable. Exceptions are not cached.
+        """
+
+        st = os.stat(filename)
+        key = (st.st_dev, st.st_ino, kind)
+        stamp = (st.st_size, _mtime(st))
+        data = self.__get(key, stamp)
+        if data is not None:
+            result = pickle.loads(zlib.decompress(data))
+            _rename(result, filename)
+            return result
+
+        result = loader(*args)
+        if (time.time() - self.RACY) * 1e9 > stamp[1]:
+            data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            data = zlib.compress(data, 1)
+            self.__put(key, stamp, data)
+        return result
+
+    def invalidate(self, filename):
+        """Forget everything cached for a file."""
+
+        st = os.stat(filename)
+        ident = (st.st_dev, st.st_ino)
+        self.__lock.acquire()
+        try:
+            for key in [k for k in self.__memory if k[:2] == ident]:
+                del(self.__memory[key])
+            if self.__db is not None:
+                self.__db.execute(
+                    "DELETE FROM files WHERE dev = ? AND ino = ?", ident)
+                self.__unsaved += 1
+        finally:
+            self.__lock.release()
+
+    def flush(self):
+        """Write pending changes to the database."""
+
+        self.__lock.acquire()
+        try:
+            if self.__db is not None:
+                self.__db.commit()
+            self.__unsaved = 0
+        finally:
+            self.__lock.release()
+
+    def close(self):
+        """Flush and close the database."""
+
+        self.flush()
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+    def __get(self, key, stamp):
+        self.__lock.acquire()
+        try:
+            entry = self.__memory.pop(key, None)
+            if entry is None and self.__db is not None:
+                row = self.__db.execute(
+                    "SELECT size, mtime, data FROM files "
+                    "WHERE dev = ? AND ino = ? AND kind = ?", key).fetchone()
+                if row is not None:
+                    entry = ((row[0], row[1]), bytes(row[2]))
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__remember(key, entry)
+            return entry[1]
+        finally:
+            self.__lock.release()
+
+    def __put(self, key, stamp, data):
+        self.__lock.acquire()
+        try:
+            self.__remember(key, (stamp, data))
+            if self.__db is not None:
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                    key + stamp + (data,))
+                self.__unsaved += 1
+                if self.__unsaved >= self.COMMIT_EVERY:
+                    self.__db.commit()
+                    self.__unsaved = 0
+        finally:
+            self.__lock.release()
+
+    def __remember(self, key, entry):
+        self.__memory.pop(key, None)
+        self.__memory[key] = entry
+        while len(self.__memory) > self.size:
+            self.__memory.popitem(last=False)
+
+def _name(Kind):
+    return "%s.%s" % (Kind.__module__, Kind.__name__)
+
+def _mtime(st):
+    try: return st.st_mtime_ns
+    except AttributeError: return int(st.st_mtime * 1e9)
+
+def _rename(result, filename):
+    # The same inode may have been cached under another name.
+    if getattr(result, "filename", None) is not None:
+        result.filename = filename
+    tags = getattr(result, "tags", None)
+    if getattr(tags, "filename", None) is not None:
+        tags.filename = filename
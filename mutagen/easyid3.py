@@ -61,6 +61,7 @@ class EasyID3(DictMixin, Metadata):
     Get = {}
     Delete = {}
     List = {}
+    Frames = {}
 
     # For compatibility.
     valid_keys = Get
@@ -70,8 +71,8 @@ class EasyID3(DictMixin, Metadata):
     DeleteFallback = None
     ListFallback = None
     
-    def RegisterKey(cls, key,
-                    getter=None, setter=None, deleter=None, lister=None):
+    def RegisterKey(cls, key, getter=None, setter=None, deleter=None,
+                    lister=None, frames=None):
         """Register a new key mapping.
 
         A key mapping is four functions, a getter, setter, deleter,
@@ -87,6 +88,10 @@ class EasyID3(DictMixin, Metadata):
         The lister is used to implement keys(). It should return a
         list of keys that are actually in the ID3 instance, provided
         by its associated getter.
+
+        frames is a list of the frame IDs the functions use, so that
+        load(keys=[...]) can decode only those. Loading a key without
+        them decodes all frames.
         """
         key = key.lower()
         if getter is not None:
@@ -97,6 +102,8 @@ class EasyID3(DictMixin, Metadata):
             cls.Delete[key] = deleter
         if lister is not None:
             cls.List[key] = lister
+        if frames is not None:
+            cls.Frames[key] = list(frames)
     RegisterKey = classmethod(RegisterKey)
 
     def RegisterTextKey(cls, key, frameid):
@@ -122,7 +129,7 @@ class EasyID3(DictMixin, Metadata):
         def deleter(id3, key):
             del(id3[frameid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, frames=[frameid])
     RegisterTextKey = classmethod(RegisterTextKey)
 
     def RegisterTXXXKey(cls, key, desc):
@@ -153,16 +160,31 @@ class EasyID3(DictMixin, Metadata):
         def deleter(id3, key):
             del(id3[frameid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, frames=["TXXX"])
     RegisterTXXXKey = classmethod(RegisterTXXXKey)
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, *args, **kwargs):
         self.__id3 = ID3()
-        self.load = self.__id3.load
         self.save = self.__id3.save
         self.delete = self.__id3.delete
         if filename is not None:
-            self.load(filename)
+            self.load(filename, *args, **kwargs)
+
+    def load(self, filename, *args, **kwargs):
+        """Load tags from a filename; see ID3.load.
+
+        keys may be given instead of ID3.load's frames, a list of
+        EasyID3 keys to load the frames for.
+        """
+        keys = kwargs.pop("keys", None)
+        if keys is not None:
+            frames = set()
+            for key in keys:
+                ids = dict_match(self.Frames, key.lower())
+                if ids is None: break
+                frames.update(ids)
+            else: kwargs["frames"] = frames
+        return self.__id3.load(filename, *args, **kwargs)
 
     filename = property(lambda s: s.__id3.filename,
                         lambda s, fn: setattr(s.__id3, 'filename', fn))
@@ -424,18 +446,23 @@ for frameid, key in {
     }.items():
     EasyID3.RegisterTextKey(key, frameid)
 
-EasyID3.RegisterKey("genre", genre_get, genre_set, genre_delete)
-EasyID3.RegisterKey("date", date_get, date_set, date_delete)
+EasyID3.RegisterKey("genre", genre_get, genre_set, genre_delete,
+                    frames=["TCON"])
+EasyID3.RegisterKey("date", date_get, date_set, date_delete,
+                    frames=["TDRC"])
 EasyID3.RegisterKey(
     "performer:*", performer_get, performer_set, performer_delete,
-    performer_list)
+    performer_list, frames=["TMCL"])
 EasyID3.RegisterKey("musicbrainz_trackid", musicbrainz_trackid_get,
-                    musicbrainz_trackid_set, musicbrainz_trackid_delete)
-EasyID3.RegisterKey("website", website_get, website_set, website_delete)
-EasyID3.RegisterKey("website", website_get, website_set, website_delete)
+                    musicbrainz_trackid_set, musicbrainz_trackid_delete,
+                    frames=["UFID"])
+EasyID3.RegisterKey("website", website_get, website_set, website_delete,
+                    frames=["WOAR"])
 EasyID3.RegisterKey(
-    "replaygain_*_gain", gain_get, gain_set, gain_delete, peakgain_list)
-EasyID3.RegisterKey("replaygain_*_peak", peak_get, peak_set, peak_delete)
+    "replaygain_*_gain", gain_get, gain_set, gain_delete, peakgain_list,
+    frames=["RVA2"])
+EasyID3.RegisterKey("replaygain_*_peak", peak_get, peak_set, peak_delete,
+                    frames=["RVA2"])
 
 # At various times, information for this came from
 # http://musicbrainz.org/docs/specs/metadata_tags.html
@@ -20,18 +20,33 @@ class EasyMP4Tags(DictMixin, Metadata):
     Get = {}
     Delete = {}
     List = {}
+    Atoms = {}
 
     def __init__(self, *args, **kwargs):
-        self.__mp4 = MP4Tags(*args, **kwargs)
-        self.load = self.__mp4.load
+        self.__mp4 = MP4Tags()
         self.save = self.__mp4.save
         self.delete = self.__mp4.delete
+        if args or kwargs:
+            self.load(*args, **kwargs)
+
+    def load(self, atoms, fileobj, keys=None):
+        """Load tags; keys is a list of EasyMP4Tags keys to read."""
+        if keys is not None:
+            atomids = set()
+            for key in keys:
+                ids = dict_match(self.Atoms, key.lower())
+                if ids is None:
+                    atomids = None
+                    break
+                atomids.update(ids)
+            keys = atomids
+        self.__mp4.load(atoms, fileobj, keys=keys)
 
     filename = property(lambda s: s.__mp4.filename,
                         lambda s, fn: setattr(s.__mp4, 'filename', fn))
 
-    def RegisterKey(cls, key,
-                    getter=None, setter=None, deleter=None, lister=None):
+    def RegisterKey(cls, key, getter=None, setter=None, deleter=None,
+                    lister=None, atoms=None):
         """Register a new key mapping.
 
         A key mapping is four functions, a getter, setter, deleter,
@@ -47,6 +62,9 @@ class EasyMP4Tags(DictMixin, Metadata):
         The lister is used to implement keys(). It should return a
         list of keys that are actually in the MP4 instance, provided
         by its associated getter.
+
+        atoms is a list of the MP4Tags keys the functions use, so that
+        loading with keys=[...] can read only those.
         """
         key = key.lower()
         if getter is not None:
@@ -57,6 +75,8 @@ class EasyMP4Tags(DictMixin, Metadata):
             cls.Delete[key] = deleter
         if lister is not None:
             cls.List[key] = lister
+        if atoms is not None:
+            cls.Atoms[key] = list(atoms)
     RegisterKey = classmethod(RegisterKey)
 
     def RegisterTextKey(cls, key, atomid):
@@ -76,7 +96,7 @@ class EasyMP4Tags(DictMixin, Metadata):
         def deleter(tags, key):
             del(tags[atomid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, atoms=[atomid])
     RegisterTextKey = classmethod(RegisterTextKey)
 
     def RegisterIntKey(cls, key, atomid, min_value=0, max_value=2**16-1):
@@ -93,7 +113,7 @@ class EasyMP4Tags(DictMixin, Metadata):
         def deleter(tags, key):
             del(tags[atomid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, atoms=[atomid])
     RegisterIntKey = classmethod(RegisterIntKey)
 
     def RegisterIntPairKey(cls, key, atomid, min_value=0, max_value=2**16-1):
@@ -123,7 +143,7 @@ class EasyMP4Tags(DictMixin, Metadata):
         def deleter(tags, key):
             del(tags[atomid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, atoms=[atomid])
     RegisterIntPairKey = classmethod(RegisterIntPairKey)
 
     def RegisterFreeformKey(cls, key, name, mean="com.apple.iTunes"):
@@ -146,7 +166,7 @@ class EasyMP4Tags(DictMixin, Metadata):
         def deleter(tags, key):
             del(tags[atomid])
 
-        cls.RegisterKey(key, getter, setter, deleter)
+        cls.RegisterKey(key, getter, setter, deleter, atoms=[atomid])
     RegisterFreeformKey = classmethod(RegisterFreeformKey)
 
     def __getitem__(self, key):
@@ -211,6 +231,8 @@ for atomid, key in list({
     b'soco': 'composersort',
     }.items()):
     EasyMP4Tags.RegisterTextKey(key, atomid)
+# ID3v1 genres are loaded as b'\xa9gen'.
+EasyMP4Tags.RegisterKey("genre", atoms=[b'\xa9gen', b'gnre'])
 
 for name, key in list({
     'MusicBrainz Artist Id': 'musicbrainz_artistid',
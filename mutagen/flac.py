@@ -24,9 +24,9 @@ __all__ = ["FLAC", "Open", "delete"]
 from io import BytesIO
 from functools import reduce
 from ._vorbis import VCommentDict
-from mutagen import FileType
-from mutagen._util import insert_bytes, struct_pack, struct_unpack, struct_calcsize, text_type, byte_types
-from mutagen.id3 import BitPaddedInt
+import mutagen
+from mutagen import FileType, PaddingInfo, MoveRequiredError
+from mutagen._util import insert_bytes, insert_size, delete_bytes, struct_pack, struct_unpack, struct_calcsize, text_type, byte_types, open_fileobj, open_for_update, report_padding, save_state, write_changed, source_name
 
 class error(IOError): pass
 class FLACNoHeaderError(error): pass
@@ -90,6 +90,13 @@ class MetadataBlock(object):
         blocks.append(padding)
     group_padding = staticmethod(group_padding)
 
+class _SkippedBlock(MetadataBlock):
+    """A block FLAC.load left in the file, read when it is saved."""
+
+    def __init__(self, code, offset, length):
+        self.code, self.offset, self.length = code, offset, length
+        self.data = None
+
 class StreamInfo(MetadataBlock):
     """FLAC stream information.
 
@@ -193,6 +200,8 @@ class SeekPoint(tuple):
     def __new__(cls, first_sample, byte_offset, num_samples):
         return super(cls, SeekPoint).__new__(cls, (first_sample,
             byte_offset, num_samples))
+    def __getnewargs__(self):
+        return tuple(self)
     first_sample = property(lambda self: self[0])
     byte_offset = property(lambda self: self[1])
     num_samples = property(lambda self: self[2])
@@ -247,8 +256,9 @@ class VCFLACDict(VCommentDict):
 
     code = 4
 
-    def load(self, data, errors='replace', framing=False):
-        super(VCFLACDict, self).load(data, errors=errors, framing=framing)
+    def load(self, data, errors='replace', framing=False, keys=None):
+        super(VCFLACDict, self).load(
+            data, errors=errors, framing=framing, keys=keys)
 
     def write(self, framing=False):
         return super(VCFLACDict, self).write(framing=framing)
@@ -270,6 +280,8 @@ class CueSheetTrackIndex(tuple):
     def __new__(cls, index_number, index_offset):
         return super(cls, CueSheetTrackIndex).__new__(cls,
             (index_number, index_offset))
+    def __getnewargs__(self):
+        return tuple(self)
     index_number = property(lambda self: self[0])
     index_offset = property(lambda self: self[1])
 
@@ -528,9 +540,19 @@ class FLAC(FileType):
                 filename.lower().endswith(".flac") * 3)
     score = staticmethod(score)
 
-    def __read_metadata_block(self, fileobj):
-        byte = ord(fileobj.read(1))
-        size = to_int_be(fileobj.read(3))
+    def __read_metadata_block(self, fileobj, tags=True, keys=None):
+        header = fileobj.read(4)
+        byte = ord(header[:1])
+        size = to_int_be(header[1:])
+        if (byte & 0x7F) == Picture.code:
+            if not tags:
+                fileobj.seek(size, 1)
+                return not (byte & 0x80)
+            elif keys is not None:
+                self.metadata_blocks.append(
+                    _SkippedBlock(Picture.code, fileobj.tell(), size))
+                fileobj.seek(size, 1)
+                return not (byte & 0x80)
         try:
             if (byte & 0x7F) == VCFLACDict.code:
                 # Some jackass is writing broken Metadata block length
@@ -540,7 +562,7 @@ class FLAC(FileType):
                 # given, parse an actual Vorbis comment, leaving
                 # fileobj in the right position.
                 # http://code.google.com/p/mutagen/issues/detail?id=52
-                block = VCFLACDict(fileobj)
+                block = VCFLACDict(fileobj, keys=keys)
             else:
                 data = fileobj.read(size)
                 if len(data) != size:
@@ -552,7 +574,10 @@ class FLAC(FileType):
             block.code = byte & 0x7F
 
         if block.code == VCFLACDict.code:
-            if self.tags is None:
+            if not tags:
+                # Read only to find its end; see above.
+                return not (byte & 0x80)
+            elif self.tags is None:
                 self.tags = block
             else:
                 raise FLACVorbisError("> 1 Vorbis comment block found")
@@ -571,6 +596,7 @@ class FLAC(FileType):
 
     def add_tags(self):
         """Add a Vorbis comment block to the file."""
+        self._check_tags()
         if self.tags is None:
             self.tags = VCFLACDict()
             self.metadata_blocks.append(self.tags)
@@ -582,6 +608,7 @@ class FLAC(FileType):
 
         If no filename is given, the one most recently loaded is used.
         """
+        self._check_tags()
         if filename is None: filename = self.filename
         for s in list(self.metadata_blocks):
             if isinstance(s, VCFLACDict):
@@ -592,27 +619,49 @@ class FLAC(FileType):
 
     vc = property(lambda s: s.tags, doc="Alias for tags; don't use this.")
 
-    def load(self, filename):
-        """Load file information from a filename."""
+    def load(self, filename, fileobj=None, tags=True, info=True,
+             keys=None):
+        """Load file information from a filename.
 
+        If tags is false, Vorbis comments and pictures are skipped. The
+        stream information is always read, as it is the first metadata
+        block, so info is ignored.
+
+        If keys is given, only Vorbis comments with those keys are
+        decoded (see VComment.load), and pictures are not read until
+        the file is saved; pictures is empty.
+        """
+
+        self._tags_skipped = not tags
         self.metadata_blocks = []
         self.tags = None
         self.cuesheet = None
         self.seektable = None
-        self.filename = filename
-        fileobj = open(filename, "rb")
+        self.filename = source_name(filename)
+        self.__state = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
-            self.__check_header(fileobj)
-            while self.__read_metadata_block(fileobj):
+            header = self.__check_header(fileobj)
+            while self.__read_metadata_block(fileobj, tags, keys):
                 pass
+            available = fileobj.tell() - header
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
 
         try:
             self.metadata_blocks[0].length
         except (AttributeError, IndexError):
             raise FLACNoHeaderError("Stream info block not found")
 
+        # Remember the blocks if saving them would write them back
+        # as they are: padding only at the end, and honest lengths.
+        blocks = self.metadata_blocks
+        paddings = [b for b in blocks if isinstance(b, Padding)]
+        sizes = [4 + (b.length if isinstance(b, (Padding, _SkippedBlock))
+                      else len(b.write())) for b in blocks]
+        if paddings == blocks[-1:] and available == sum(sizes):
+            self.__state = save_state(self.filename, *self.__content())
+
     info = property(lambda s: s.metadata_blocks[0])
 
     def add_picture(self, picture):
@@ -624,54 +673,92 @@ class FLAC(FileType):
         self.metadata_blocks = [b for b in self.metadata_blocks if b.code != Picture.code]
 
     def __get_pictures(self):
-        return [b for b in self.metadata_blocks if b.code == Picture.code]
+        return [b for b in self.metadata_blocks if isinstance(b, Picture)]
     pictures = property(__get_pictures, doc="List of embedded pictures")
 
-    def save(self, filename=None, deleteid3=False):
+    def save(self, filename=None, deleteid3=False, padding=None,
+             in_place_only=False):
         """Save metadata blocks to a file.
 
         If no filename is given, the one most recently loaded is used.
+
+        padding is a mutagen.PaddingPolicy deciding the size of the
+        padding block at the end of the metadata. By default the old
+        metadata's space is kept if the new blocks fit, and otherwise
+        they get 1020 bytes of padding.
+
+        If in_place_only is true, the blocks are written over the old
+        ones, with padding for the rest of their space, or
+        mutagen.MoveRequiredError is raised if they don't fit.
         """
 
+        self._check_tags()
         if filename is None: filename = self.filename
-        f = open(filename, 'rb+')
+        if padding is None and not deleteid3:
+            state = save_state(filename, *self.__content())
+            if state is not None and state == self.__state:
+                mutagen._skip_save()
+                return
+        self.__state = None
+        self.__read_skipped(filename)
+        f, opened = open_for_update(filename)
+        try: self.__save(f, deleteid3, padding, in_place_only)
+        finally:
+            if opened: f.close()
+        self.__state = save_state(filename, *self.__content())
+
+    def __content(self):
+        """Return the non-padding blocks as they would be saved. Blocks
+        skipped by load are only told apart by where they are."""
+        content = []
+        for block in self.metadata_blocks:
+            if isinstance(block, Padding): continue
+            data = block.write()
+            if data is None:
+                data = ("%d:%d" % (block.offset, block.length)).encode()
+            content.append(bytearray([block.code]) + data)
+        return content
+
+    def __save(self, f, deleteid3, policy, in_place_only):
 
         # Ensure we've got padding at the end, and only at the end.
-        # If adding makes it too large, we'll scale it down later.
-        self.metadata_blocks.append(Padding(b'\x00' * 1020))
+        self.metadata_blocks.append(Padding())
         MetadataBlock.group_padding(self.metadata_blocks)
+        padding = self.metadata_blocks[-1]
 
         header = self.__check_header(f)
-        available = self.__find_audio_offset(f) - header # "fLaC" and maybe ID3
-        data = MetadataBlock.writeblocks(self.metadata_blocks)
+        audio = self.__find_audio_offset(f)
+        available = audio - header # "fLaC" and maybe ID3
 
         # Delete ID3v2
         if deleteid3 and header > 4:
             available += header - 4
             header = 4
 
-        if len(data) > available:
-            # If we have too much data, see if we can reduce padding.
-            padding = self.metadata_blocks[-1]
-            newlength = padding.length - (len(data) - available)
-            if newlength > 0:
-                padding.length = newlength
-                data = MetadataBlock.writeblocks(self.metadata_blocks)
-                assert len(data) == available
-
-        elif len(data) < available:
-            # If we have too little data, increase padding.
-            self.metadata_blocks[-1].length += (available - len(data))
+        padding.length = 0
+        size = len(MetadataBlock.writeblocks(self.metadata_blocks))
+        f.seek(0, 2)
+        info = PaddingInfo(available - size, f.tell() - audio, 1020)
+        # The length of a block is 24 bits.
+        padding.length = min(info.choose(policy, in_place_only), 2**24 - 1)
+
+        diff = size + padding.length - available
+        if diff and in_place_only:
+            # The padding block can't be long enough to fill the space.
+            raise MoveRequiredError(0)
+        if diff > 0:
+            # Pad so that the space can be inserted quickly.
+            grow = insert_size(f, diff, header)
+            padding.length = min(padding.length + grow - diff, 2**24 - 1)
             data = MetadataBlock.writeblocks(self.metadata_blocks)
-            assert len(data) == available
-
-        if len(data) != available:
-            # We couldn't reduce the padding enough.
-            diff = (len(data) - available)
-            insert_bytes(f, diff, header)
+            insert_bytes(f, len(data) - available, header)
+        else:
+            data = MetadataBlock.writeblocks(self.metadata_blocks)
+            if diff < 0: delete_bytes(f, -diff, header + len(data))
 
+        report_padding(f, padding.length)
         f.seek(header - 4)
-        f.write(b"fLaC" + data)
+        write_changed(f, b"fLaC" + data)
 
         # Delete ID3v1
         if deleteid3:
@@ -682,11 +769,31 @@ class FLAC(FileType):
                     f.seek(-128, 2)
                     f.truncate()
 
+    def __read_skipped(self, filename):
+        skipped = [b for b in self.metadata_blocks
+                   if isinstance(b, _SkippedBlock) and b.data is None]
+        if not skipped: return
+        if self.filename is None:
+            raise ValueError("blocks skipped by load(keys=...) can only "
+                             "be saved back to the file they came from")
+        fileobj = open(self.filename, "rb")
+        try:
+            for block in skipped:
+                fileobj.seek(block.offset)
+                data = fileobj.read(block.length)
+                if len(data) != block.length:
+                    raise error("file said %d bytes, read %d bytes" % (
+                        block.length, len(data)))
+                block.data = data
+        finally:
+            fileobj.close()
+
     def __find_audio_offset(self, fileobj):
         byte = 0x00
         while not (byte & 0x80):
-            byte = ord(fileobj.read(1))
-            size = to_int_be(fileobj.read(3))
+            header = fileobj.read(4)
+            byte = ord(header[:1])
+            size = to_int_be(header[1:])
             if (byte & 0x7F) == VCFLACDict.code:
                 # See comments in read_metadata_block; the size can't
                 # be trusted for Vorbis comment blocks.
@@ -701,12 +808,13 @@ class FLAC(FileType):
         if header != b"fLaC":
             size = None
             if header[:3] == b"ID3":
-                size = 14 + BitPaddedInt(fileobj.read(6)[2:])
+                from mutagen.id3 import syncsafe_decode
+                size = 14 + syncsafe_decode(fileobj.read(6)[2:])
                 fileobj.seek(size - 4)
                 if fileobj.read(4) != b"fLaC": size = None
         if size is None:
-            raise FLACNoHeaderError(
-                "%r is not a valid FLAC file" % fileobj.name)
+            raise FLACNoHeaderError("%r is not a valid FLAC file" %
+                                    getattr(fileobj, "name", fileobj))
         return size
 
 Open = FLAC
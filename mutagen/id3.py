@@ -30,14 +30,15 @@ interested in the 'ID3' class to start with.
 
 __all__ = ['ID3', 'ID3FileType', 'Frames', 'Open', 'delete']
 
-from struct import error as StructError
+import re
+from struct import error as StructError, Struct
 from zlib import error as zlibError
-from functools import total_ordering
+from functools import total_ordering, partial
 from itertools import takewhile
 from warnings import warn
 
 import mutagen
-from mutagen._util import insert_bytes, delete_bytes, DictProxy, string_types, text_type, byte_types, struct_pack, struct_unpack, reraise, zlib_decompress as decompress
+from mutagen._util import insert_bytes, insert_size, delete_bytes, DictProxy, string_types, text_type, byte_types, struct_pack, struct_unpack, reraise, open_fileobj, open_for_update, report_padding, save_state, write_changed, source_name, zlib_decompress as decompress
 
 class error(Exception): pass
 class ID3NoHeaderError(error, ValueError): pass
@@ -53,6 +54,35 @@ class ID3Warning(error, UserWarning): pass
 def is_valid_frame_id(frame_id):
     return frame_id.isalnum() and frame_id.isupper()
 
+_frame_header_24 = Struct('>4sLH')
+_frame_header_22 = Struct('>3sBH')
+
+def _walk_frames(data, frames, offset, read_size):
+    """Walk ID3v2.4 frame headers in data starting at offset.
+
+    Sizes are interpreted with read_size. Returns the number of known
+    frames seen, how far the walk went past the end of data (zero or
+    less if it stopped on padding or inside the data), and whether
+    every frame was known and the walk ended exactly on padding or on
+    the end of data.
+    """
+    found = 0
+    exact = True
+    end = len(data) - 10
+    unpack_from = _frame_header_24.unpack_from
+    while offset < end:
+        name, size, flags = unpack_from(data, offset)
+        if not (size or flags) and name == b"\x00\x00\x00\x00":
+            return found, -((len(data) - offset) % 10), exact
+        if read_size is syncsafe_int and size & 0x80808080:
+            exact = False
+        offset += 10 + read_size(size)
+        if name.decode('latin1') in frames:
+            found += 1
+        else:
+            exact = False
+    return found, offset - len(data), exact and offset == len(data)
+
 class ID3(DictProxy, mutagen.Metadata):
     """A file with an ID3v2 tag.
 
@@ -70,9 +100,15 @@ class ID3(DictProxy, mutagen.Metadata):
     __flags = 0
     __readbytes = 0
     __crc = None
+    __pending = None
+    __skipped = None
+    __wanted = None
+    __state = None
+    __has_v1 = False
 
     def __init__(self, *args, **kwargs):
         self.unknown_frames = []
+        self.__index = {}
         super(ID3, self).__init__(*args, **kwargs)
 
     def __fullread(self, size):
@@ -88,7 +124,8 @@ class ID3(DictProxy, mutagen.Metadata):
         self.__readbytes += size
         return data
 
-    def load(self, filename, known_frames=None, translate=True):
+    def load(self, filename, known_frames=None, translate=True, lazy=False,
+             fileobj=None, frames=None):
         """Load tags from a filename.
 
         Keyword arguments:
@@ -97,6 +134,18 @@ class ID3(DictProxy, mutagen.Metadata):
         translate -- Update all tags to ID3v2.4 internally. Mutagen is
                      only capable of writing ID3v2.4 tags, so if you
                      intend to save, this must be true.
+        lazy -- Only read frame headers now, and decode the frames with
+                a given ID the first time one of them is accessed. Frames
+                that are never accessed are saved back unchanged to
+                ID3v2.4 tags. Broken frames are only found on access.
+                ID3v2.2 tags are always decoded immediately.
+        fileobj -- an open file object to read filename's contents from
+        frames -- if given, only decode frames with these IDs (as in
+                  ID3v2.4; e.g. ['TIT2', 'TPE1']). Other frames are not
+                  visible, but are kept and saved back; setting or
+                  deleting frames with one of their IDs decodes those
+                  first. ID3v2.3 frames that would be translated to a
+                  wanted one, like TYER for TDRC, are decoded too.
 
         Example of loading a custom frame:
             my_frames = dict(mutagen.id3.Frames)
@@ -105,11 +154,20 @@ class ID3(DictProxy, mutagen.Metadata):
             mutagen.id3.ID3(filename, known_frames=my_frames)
         """
 
-        from os.path import getsize
-        self.filename = filename
+        self.filename = source_name(filename)
         self.__known_frames = known_frames
-        self.__fileobj = open(filename, 'rb')
-        self.__filesize = getsize(filename)
+        self.__pending = None
+        self.__skipped = None
+        self.__wanted = None
+        self.__state = None
+        if frames is not None:
+            self.__wanted = set(frames)
+            for frame_id in frames:
+                self.__wanted.update(_V23_SOURCES.get(frame_id, ()))
+        self.__fileobj, opened = open_fileobj(filename, fileobj)
+        self.__fileobj.seek(0, 2)
+        self.__filesize = self.__fileobj.tell()
+        self.__fileobj.seek(0)
         try:
             try:
                 self.__load_header()
@@ -121,32 +179,227 @@ class ID3(DictProxy, mutagen.Metadata):
                 self.size = 0
                 import sys
                 stack = sys.exc_info()[2]
-                try: self.__fileobj.seek(-128, 2)
-                except EnvironmentError:
-                    reraise(type(err), err, stack)
+                if self.__load_appended(None, lazy): pass
                 else:
-                    frames = ParseID3v1(self.__fileobj.read(128))
-                    if frames is not None:
-                        self.version = (1, 1)
-                        list(map(self.add, list(frames.values())))
-                    else:
+                    try: self.__fileobj.seek(-128, 2)
+                    except EnvironmentError:
                         reraise(type(err), err, stack)
+                    else:
+                        frames = ParseID3v1(self.__fileobj.read(128))
+                        if frames is not None:
+                            self.version = (1, 1)
+                            for frame in frames.values():
+                                if self.__wants(type(frame)):
+                                    self.add(frame)
+                        else:
+                            reraise(type(err), err, stack)
             else:
-                frames = self.__known_frames
-                if frames is None:
-                    if (2, 3, 0) <= self.version: frames = Frames
-                    elif (2, 2, 0) <= self.version: frames = Frames_2_2
-                data = bytearray(self.__fullread(self.size - 10))
-                for frame in self.__read_frames(data, frames=frames):
-                    if isinstance(frame, Frame): self.add(frame)
-                    else: self.unknown_frames.append(frame)
+                data = self.__load_frames(lazy)
+                appended = False
+                if (2, 4, 0) <= self.version:
+                    if "SEEK" in self:
+                        offset = self.size + +self["SEEK"]
+                        appended = self.__load_appended(offset, lazy)
+                        if appended: self.delall("SEEK")
+                    else: appended = self.__load_appended(None, lazy)
+                if not appended and not self.__flags:
+                    self.__remember(data)
         finally:
-            self.__fileobj.close()
+            if opened: self.__fileobj.close()
             del self.__fileobj
             del self.__filesize
             if translate:
                 self.update_to_v24()
 
+    def __load_frames(self, lazy):
+        frames = self.__known_frames
+        if frames is None:
+            if (2, 3, 0) <= self.version: frames = Frames
+            elif (2, 2, 0) <= self.version: frames = Frames_2_2
+        data = self.__fullread(self.size - 10)
+        if lazy and (2, 3, 0) <= self.version:
+            if self.__pending is None: self.__pending = {}
+        for frame in self.__read_frames(data, frames=frames):
+            if isinstance(frame, Frame): self.add(frame)
+            elif isinstance(frame, tuple):
+                if self.__wants(frame[0]): store = self.__pending
+                else:
+                    if self.__skipped is None: self.__skipped = {}
+                    store = self.__skipped
+                store.setdefault(_frame_id(frame[0]), []).append(frame)
+            else: self.unknown_frames.append(frame)
+        return data
+
+    def __remember(self, data):
+        """Remember the frame data and ID3v1 tag in the file, so saving
+        them again can be skipped."""
+        v1 = b''
+        if self.__filesize >= 128:
+            self.__fileobj.seek(-128, 2)
+            v1 = self.__fileobj.read(128)
+            if v1[:3] != b'TAG': v1 = b''
+        self.__has_v1 = bool(v1)
+        self.__state = save_state(self.filename, data.rstrip(b'\x00'), v1)
+
+    def __merge(self, front, appended):
+        """Merge undecoded frames of an appended tag into those of the
+        tag at the start of the file, dropping front frames that an
+        appended frame with the same HashKey replaces."""
+        if not front: return appended
+        for frame_id, frames in (appended or {}).items():
+            if frame_id in front:
+                frames = self.__latest(front[frame_id] + frames)
+            front[frame_id] = frames
+        return front
+
+    def __latest(self, frames):
+        """Return frames without those a later frame's HashKey replaces.
+
+        Frames that can't be decoded are all kept, as a load would.
+        """
+        latest = {}
+        for i, frame in enumerate(frames):
+            try: key = self.__load_stored(*frame).HashKey
+            except (NotImplementedError, ID3JunkFrameError): key = i
+            latest[key] = i
+        keep = set(latest.values())
+        return [frame for i, frame in enumerate(frames) if i in keep]
+
+    def __wants(self, tag):
+        return self.__wanted is None or _frame_id(tag) in self.__wanted
+
+    def __load_appended(self, offset, lazy):
+        """Load an ID3v2.4 tag found after the start of the file.
+
+        If offset is None, look for a tag with a footer at the end of
+        the file, before any ID3v1 tag. Frames in it replace those
+        already loaded. Returns whether a tag was loaded; size, version
+        and flags keep describing the tag at the start of the file.
+        """
+        fileobj = self.__fileobj
+        if offset is None:
+            offset = _find_appended(fileobj, self.__filesize)
+            if offset is None and self.__filesize >= 128:
+                fileobj.seek(-128, 2)
+                if fileobj.read(3) == b"TAG":
+                    offset = _find_appended(
+                        fileobj, self.__filesize - 128)
+            if offset is None: return False
+        if not self.size <= offset <= self.__filesize - 10: return False
+
+        front = (self.size, self.__flags, self.version)
+        fileobj.seek(offset)
+        try:
+            self.__load_header()
+            if self.version < (2, 4, 0):
+                raise ID3UnsupportedVersionError("only ID3v2.4 tags "
+                    "can be appended")
+        except (EOFError, ID3NoHeaderError, ID3UnsupportedVersionError):
+            self.size, self.__flags, self.version = front
+            return False
+        stores = self.__pending, self.__skipped
+        self.__pending = self.__skipped = None
+        self.__load_frames(lazy)
+        self.__pending = self.__merge(stores[0], self.__pending)
+        self.__skipped = self.__merge(stores[1], self.__skipped)
+        if front[0]: self.size, self.__flags, self.version = front
+        else: self.size = 0
+        return True
+
+    def __getitem__(self, key):
+        if self.__pending: self.__decode_pending(key)
+        return super(ID3, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if self.__pending: self.__decode_pending(key)
+        if self.__skipped: self.__decode_skipped(key)
+        super(ID3, self).__setitem__(key, value)
+        index = self.__index
+        parts = key.split(":")
+        for i in range(1, len(parts)):
+            index.setdefault(":".join(parts[:i]), {})[key] = None
+
+    def __delitem__(self, key):
+        if self.__pending: self.__decode_pending(key)
+        if self.__skipped: self.__decode_skipped(key)
+        super(ID3, self).__delitem__(key)
+        index = self.__index
+        parts = key.split(":")
+        for i in range(1, len(parts)):
+            prefix = ":".join(parts[:i])
+            keys = index[prefix]
+            del(keys[key])
+            if not keys: del(index[prefix])
+
+    def __contains__(self, key):
+        if self.__pending: self.__decode_pending(key)
+        return super(ID3, self).__contains__(key)
+
+    def keys(self):
+        if self.__pending: self.__decode_pending()
+        return super(ID3, self).keys()
+
+    def __iter__(self):
+        if self.__pending: self.__decode_pending()
+        return super(ID3, self).__iter__()
+
+    def __len__(self):
+        if self.__pending: self.__decode_pending()
+        return super(ID3, self).__len__()
+
+    def values(self):
+        if self.__pending: self.__decode_pending()
+        return super(ID3, self).values()
+
+    def items(self):
+        if self.__pending: self.__decode_pending()
+        return super(ID3, self).items()
+
+    def __getstate__(self):
+        # Undecoded frames are views into the tag data, which can't be
+        # pickled; pickle copies of them instead.
+        state = self.__dict__.copy()
+        for name in ["_ID3__pending", "_ID3__skipped"]:
+            if state.get(name):
+                state[name] = dict(
+                    (key, [(tag, flags, bytes(header), bytes(data))
+                           for (tag, flags, header, data) in frames])
+                    for key, frames in state[name].items())
+        return state
+
+    def __decode_pending(self, key=None):
+        """Decode lazily loaded frames whose HashKey could be key.
+
+        If key is None, all remaining frames are decoded.
+        """
+        if key is None:
+            pending = sum(self.__pending.values(), [])
+            self.__pending.clear()
+        else:
+            pending = self.__pending.pop(key.split(":", 1)[0], [])
+        self.__decode(pending)
+
+    def __decode_skipped(self, key=None):
+        """Decode frames left out by load's frames argument whose
+        HashKey could be key, making them visible.
+
+        If key is None, all skipped frames are decoded.
+        """
+        if key is None:
+            skipped = sum(self.__skipped.values(), [])
+            self.__skipped = None
+        else:
+            skipped = self.__skipped.pop(key.split(":", 1)[0], [])
+        self.__decode(skipped)
+
+    def __decode(self, frames):
+        for tag, flags, header, framedata in frames:
+            try: frame = self.__load_stored(tag, flags, header, framedata)
+            except NotImplementedError:
+                self.unknown_frames.append(bytes(header) + bytes(framedata))
+            except ID3JunkFrameError: pass
+            else: self.add(frame)
+
     def getall(self, key):
         """Return all frames with a given name (the list may be empty).
 
@@ -162,16 +415,15 @@ class ID3(DictProxy, mutagen.Metadata):
         """
         if key in self: return [self[key]]
         else:
-            key = key + ":"
-            return [v for s, v in list(self.items()) if s.startswith(key)]
+            # key in self decoded any pending frames with this ID.
+            get = super(ID3, self).__getitem__
+            return list(map(get, self.__index.get(key, ())))
 
     def delall(self, key):
         """Delete all tags of a given kind; see getall."""
+        if self.__skipped: self.__decode_skipped(key)
         if key in self: del(self[key])
-        else:
-            key = key + ":"
-            for k in [s for s in list(self.keys()) if s.startswith(key)]:
-                del(self[k])
+        else: list(map(self.__delitem__, list(self.__index.get(key, ()))))
 
     def setall(self, key, values):
         """Delete frames of the given type and add frames in 'values'."""
@@ -209,7 +461,7 @@ class ID3(DictProxy, mutagen.Metadata):
         data = self.__fullread(10)
         id3, vmaj, vrev, flags, size = struct_unpack('>3sBBB4s', data)
         self.__flags = flags
-        self.size = BitPaddedInt(size) + 10
+        self.size = syncsafe_decode(size) + 10
         self.version = (2, vmaj, vrev)
 
         if id3 != b'ID3':
@@ -242,7 +494,7 @@ class ID3(DictProxy, mutagen.Metadata):
             elif self.version >= (2, 4, 0):
                 # "Where the 'Extended header size' is the size of the whole
                 # extended header, stored as a 32 bit synchsafe integer."
-                self.__extsize = BitPaddedInt(extsize) - 4
+                self.__extsize = syncsafe_decode(extsize) - 4
             else:
                 # "Where the 'Extended header size', currently 6 or 10 bytes,
                 # excludes itself."
@@ -252,47 +504,49 @@ class ID3(DictProxy, mutagen.Metadata):
             else:
                 self.__extdata = ""
 
-    def __determine_bpi(self, data, frames, EMPTY=b"\x00" * 10):
+    def __determine_bpi(self, data, frames):
         if self.version < (2, 4, 0):
             return int
-        # have to special case whether to use bitpaddedints here
+        # have to special case whether to use syncsafe sizes here
         # spec says to use them, but iTunes has it wrong
 
-        # count number of tags found as BitPaddedInt and how far past
+        # Syncsafe and plain sizes agree for frames smaller than 128
+        # bytes, so both readings share one walk until the first frame
+        # where they differ; most tags never get that far.
         o = 0
-        asbpi = 0
-        while o < len(data) - 10:
-            part = data[o:o + 10]
-            if part == EMPTY:
-                bpioff = -((len(data) - o) % 10)
+        end = len(data) - 10
+        unpack_from = _frame_header_24.unpack_from
+        while o < end:
+            name, size, flags = unpack_from(data, o)
+            if size & 0x80808080:
+                # not a syncsafe integer, so it must be a plain one
+                return int
+            bpisize = syncsafe_int(size)
+            if bpisize != size:
+                break
+            if not (size or flags) and name == b"\x00\x00\x00\x00":
                 break
-            name, size, flags = struct_unpack('>4sLH', part)
-            size = BitPaddedInt(size)
             o += 10 + size
-            if name in frames:
-                asbpi += 1
         else:
-            bpioff = o - len(data)
+            return syncsafe_int
+        if bpisize == size:
+            # reached the padding without the readings ever diverging
+            return syncsafe_int
+
+        # count number of tags found as syncsafe and how far past;
+        # if every frame is known and the walk lands exactly on the
+        # padding or the end of the tag, there is nothing to compare.
+        asbpi, bpioff, exact = _walk_frames(data, frames, o, syncsafe_int)
+        if exact:
+            return syncsafe_int
 
         # count number of tags found as int and how far past
-        o = 0
-        asint = 0
-        while o < len(data) - 10:
-            part = data[o:o + 10]
-            if part == EMPTY:
-                intoff = -((len(data) - o) % 10)
-                break
-            name, size, flags = struct_unpack('>4sLH', part)
-            o += 10 + size
-            if name in frames:
-                asint += 1
-        else:
-            intoff = o - len(data)
+        asint, intoff, exact = _walk_frames(data, frames, o, int)
 
         # if more tags as int, or equal and bpi is past and int is not
         if asint > asbpi or (asint == asbpi and (bpioff >= 1 and intoff <= 1)):
             return int
-        return BitPaddedInt
+        return syncsafe_int
 
     def __read_frames(self, data, frames):
         if self.version < (2, 4, 0) and self.f_unsynch:
@@ -301,43 +555,74 @@ class ID3(DictProxy, mutagen.Metadata):
 
         if (2, 3, 0) <= self.version:
             bpi = self.__determine_bpi(data, frames)
-            while data:
-                header = data[:10]
-                try: name, size, flags = struct_unpack('>4sLH', header)
+            lazy = self.__pending is not None
+            view = memoryview(data)
+            unsynched = (2, 4, 0) <= self.version and self.f_unsynch
+            unpack_from = _frame_header_24.unpack_from
+            offset = 0
+            while offset < len(data):
+                try: name, size, flags = unpack_from(data, offset)
                 except StructError: return # not enough header
                 if name.strip(b'\x00') == b'': return
                 size = bpi(size)
-                framedata = data[10:10+size]
-                data = data[10+size:]
+                start, offset = offset, offset + 10 + size
                 if size == 0: continue # drop empty frames
+                # Frames remember if their tag was unsynchronised, as
+                # they may be decoded after another tag was loaded.
+                if unsynched: flags |= Frame.FLAG24_UNSYNCH
                 try: tag = frames[name.decode(errors="replace")]
                 except KeyError: 
-                    if is_valid_frame_id(name): yield header + framedata
+                    if is_valid_frame_id(name): yield data[start:offset]
                 else:
-                    try: yield self.__load_framedata(tag, flags, framedata)
-                    except NotImplementedError: yield header + framedata
-                    except ID3JunkFrameError: pass
+                    header = view[start:start+10]
+                    framedata = view[start+10:offset]
+                    # Frames stay undecoded views into the tag data
+                    # until someone asks for them.
+                    if lazy or not self.__wants(tag):
+                        yield (tag, flags, header, framedata)
+                    else:
+                        try: yield self.__load_framedata(tag, flags, framedata)
+                        except NotImplementedError:
+                            yield data[start:offset]
+                        except ID3JunkFrameError: pass
 
         elif (2, 2, 0) <= self.version:
-            while data:
-                header = data[0:6]
-                try: name, size = struct_unpack('>3s3s', header)
+            view = memoryview(data)
+            unpack_from = _frame_header_22.unpack_from
+            offset = 0
+            while offset < len(data):
+                try: name, sizehi, sizelo = unpack_from(data, offset)
                 except StructError: return # not enough header
-                size, = struct_unpack('>L', b'\x00'+size)
-                if name.strip(b'\x00') == '': return
-                framedata = data[6:6+size]
-                data = data[6+size:]
+                if name.strip(b'\x00') == b'': return
+                size = (sizehi << 16) | sizelo
+                start, offset = offset, offset + 6 + size
                 if size == 0: continue # drop empty frames
-                try: tag = frames[name.decode()]
+                try: tag = frames[name.decode(errors="replace")]
                 except KeyError:
-                    if is_valid_frame_id(name): yield header + framedata
+                    if is_valid_frame_id(name): yield data[start:offset]
                 else:
-                    try: yield self.__load_framedata(tag, 0, framedata)
-                    except NotImplementedError: yield header + framedata
+                    if not self.__wants(tag):
+                        yield (tag, 0, view[start:start+6],
+                               view[start+6:offset])
+                        continue
+                    try: yield self.__load_framedata(
+                        tag, 0, view[start+6:offset])
+                    except NotImplementedError: yield data[start:offset]
                     except ID3JunkFrameError: pass
 
     def __load_framedata(self, tag, flags, framedata):
         return tag.fromData(self, flags, framedata)
+
+    def __load_stored(self, tag, flags, header, framedata):
+        """Decode a frame kept undecoded by load.
+
+        Its flags say whether its own tag was unsynchronised, which
+        may not be the tag whose flags are kept (see __read_frames).
+        """
+        tagflags = self.__flags
+        self.__flags &= ~0x80
+        try: return self.__load_framedata(tag, flags, framedata)
+        finally: self.__flags = tagflags
             
     f_unsynch = property(lambda s: bool(s.__flags & 0x80))
     f_extended = property(lambda s: bool(s.__flags & 0x40))
@@ -346,7 +631,8 @@ class ID3(DictProxy, mutagen.Metadata):
 
     #f_crc = property(lambda s: bool(s.__extflags & 0x8000))
 
-    def save(self, filename=None, v1=1):
+    def save(self, filename=None, v1=1, append=False, padding=None,
+             in_place_only=False):
         """Save changes to a file.
 
         If no filename is given, the one most recently loaded is used.
@@ -355,21 +641,47 @@ class ID3(DictProxy, mutagen.Metadata):
         v1 -- if 0, ID3v1 tags will be removed
               if 1, ID3v1 tags will be updated but not added
               if 2, ID3v1 tags will be created and/or updated
+        append -- if the tag does not fit in the space of the one at the
+                  start of the file, write it to the end of the file
+                  with a footer instead of moving the audio data. The
+                  old tag is replaced by a SEEK frame pointing there.
+        padding -- a mutagen.PaddingPolicy deciding the padding after
+                   the tag. By default the old tag's space is kept if
+                   the new one fits, and otherwise the tag is padded
+                   to a multiple of 1 KiB.
+        in_place_only -- write the tag over the old one, or raise
+                         mutagen.MoveRequiredError if it doesn't fit.
+                         The rest of the space is padding. Without
+                         frames, the old tag is emptied instead of
+                         removed. With append, a tag that doesn't
+                         fit is appended.
 
         The lack of a way to update only an ID3v1 tag is intentional.
         """
 
+        if self.version < (2, 4, 0):
+            # Only ID3v2.4 frames can be copied without decoding them.
+            if self.__pending: self.__decode_pending()
+            if self.__skipped:
+                self.__decode_skipped()
+                self.update_to_v24()
+
         # Sort frames by 'importance'
         order = ["TIT2", "TPE1", "TRCK", "TALB", "TPOS", "TDRC", "TCON"]
         order = {k:i for i,k in enumerate(order)}
         last = len(order)
-        frames = self.items()
+        frames = [(key, self.__save_frame(super(ID3, self).__getitem__(key)))
+                  for key in super(ID3, self).keys()]
+        for store in [self.__pending, self.__skipped]:
+            for key, pending in (store or {}).items():
+                frames.extend([(key, self.__copy_frame(*frame))
+                               for frame in pending])
         frames.sort(key=lambda a: order.get(a[0][:4], last))
 
-        framedata = [self.__save_frame(frame) for (key, frame) in frames]
+        framedata = [data for (key, data) in frames]
         framedata.extend([data for data in self.unknown_frames
                 if len(data) > 10])
-        if not framedata:
+        if not framedata and not in_place_only:
             try:
                 self.delete(filename)
             except EnvironmentError as err:
@@ -381,63 +693,88 @@ class ID3(DictProxy, mutagen.Metadata):
         framesize = len(framedata)
 
         if filename is None: filename = self.filename
-        try: f = open(filename, 'rb+')
-        except IOError as err:
-            from errno import ENOENT
-            if err.errno != ENOENT: raise
-            f = open(filename, 'ab') # create, then reopen
-            f = open(filename, 'rb+')
+        # A tag like the one in the file, saved as it was, changes
+        # nothing. Custom padding might, though.
+        v1data = b''
+        if v1 == 2 or v1 == 1 and self.__has_v1: v1data = MakeID3v1(self)
+        state = save_state(filename, bytes(framedata).rstrip(b'\x00'), v1data)
+        if padding is None and state is not None and state == self.__state:
+            mutagen._skip_save()
+            return
+        self.__state = None
+
+        f, opened = open_for_update(filename, create=True)
         try:
             idata = f.read(10)
             try: id3, vmaj, vrev, flags, insize = struct_unpack('>3sBBB4s', idata)
-            except StructError: id3, insize = '', 0
-            insize = BitPaddedInt(insize)
-            if id3 != 'ID3': insize = -10
-
-            if insize >= framesize: outsize = insize
-            else: outsize = (framesize + 1023) & ~0x3FF
-            framedata += b'\x00' * (outsize - framesize)
-
-            framesize = BitPaddedInt.to_str(outsize, width=4)
-            flags = 0
-            header = struct_pack('>3sBBB4s', b'ID3', 4, 0, flags, byte_types[0](framesize))
-            data = header + framedata
-
-            if (insize < outsize):
-                insert_bytes(f, outsize-insize, insize+10)
-            f.seek(0)
-            f.write(data)
+            except StructError: id3, insize = b'', b''
+            insize = syncsafe_decode(insize)
+            if id3 != b'ID3': insize = -10
+
+            seekdata = None
+            if append and insize < framesize:
+                audioend, v1start = _find_tail(f)
+                if insize < 0: seekdata = b''
+                else:
+                    seekdata = self.__save_frame(
+                        SEEK(offset=audioend - insize - 10))
+                    if len(seekdata) > insize: seekdata = None
 
-            try:
-                f.seek(-128, 2)
-            except IOError as err:
-                # If the file is too small, that's OK - it just means
-                # we're certain it doesn't have a v1 tag.
-                from errno import EINVAL
-                if err.errno != EINVAL:
-                    # If we failed to see for some other reason, bail out.
-                    raise
-                # Since we're sure this isn't a v1 tag, don't read it.
+            if seekdata is None:
                 f.seek(0, 2)
-
-            data = f.read(128)
-            try:
-                idx = data.index(b"TAG")
-            except ValueError:
-                offset = 0
-                has_v1 = False
-            else:
-                offset = idx - len(data)
-                has_v1 = True
-                
-            f.seek(offset, 2)
-            if v1 == 1 and has_v1 or v1 == 2:
-                f.write(MakeID3v1(self))
+                info = mutagen.PaddingInfo(
+                    insize - framesize, f.tell() - max(insize + 10, 0),
+                    ((framesize + 1023) & ~0x3FF) - framesize)
+                outsize = framesize + info.choose(padding, in_place_only)
+                if outsize > insize:
+                    # Pad so that the space can be inserted quickly.
+                    outsize = insize + insert_size(
+                        f, outsize - insize, insize + 10)
+                    insert_bytes(f, outsize - insize, insize + 10)
+                elif outsize < insize:
+                    delete_bytes(f, insize - outsize, outsize + 10)
+                framedata += b'\x00' * (outsize - framesize)
+                report_padding(f, outsize - framesize)
+
+                framesize = syncsafe_encode(outsize)
+                flags = 0
+                header = struct_pack('>3sBBB4s', b'ID3', 4, 0, flags, framesize)
+                data = header + framedata
+
+                f.seek(0)
+                write_changed(f, data)
+                # Any appended tag was loaded and is now part of this one.
+                audioend, v1start = _find_tail(f)
+                tag = b''
             else:
-                f.truncate()
+                if insize >= 0:
+                    header = struct_pack('>3sBBB4s', b'ID3', 4, 0, 0,
+                                         syncsafe_encode(insize))
+                    f.seek(0)
+                    f.write(header + seekdata +
+                            b'\x00' * (insize - len(seekdata)))
+                # Tags with a footer have no padding.
+                report_padding(f, 0)
+                header = struct_pack('>3sBBB4s', b'ID3', 4, 0, 0x10,
+                                     syncsafe_encode(framesize))
+                tag = header + framedata + b'3DI' + header[3:]
+
+            f.seek(audioend)
+            f.write(tag)
+            has_v1 = v1 == 1 and v1start is not None or v1 == 2
+            if has_v1: write_changed(f, MakeID3v1(self))
+            end = f.tell()
+            f.seek(0, 2)
+            if f.tell() != end: f.truncate(end)
 
         finally:
-            f.close()
+            if opened: f.close()
+
+        if seekdata is None:
+            self.__has_v1 = has_v1
+            self.__state = save_state(
+                filename, bytes(framedata).rstrip(b'\x00'),
+                has_v1 and MakeID3v1(self) or b'')
 
     def delete(self, filename=None, delete_v1=True, delete_v2=True):
         """Remove tags from a file.
@@ -451,6 +788,9 @@ class ID3(DictProxy, mutagen.Metadata):
         if filename is None:
             filename = self.filename
         delete(filename, delete_v1, delete_v2)
+        self.__pending = None
+        self.__skipped = None
+        self.__state = None
         self.clear()
 
     def __save_frame(self, frame):
@@ -466,10 +806,17 @@ class ID3(DictProxy, mutagen.Metadata):
             #framedata = BitPaddedInt.to_str(usize) + framedata.encode('zlib')
             #flags |= Frame.FLAG24_COMPRESS | Frame.FLAG24_DATALEN
             pass
-        datasize = BitPaddedInt.to_str(len(framedata), width=4)
-        header = struct_pack('>4s4sH', type(frame).__name__.encode(), byte_types[0](datasize), flags)
+        datasize = syncsafe_encode(len(framedata))
+        header = struct_pack('>4s4sH', type(frame).__name__.encode(), datasize, flags)
         return header + framedata
 
+    def __copy_frame(self, tag, flags, header, framedata):
+        # The frame data is written back untouched; only the size is
+        # rewritten, since the tag may have used non-syncsafe sizes.
+        datasize = syncsafe_encode(len(framedata))
+        return struct_pack(
+            '>4s4sH', bytes(header[:4]), datasize, flags) + framedata
+
     def update_to_v24(self):
         """Convert older tags into an ID3v2.4 tag.
 
@@ -544,50 +891,133 @@ def delete(filename, delete_v1=True, delete_v2=True):
     delete_v2 -- delete any ID3v2 tag
     """
 
-    f = open(filename, 'rb+')
-
-    if delete_v1:
-        try:
-            f.seek(-128, 2)
-        except IOError: pass
-        else:
-            if f.read(3) == b"TAG":
+    f, opened = open_for_update(filename)
+    try:
+        if delete_v1:
+            try:
                 f.seek(-128, 2)
-                f.truncate()
-
-    # technically an insize=0 tag is invalid, but we delete it anyway
-    # (primarily because we used to write it)
-    if delete_v2:
-        f.seek(0, 0)
-        idata = f.read(10)
-        try: id3, vmaj, vrev, flags, insize = struct_unpack('>3sBBB4s', idata)
-        except StructError: id3, insize = '', -1
-        insize = BitPaddedInt(insize)
-        if id3 == b'ID3' and insize >= 0:
-            delete_bytes(f, insize + 10, 0)
+            except IOError: pass
+            else:
+                if f.read(3) == b"TAG":
+                    f.seek(-128, 2)
+                    f.truncate()
+
+        # technically an insize=0 tag is invalid, but we delete it anyway
+        # (primarily because we used to write it)
+        if delete_v2:
+            audioend, v1start = _find_tail(f)
+            f.seek(0, 2)
+            end = f.tell() if v1start is None else v1start
+            if audioend < end:
+                delete_bytes(f, end - audioend, audioend)
+
+            f.seek(0, 0)
+            idata = f.read(10)
+            try: id3, vmaj, vrev, flags, insize = struct_unpack('>3sBBB4s', idata)
+            except StructError: id3, insize = b'', b''
+            if id3 == b'ID3':
+                delete_bytes(f, syncsafe_decode(insize) + 10, 0)
+    finally:
+        if opened: f.close()
+
+# Frames update_to_v24 turns into ones with other IDs.
+_V23_SOURCES = {"TDRC": ["TYER", "TDAT", "TIME"], "TDOR": ["TORY"],
+                "TIPL": ["IPLS"]}
+
+def _frame_id(tag):
+    """Return the ID3v2.3/2.4 ID of a frame class."""
+    name = tag.__name__
+    if len(name) == 3 and len(tag.__base__.__name__) == 4:
+        return tag.__base__.__name__
+    return name
+
+def _find_appended(fileobj, end):
+    """Return the offset of an ID3v2.4 tag with a footer ending at end.
+
+    Returns None if there is no such tag.
+    """
+    if end < 20: return None
+    fileobj.seek(end - 10)
+    footer = fileobj.read(10)
+    try: id3, vmaj, vrev, flags, size = struct_unpack('>3sBBB4s', footer)
+    except StructError: return None
+    if id3 != b'3DI' or vmaj != 4: return None
+    start = end - syncsafe_decode(size) - 20
+    if start < 0: return None
+    fileobj.seek(start)
+    if fileobj.read(10) != b'ID3' + footer[3:]: return None
+    return start
+
+def _find_tail(fileobj):
+    """Return where the audio data ends and where the ID3v1 tag starts.
+
+    The audio data ends before any appended ID3v2.4 tag and ID3v1
+    tag. The ID3v1 offset is None if the file has no such tag.
+    """
+    fileobj.seek(0, 2)
+    filesize = fileobj.tell()
+    start = _find_appended(fileobj, filesize)
+    if start is not None: return start, None
+
+    fileobj.seek(max(filesize - 128, 0))
+    data = fileobj.read(128)
+    try: v1start = filesize - len(data) + data.index(b"TAG")
+    except ValueError: v1start = None
+    end = filesize if v1start is None else v1start
+    start = _find_appended(fileobj, end)
+    return (end if start is None else start), v1start
+
+_uint32_be = Struct('>L')
+
+def syncsafe_int(value):
+    """Read a 32 bit integer as four big-endian 7 bit syncsafe bytes."""
+    return (((value & 0x7f000000) >> 3) | ((value & 0x7f0000) >> 2) |
+            ((value & 0x7f00) >> 1) | (value & 0x7f))
+
+def syncsafe_decode(data):
+    """Return the value of a 4 byte syncsafe integer as a plain int.
+
+    This is the common case of BitPaddedInt(data); other lengths fall
+    back to it.
+    """
+    try: value, = _uint32_be.unpack(data)
+    except StructError: return int(BitPaddedInt(data))
+    return syncsafe_int(value)
+
+def syncsafe_encode(value):
+    """Return value as a 4 byte syncsafe integer string.
+
+    This is the common case of BitPaddedInt.to_str(value).
+    """
+    if not 0 <= value < 0x10000000:
+        raise ValueError('Value too wide (%d)' % value)
+    return _uint32_be.pack(((value & 0xfe00000) << 3) |
+                           ((value & 0x1fc000) << 2) |
+                           ((value & 0x3f80) << 1) | (value & 0x7f))
 
 class BitPaddedInt(int):
     def __new__(cls, value, bits=7, bigendian=True):
         "Strips 8-bits bits out of every byte"
-        mask = (1<<(bits))-1
-        if isinstance(value, int):
-            bytelist = []
-            while value:
-                bytelist.append(value & ((1<<bits)-1))
-                value = value >> 8
-        if isinstance(value, byte_types):
-            bytelist = [byte & mask for byte in bytearray(value)]
-            if bigendian: bytelist.reverse()
-        elif isinstance(value, text_type):
-            bytelist = [ord(byte) & mask for byte in value]
-            if bigendian: bytelist.reverse()
-        numeric_value = 0
-        for shift, byte in zip(list(range(0, len(bytelist)*bits, bits)), bytelist):
-            numeric_value += byte << shift
-        if isinstance(numeric_value, int):
-            self = int.__new__(BitPaddedLong, numeric_value)
+        if bits == 7 and bigendian and isinstance(value, byte_types) \
+                and len(value) == 4:
+            numeric_value = syncsafe_decode(value)
         else:
-            self = int.__new__(BitPaddedInt, numeric_value)
+            mask = (1<<(bits))-1
+            if isinstance(value, int):
+                bytelist = []
+                while value:
+                    bytelist.append(value & ((1<<bits)-1))
+                    value = value >> 8
+            if isinstance(value, byte_types):
+                bytelist = [byte & mask for byte in bytearray(value)]
+                if bigendian: bytelist.reverse()
+            elif isinstance(value, text_type):
+                bytelist = [ord(byte) & mask for byte in value]
+                if bigendian: bytelist.reverse()
+            numeric_value = 0
+            for shift, byte in zip(list(range(0, len(bytelist)*bits, bits)), bytelist):
+                numeric_value += byte << shift
+        self = int.__new__(BitPaddedLong, numeric_value)
         self.bits = bits
         self.bigendian = bigendian
         return self
@@ -596,6 +1026,8 @@ class BitPaddedInt(int):
         bits = getattr(value, 'bits', bits)
         bigendian = getattr(value, 'bigendian', bigendian)
         value = int(value)
+        if bits == 7 and bigendian and width == 4 and value < 0x10000000:
+            return bytearray(syncsafe_encode(value))
         mask = (1<<bits)-1
         bytelist = []
         while value:
@@ -616,53 +1048,65 @@ class BitPaddedLong(int):
     to_str = staticmethod(as_str)
 
 class unsynch(object):
+    """The ID3 unsynchronisation scheme.
+
+    Unsynchronisation puts a 0x00 after every 0xFF that is followed
+    by 0x00 or a byte of 0xE0 or more, and after a trailing 0xFF, so
+    the data can never contain an MPEG sync. Both directions work on
+    whole buffers with bytes.replace and precompiled patterns.
+    """
+
+    __invalid = re.compile(b'\xff[\xe0-\xff]')
+    __needs_zero = re.compile(b'\xff(?=[\x00\xe0-\xff])')
+
     def decode(value):
-        output = []
-        safe = True
-        append = output.append
-        for val in value:
-            if safe:
-                append(val)
-                safe = val != 255
-            else:
-                if val >= 224: raise ValueError('invalid sync-safe string')
-                elif val != 0: append(val)
-                safe = True
-        if not safe: raise ValueError('string ended unsafe')
-        return bytearray(output)
+        if not isinstance(value, byte_types):
+            value = bytes(value)
+        if unsynch.__invalid.search(value):
+            raise ValueError('invalid sync-safe string')
+        if value.endswith(b'\xff'):
+            raise ValueError('string ended unsafe')
+        return bytearray(value.replace(b'\xff\x00', b'\xff'))
     decode = staticmethod(decode)
 
     def encode(value):
-        output = []
-        safe = True
-        append = output.append
-        for val in value:
-            if safe:
-                append(val)
-                if val == 255: safe = False
-            elif val == 0 or val >= 224:
-                append(0)
-                append(val)
-                safe = val != 255
-            else:
-                append(val)
-                safe = True
-        if not safe: append(0)
-        return bytearray(output)
+        if not isinstance(value, byte_types):
+            value = bytes(value)
+        output = bytearray(unsynch.__needs_zero.sub(b'\xff\x00', value))
+        if output.endswith(b'\xff'): output.append(0)
+        return output
     encode = staticmethod(encode)
 
 class Spec(object):
+    """A field of a frame.
+
+    Specs read their value with read_at(frame, data, offset), which
+    returns the value and the offset just past it, so a frame can be
+    read without copying what is left of its data for every field.
+    read(frame, data) returns the value and the remaining data instead.
+    Subclasses need to implement one of the two.
+    """
+
     def __init__(self, name): self.name = name
     def __hash__(self): raise TypeError("Spec objects are unhashable")
 
+    def read(self, frame, data):
+        value, offset = self.read_at(frame, data, 0)
+        return value, data[offset:]
+
+    def read_at(self, frame, data, offset):
+        value, data_left = self.read(frame, data[offset:])
+        return value, len(data) - len(data_left)
+
 class ByteSpec(Spec):
-    def read(self, frame, data): return data[0], data[1:]
+    def read_at(self, frame, data, offset):
+        return data[offset], offset + 1
     def write(self, frame, value): return bytearray([value])
     def validate(self, frame, value): return value
 
 class IntegerSpec(Spec):
-    def read(self, frame, data):
-        return int(BitPaddedInt(data, bits=8)), b''
+    def read_at(self, frame, data, offset):
+        return int(BitPaddedInt(data[offset:], bits=8)), len(data)
     def write(self, frame, value):
         return BitPaddedInt.to_str(value, bits=8, width=-1)
     def validate(self, frame, value):
@@ -671,18 +1115,19 @@ class IntegerSpec(Spec):
 class SizedIntegerSpec(Spec):
     def __init__(self, name, size):
         self.name, self.__sz = name, size
-    def read(self, frame, data):
-        return int(BitPaddedInt(data[:self.__sz], bits=8)), data[self.__sz:]
+    def read_at(self, frame, data, offset):
+        end = min(offset + self.__sz, len(data))
+        return int(BitPaddedInt(data[offset:end], bits=8)), end
     def write(self, frame, value):
         return BitPaddedInt.to_str(value, bits=8, width=self.__sz)
     def validate(self, frame, value):
         return value
 
 class EncodingSpec(ByteSpec):
-    def read(self, frame, data):
-        enc, data = super(EncodingSpec, self).read(frame, data)
-        if enc < 16: return enc, data
-        else: return 0, bytearray([enc])+data
+    def read_at(self, frame, data, offset):
+        enc = data[offset]
+        if enc < 16: return enc, offset + 1
+        else: return 0, offset
 
     def validate(self, frame, value):
         if value is None: return None
@@ -693,7 +1138,9 @@ class StringSpec(Spec):
     def __init__(self, name, length):
         super(StringSpec, self).__init__(name)
         self.len = length
-    def read(s, frame, data): return data[:s.len], data[s.len:]
+    def read_at(s, frame, data, offset):
+        end = min(offset + s.len, len(data))
+        return data[offset:end], end
     def write(s, frame, value):
         if value is None: return b'\x00' * s.len
         elif isinstance(value, byte_types): return (value + b'\x00' * s.len)[:s.len]
@@ -704,7 +1151,8 @@ class StringSpec(Spec):
         raise ValueError('Invalid StringSpec[%d] data: %r' % (s.len, value))
 
 class BinaryDataSpec(Spec):
-    def read(self, frame, data): return data, b''
+    def read_at(self, frame, data, offset):
+        return data[offset:], len(data)
     def write(self, frame, value):
         if isinstance(value, text_type):
             return value.encode('utf-8')
@@ -719,23 +1167,18 @@ class EncodedTextSpec(Spec):
     _encodings = ( ('latin1', b'\x00'), ('utf16', b'\x00\x00'),
                    ('utf_16_be', b'\x00\x00'), ('utf8', b'\x00') )
 
-    def read(self, frame, data):
+    def read_at(self, frame, data, offset):
         enc, term = self._encodings[frame.encoding]
-        ret = b''
-        if len(term) == 1:
-            if term in data:
-                data, ret = data.split(term, 1)
-        else:
-            offset = -1
-            try:
-                while True:
-                    offset = data.index(term, offset+1)
-                    if offset & 1: continue
-                    data, ret = data[0:offset], data[offset+2:]; break
-            except ValueError: pass
+        end = data.find(term, offset)
+        if len(term) != 1:
+            # the terminator has to be aligned to a character
+            while end != -1 and (end - offset) & 1:
+                end = data.find(term, end + 1)
+        if end == -1: end = next = len(data)
+        else: next = end + len(term)
 
-        if len(data) < len(term): return '', ret
-        return data.decode(enc), ret
+        if end - offset < len(term): return '', next
+        return data[offset:end].decode(enc), next
 
     def write(self, frame, value):
         enc, term = self._encodings[frame.encoding]
@@ -747,17 +1190,25 @@ class MultiSpec(Spec):
         super(MultiSpec, self).__init__(name)
         self.specs = specs
         self.sep = kw.get('sep')
+        self.__readers = [_spec_reader(spec) for spec in specs]
 
-    def read(self, frame, data):
+    def read_at(self, frame, data, offset):
         values = []
-        while data:
-            record = []
-            for spec in self.specs:
-                value, data = spec.read(frame, data)
-                record.append(value)
-            if len(self.specs) != 1: values.append(record)
-            else: values.append(record[0])
-        return values, data
+        end = len(data)
+        readers = self.__readers
+        if len(readers) == 1:
+            read_at = readers[0]
+            while offset < end:
+                value, offset = read_at(frame, data, offset)
+                values.append(value)
+        else:
+            while offset < end:
+                record = []
+                for read_at in readers:
+                    value, offset = read_at(frame, data, offset)
+                    record.append(value)
+                values.append(record)
+        return values, offset
 
     def write(self, frame, value):
         data = []
@@ -787,16 +1238,29 @@ class EncodedNumericTextSpec(EncodedTextSpec): pass
 class EncodedNumericPartTextSpec(EncodedTextSpec): pass
 
 class Latin1TextSpec(EncodedTextSpec):
-    def read(self, frame, data):
-        if b'\x00' in data: data, ret = data.split(b'\x00', 1)
-        else: ret = b''
-        return data.decode('latin1'), ret
+    def read_at(self, frame, data, offset):
+        end = data.find(b'\x00', offset)
+        if end == -1: end = next = len(data)
+        else: next = end + 1
+        return data[offset:end].decode('latin1'), next
 
     def write(self, data, value):
         return value.encode('latin1') + b'\x00'
 
     def validate(self, frame, value): return str(value)
 
+def _spec_reader(spec):
+    """Return a read_at function for spec.
+
+    Specs written before read_at existed only override read, and
+    inherit a read_at from a builtin Spec that would ignore that.
+    """
+    for cls in type(spec).__mro__:
+        if 'read_at' in cls.__dict__:
+            return spec.read_at
+        elif 'read' in cls.__dict__:
+            return partial(Spec.read_at, spec)
+
 @total_ordering
 class ID3TimeStamp(object):
     """A time stamp in ID3v2 format.
@@ -847,9 +1311,9 @@ class ID3TimeStamp(object):
     def encode(self, *args): return self.text.encode(*args)
 
 class TimeStampSpec(EncodedTextSpec):
-    def read(self, frame, data):
-        value, data = super(TimeStampSpec, self).read(frame, data)
-        return self.validate(frame, value), data
+    def read_at(self, frame, data, offset):
+        value, offset = super(TimeStampSpec, self).read_at(frame, data, offset)
+        return self.validate(frame, value), offset
 
     def write(self, frame, data):
         return super(TimeStampSpec, self).write(frame,
@@ -864,29 +1328,31 @@ class ChannelSpec(ByteSpec):
      BACKCENTRE, SUBWOOFER) = list(range(9))
 
 class VolumeAdjustmentSpec(Spec):
-    def read(self, frame, data):
-        value, = struct_unpack('>h', data[0:2])
-        return value/512.0, data[2:]
+    __struct = Struct('>h')
+
+    def read_at(self, frame, data, offset):
+        value, = self.__struct.unpack_from(data, offset)
+        return value/512.0, offset + 2
 
     def write(self, frame, value):
-        return struct_pack('>h', int(round(value * 512)))
+        return self.__struct.pack(int(round(value * 512)))
 
     def validate(self, frame, value): return value
 
 class VolumePeakSpec(Spec):
-    def read(self, frame, data):
+    def read_at(self, frame, data, offset):
         # http://bugs.xmms.org/attachment.cgi?id=113&action=view
         peak = 0
-        bits = data[0]
+        bits = data[offset]
         byte = min(4, (bits + 7) >> 3)
         # not enough frame data
-        if byte + 1 > len(data): raise ID3JunkFrameError
+        if offset + byte + 1 > len(data): raise ID3JunkFrameError
         shift = ((8 - (bits & 7)) & 7) + (4 - byte) * 8
-        for i in range(1, byte+1):
+        for i in range(offset + 1, offset + byte + 1):
             peak *= 256
             peak += data[i]
         peak *= 2**shift
-        return (float(peak) / (2**31-1)), data[1+byte:]
+        return (float(peak) / (2**31-1)), offset + 1 + byte
 
     def write(self, frame, value):
         # always write as 16 bits for sanity.
@@ -895,20 +1361,22 @@ class VolumePeakSpec(Spec):
     def validate(self, frame, value): return value
 
 class SynchronizedTextSpec(EncodedTextSpec):
-    def read(self, frame, data):
+    __time = Struct('>I')
+
+    def read_at(self, frame, data, offset):
         texts = []
         encoding, term = self._encodings[frame.encoding]
-        while data:
-            l = len(term)
-            try:
-                value_idx = data.index(term)
-            except ValueError:
+        l = len(term)
+        unpack = self.__time.unpack
+        while offset < len(data):
+            value_idx = data.find(term, offset)
+            if value_idx == -1:
                 raise ID3JunkFrameError
-            value = data[:value_idx].decode(encoding)
-            time, = struct_unpack(">I", data[value_idx+l:value_idx+l+4])
+            value = data[offset:value_idx].decode(encoding)
+            time, = unpack(data[value_idx+l:value_idx+l+4])
             texts.append((value, time))
-            data = data[value_idx+l+4:]
-        return texts, b""
+            offset = value_idx + l + 4
+        return texts, len(data)
 
     def write(self, frame, value):
         data = []
@@ -922,12 +1390,15 @@ class SynchronizedTextSpec(EncodedTextSpec):
         return value
 
 class KeyEventSpec(Spec):
-    def read(self, frame, data):
+    __struct = Struct('>bI')
+
+    def read_at(self, frame, data, offset):
         events = []
-        while len(data) >= 5:
-            events.append(struct_unpack(">bI", data[:5]))
-            data = data[5:]
-        return events, data
+        unpack_from = self.__struct.unpack_from
+        while len(data) - offset >= 5:
+            events.append(unpack_from(data, offset))
+            offset += 5
+        return events, offset
 
     def write(self, frame, value):
         return b"".join(struct_pack(">bI", *event) for event in value)
@@ -937,16 +1408,19 @@ class KeyEventSpec(Spec):
 
 class VolumeAdjustmentsSpec(Spec):
     # Not to be confused with VolumeAdjustmentSpec.
-    def read(self, frame, data):
+    __struct = Struct('>Hh')
+
+    def read_at(self, frame, data, offset):
         adjustments = {}
-        while len(data) >= 4:
-            freq, adj = struct_unpack(">Hh", data[:4])
-            data = data[4:]
+        unpack_from = self.__struct.unpack_from
+        while len(data) - offset >= 4:
+            freq, adj = unpack_from(data, offset)
+            offset += 4
             freq /= 2.0
             adj /= 512.0
             adjustments[freq] = adj
         adjustments = sorted(list(adjustments.items()))
-        return adjustments, data
+        return adjustments, offset
 
     def write(self, frame, value):
         value.sort()
@@ -957,7 +1431,7 @@ class VolumeAdjustmentsSpec(Spec):
         return value
 
 class ASPIIndexSpec(Spec):
-    def read(self, frame, data):
+    def read_at(self, frame, data, offset):
         if frame.b == 16:
             format = "H"
             size = 2
@@ -966,11 +1440,12 @@ class ASPIIndexSpec(Spec):
             size = 1
         else:
             warn("invalid bit count in ASPI (%d)" % frame.b, ID3Warning)
-            return [], data
-        
-        indexes = data[:frame.N * size]
-        data = data[frame.N * size:]
-        return list(struct_unpack(">" + format * frame.N, indexes)), data
+            return [], offset
+
+        end = offset + frame.N * size
+        indexes = data[offset:end]
+        return (list(struct_unpack(">" + format * frame.N, indexes)),
+                min(end, len(data)))
 
     def write(self, frame, values):
         if frame.b == 16: format = "H"
@@ -981,6 +1456,44 @@ class ASPIIndexSpec(Spec):
     def validate(self, frame, values):
         return values
 
+def _compile_codec(Kind):
+    """Build a reader and a writer for a Frame subclass.
+
+    The reader sets each field in _framespec and then _optionalspec
+    from one buffer, moving an offset along it rather than slicing
+    off what is left after every field, and returns the offset where
+    it stopped. The writer returns the frame's data.
+    """
+    required = tuple((spec.name, _spec_reader(spec), spec.write)
+                     for spec in Kind._framespec)
+    optional = tuple((spec.name, _spec_reader(spec), spec.write)
+                     for spec in getattr(Kind, '_optionalspec', []))
+
+    def read(frame, data):
+        offset, end = 0, len(data)
+        try:
+            for name, read_at, write in required:
+                if offset >= end: raise ID3JunkFrameError
+                value, offset = read_at(frame, data, offset)
+                setattr(frame, name, value)
+            for name, read_at, write in optional:
+                if offset >= end: break
+                value, offset = read_at(frame, data, offset)
+                setattr(frame, name, value)
+        except UnicodeDecodeError:
+            raise ID3JunkFrameError
+        return offset
+
+    def write(frame):
+        data = [write(frame, getattr(frame, name))
+                for name, read_at, write in required]
+        for name, read_at, write in optional:
+            try: data.append(write(frame, getattr(frame, name)))
+            except AttributeError: break
+        return bytearray().join(data)
+
+    return read, write
+
 class Frame(object):
     """Fundamental unit of ID3 data.
 
@@ -1037,25 +1550,27 @@ class Frame(object):
             kw.append('%s=%r' % (attr.name, getattr(self, attr.name)))
         return '%s(%s)' % (type(self).__name__, ', '.join(kw))
 
+    def _get_codec(cls):
+        """Return a (reader, writer) pair for this frame class.
+
+        They are built from the class's specs the first time they are
+        needed and cached on the class; see _compile_codec.
+        """
+        codec = cls.__dict__.get('_codec')
+        if codec is None:
+            codec = cls._codec = _compile_codec(cls)
+        return codec
+    _get_codec = classmethod(_get_codec)
+
     def _readData(self, data):
-        odata = data
-        for reader in self._framespec:
-            if len(data):
-                try: value, data = reader.read(self, data)
-                except UnicodeDecodeError:
-                    raise ID3JunkFrameError
-            else: raise ID3JunkFrameError
-            setattr(self, reader.name, value)
-        if data.strip(b'\x00'):
+        offset = self._get_codec()[0](self, data)
+        if data[offset:].strip(b'\x00'):
             warn('Leftover data: %s: %r (from %r)' % (
-                    type(self).__name__, data, odata),
+                    type(self).__name__, data[offset:], data),
                     ID3Warning)
 
     def _writeData(self):
-        data = []
-        for writer in self._framespec:
-            data.append(writer.write(self, getattr(self, writer.name)))
-        return bytearray(b'').join(data)
+        return self._get_codec()[1](self)
 
     def pprint(self):
         """Return a human-readable representation of the frame."""
@@ -1065,8 +1580,12 @@ class Frame(object):
         return "[unrepresentable data]"
 
     def fromData(cls, id3, tflags, data):
-        """Construct this ID3 frame from raw string data."""
-        data = bytearray(data)
+        """Construct this ID3 frame from raw string data.
+
+        data may be any buffer, e.g. a memoryview into the whole tag;
+        it is copied once, after any decompression or unsynchronisation.
+        """
+        data = memoryview(data)
 
         if (2, 4, 0) <= id3.version:
             if tflags & (Frame.FLAG24_COMPRESS | Frame.FLAG24_DATALEN):
@@ -1080,7 +1599,7 @@ class Frame(object):
                 try: data = unsynch.decode(data)
                 except ValueError as err:
                     if id3.PEDANTIC:
-                        raise ID3BadUnsynchData('%s: %r' % (err, data))
+                        raise ID3BadUnsynchData('%s: %r' % (err, bytes(data)))
             if tflags & Frame.FLAG24_ENCRYPT:
                 raise ID3EncryptionUnsupportedError
             if tflags & Frame.FLAG24_COMPRESS:
@@ -1088,7 +1607,7 @@ class Frame(object):
                 except zlibError as err:
                     # the initial mutagen that went out with QL 0.12 did not
                     # write the 4 bytes of uncompressed size. Compensate.
-                    data = datalen_bytes + data
+                    data = bytes(datalen_bytes) + bytes(data)
                     try: data = decompress(data)
                     except zlibError as err:
                         if id3.PEDANTIC:
@@ -1104,8 +1623,11 @@ class Frame(object):
                 try: data = decompress(data)
                 except zlibError as err:
                     if id3.PEDANTIC:
-                        raise ID3BadCompressedData('%s: %r' % (err, data))
+                        raise ID3BadCompressedData(
+                            '%s: %r' % (err, bytes(data)))
 
+        if not isinstance(data, bytearray):
+            data = bytearray(data)
         frame = cls()
         frame._rawdata = data
         frame._flags = tflags
@@ -1132,31 +1654,6 @@ class FrameOpt(Frame):
                 setattr(self, spec.name, validated)
             else: break
 
-    def _readData(self, data):
-        odata = data
-        for reader in self._framespec:
-            if len(data): value, data = reader.read(self, data)
-            else: raise ID3JunkFrameError
-            setattr(self, reader.name, value)
-        if data:
-            for reader in self._optionalspec:
-                if len(data): value, data = reader.read(self, data)
-                else: break
-                setattr(self, reader.name, value)
-        if data.strip(b'\x00'):
-            warn('Leftover data: %s: %r (from %r)' % (
-                    type(self).__name__, data, odata),
-                    ID3Warning)
-
-    def _writeData(self):
-        data = []
-        for writer in self._framespec:
-            data.append(writer.write(self, getattr(self, writer.name)))
-        for writer in self._optionalspec:
-            try: data.append(writer.write(self, getattr(self, writer.name)))
-            except AttributeError: break
-        return bytearray().join(data)
-
     def __repr__(self):
         kw = []
         for attr in self._framespec:
@@ -1832,7 +2329,8 @@ class SIGN(Frame):
 class SEEK(Frame):
     """Seek frame.
 
-    Mutagen does not find tags at seek offsets.
+    Mutagen follows it to load an appended tag, and only writes it
+    when saving with append=True.
     """
     _framespec = [ IntegerSpec('offset') ]
     def __pos__(self): return self.offset
@@ -2061,6 +2559,7 @@ class ID3FileType(mutagen.FileType):
         A custom tag reader may be used in instead of the default
         mutagen.id3.ID3 object, e.g. an EasyID3 reader.
         """
+        self._check_tags()
         if ID3 is None:
             ID3 = self.ID3
         if self.tags is None:
@@ -2069,7 +2568,8 @@ class ID3FileType(mutagen.FileType):
         else:
             raise error("an ID3 tag already exists")
 
-    def load(self, filename, ID3=None, **kwargs):
+    def load(self, filename, ID3=None, fileobj=None, tags=True, info=True,
+             **kwargs):
         """Load stream and tag information from a file.
 
         A custom tag reader may be used in instead of the default
@@ -2081,18 +2581,26 @@ class ID3FileType(mutagen.FileType):
             # If this was initialized with EasyID3, remember that for
             # when tags are auto-instantiated in add_tags.
             self.ID3 = ID3
-        self.filename = filename
-        try: self.tags = ID3(filename, **kwargs)
-        except error: self.tags = None
-        if self.tags is not None:
-            try: offset = self.tags.size
-            except AttributeError: offset = None
-        else: offset = None
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        self.tags = self.info = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
-            fileobj = open(filename, "rb")
-            self.info = self._Info(fileobj, offset)
+            offset = None
+            if tags:
+                try: self.tags = ID3(filename, fileobj=fileobj, **kwargs)
+                except error: pass
+                else: offset = getattr(self.tags, "size", None)
+            elif info:
+                # Skip a tag without reading it.
+                header = fileobj.read(10)
+                if len(header) == 10 and header[:3] == b"ID3":
+                    offset = syncsafe_decode(header[6:10]) + 10
+            if info:
+                fileobj.seek(0)
+                self.info = self._Info(fileobj, offset)
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
 
 
 def a():
@@ -29,7 +29,7 @@ from struct import error as struct_error
 
 from mutagen import FileType, Metadata
 from mutagen._constants import GENRES
-from mutagen._util import cdata, insert_bytes, delete_bytes, DictProxy, struct_pack, struct_unpack, struct_calcsize, text_type, string_types
+from mutagen._util import cdata, insert_bytes, delete_bytes, DictProxy, struct_pack, struct_unpack, struct_calcsize, text_type, string_types, open_fileobj, source_name
 
 class error(IOError): pass
 class M4AMetadataError(error): pass
@@ -474,23 +474,28 @@ class M4A(FileType):
 
     _mimes = ["audio/mp4", "audio/x-m4a", "audio/mpeg4", "audio/aac"]
 
-    def load(self, filename):
-        self.filename = filename
-        fileobj = open(filename, "rb")
+    def load(self, filename, fileobj=None, tags=True, info=True):
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        self.tags = self.info = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
             atoms = Atoms(fileobj)
-            try: self.info = M4AInfo(atoms, fileobj)
-            except Exception as err:
-                raise M4AStreamInfoError(err)
-            try: self.tags = M4ATags(atoms, fileobj)
-            except M4AMetadataError:
-                self.tags = None
-            except Exception as err:
-                raise M4AMetadataError(err)
+            if info:
+                try: self.info = M4AInfo(atoms, fileobj)
+                except Exception as err:
+                    raise M4AStreamInfoError(err)
+            if tags:
+                try: self.tags = M4ATags(atoms, fileobj)
+                except M4AMetadataError:
+                    self.tags = None
+                except Exception as err:
+                    raise M4AMetadataError(err)
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
 
     def add_tags(self):
+        self._check_tags()
         self.tags = M4ATags()
 
     def score(filename, fileobj, header):
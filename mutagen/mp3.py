@@ -9,10 +9,9 @@ from __future__ import division
 
 """MPEG audio stream information and tags."""
 
-import os
 from struct import error as struct_error
 
-from mutagen.id3 import ID3FileType, BitPaddedInt, delete
+from mutagen.id3 import ID3FileType, syncsafe_decode, delete
 from mutagen._util import struct_unpack
 
 __all__ = ["MP3", "Open", "delete", "MP3"]
@@ -77,18 +76,16 @@ class MPEGInfo(object):
         loading files significantly faster.
         """
 
-        try: size = os.path.getsize(fileobj.name)
-        except (IOError, OSError, AttributeError):
-            fileobj.seek(0, 2)
-            size = fileobj.tell()
+        fileobj.seek(0, 2)
+        size = fileobj.tell()
 
         # If we don't get an offset, try to skip an ID3v2 tag.
         if offset is None:
             fileobj.seek(0, 0)
             idata = fileobj.read(10)
             try: id3, insize = struct_unpack('>3sxxx4s', idata)
-            except struct_error: id3, insize = '', 0
-            insize = BitPaddedInt(insize)
+            except struct_error: id3, insize = b'', b''
+            insize = syncsafe_decode(insize)
             if id3 == b'ID3' and insize > 0:
                 offset = insize
             else: offset = 0
@@ -22,9 +22,10 @@ consulted.
 
 import sys
 
-from mutagen import FileType, Metadata
+import mutagen
+from mutagen import FileType, Metadata, PaddingInfo, MoveRequiredError
 from mutagen._constants import GENRES
-from mutagen._util import cdata, insert_bytes, DictProxy, utf8, text_type, string_types, byte_types, struct_pack, struct_unpack, struct_calcsize, reraise
+from mutagen._util import cdata, insert_bytes, insert_size, delete_bytes, DictProxy, utf8, text_type, string_types, byte_types, struct_pack, struct_unpack, struct_calcsize, reraise, open_fileobj, open_for_update, report_padding, save_state, write_changed, source_name
 
 class error(IOError): pass
 class MP4MetadataError(error): pass
@@ -180,6 +181,9 @@ class Atoms(object):
     def __repr__(self):
         return "\n".join([repr(child) for child in self.atoms])
 
+# Atoms loaded under another key, which keys= must read together.
+_ALIASES = {b"\xa9gen": [b"gnre"], b"gnre": [b"\xa9gen"]}
+
 class MP4Tags(DictProxy, Metadata):
     """Dictionary containing Apple iTunes metadata list key/values.
 
@@ -239,17 +243,103 @@ class MP4Tags(DictProxy, Metadata):
     so this class should not be manually instantiated.
 
     Unknown non-text tags are removed.
+
+    If keys is given when loading, only those keys are read. The other
+    atoms are copied back from the loaded file when saving, unless
+    their key has been set or deleted.
     """
 
-    def load(self, atoms, fileobj):
+    __wanted = None
+    __skipped = None
+    __source = None
+    __state = None
+
+    def load(self, atoms, fileobj, keys=None):
         try: ilst = atoms["moov.udta.meta.ilst"]
         except KeyError as key:
             raise MP4MetadataError(key)
+        self.__wanted = None
+        self.__skipped = None
+        if keys is not None:
+            self.__wanted = set()
+            for key in keys:
+                if isinstance(key, text_type): key = key.encode()
+                self.__wanted.add(key)
+                self.__wanted.update(_ALIASES.get(key, ()))
+            self.__skipped = self.__skip(fileobj, ilst)
+            self.__source = source_name(fileobj)
         for atom in ilst.children:
+            if not self.__wants(atom.name): continue
             fileobj.seek(atom.offset + 8)
             data = fileobj.read(atom.length - 8)
             info = self.__atoms.get(atom.name, (type(self).__parse_text, None))
             info[0](self, atom, data, *info[2:])
+        if self.__wanted is not None:
+            for key in self.keys():
+                if key not in self.__wanted: del(self[key])
+        else:
+            # Saving these tags again only rewrites the ilst atom if
+            # there is no free atom before it to merge.
+            meta = atoms.path("moov", "udta", "meta")[-1]
+            index = meta.children.index(ilst)
+            if not (index > 0 and meta.children[index - 1].name == b"free"):
+                fileobj.seek(ilst.offset)
+                self.__state = save_state(
+                    source_name(fileobj), fileobj.read(ilst.length))
+
+    def __wants(self, name, key=None):
+        """Return whether load reads atoms with this name, or keeps
+        the freeform key."""
+        wanted = self.__wanted
+        if wanted is None: return True
+        if name == b"----" and key is not None: return key in wanted
+        return name in [k[:4] for k in wanted]
+
+    def __skip(self, fileobj, ilst):
+        """Return [key, offset, length, data] for the atoms in ilst that
+        load skips. Their data is read when saving, unless the file
+        has no name to reopen it by."""
+        skipped = []
+        keep = source_name(fileobj) is None
+        for atom in ilst.children:
+            data = None
+            if atom.name == b"----":
+                fileobj.seek(atom.offset)
+                data = fileobj.read(atom.length)
+                key = self.__freeform_key(atom, data[8:])[0]
+                if self.__wants(atom.name, key): continue
+            else:
+                if self.__wants(atom.name): continue
+                key = atom.name
+                if keep:
+                    fileobj.seek(atom.offset)
+                    data = fileobj.read(atom.length)
+            skipped.append([key, atom.offset, atom.length, data])
+        return skipped
+
+    def __read_skipped(self):
+        """Return the skipped atoms whose keys have not been set since."""
+        unread = [atom for atom in self.__skipped if atom[3] is None]
+        if unread:
+            fileobj = open(self.__source, "rb")
+            try:
+                for atom in unread:
+                    fileobj.seek(atom[1])
+                    atom[3] = fileobj.read(atom[2])
+                    if len(atom[3]) != atom[2]:
+                        raise error("file said %d bytes, read %d bytes" % (
+                            atom[2], len(atom[3])))
+            finally:
+                fileobj.close()
+        return [atom[3] for atom in self.__skipped if atom[0] not in self]
+
+    def __delitem__(self, key):
+        if self.__skipped:
+            skipped = [atom for atom in self.__skipped if atom[0] != key]
+            if len(skipped) != len(self.__skipped):
+                self.__skipped = skipped
+                if key not in self: return
+        super(MP4Tags, self).__delitem__(key)
 
     def __key_sort(item):
         (key, v) = item
@@ -267,9 +357,22 @@ class MP4Tags(DictProxy, Metadata):
         return (order.get(key[:4], last), len(str(v)), str(v))
     __key_sort = staticmethod(__key_sort)
 
-    def save(self, filename):
-        """Save the metadata to the given filename."""
+    def save(self, filename, padding=None, in_place_only=False):
+        """Save the metadata to the given filename.
+
+        padding is a mutagen.PaddingPolicy deciding the size of the
+        free atom after the ilst atom. By default the old space is
+        kept if the new atom fits, and otherwise it is padded to a
+        multiple of 1 KiB.
+
+        If in_place_only is true, the ilst atom is written in the
+        space of the old one and the free atoms next to it, or
+        mutagen.MoveRequiredError is raised if it doesn't fit. Files
+        without an ilst atom never have room.
+        """
         values = []
+        if self.__wanted is not None:
+            skipped = self.__read_skipped()
         items = list(self.items())
         items.sort(key=self.__key_sort)
         for key, value in items:
@@ -278,44 +381,80 @@ class MP4Tags(DictProxy, Metadata):
                 values.append(info[1](self, key, value, *info[2:]))
             except (TypeError, ValueError) as s:
                 reraise(MP4MetadataValueError, s, sys.exc_info()[2])
-        data = Atom.render("ilst", bytearray().join(values))
+
+        if padding is None and self.__wanted is None:
+            state = save_state(
+                filename, Atom.render("ilst", bytearray().join(values)))
+            if state is not None and state == self.__state:
+                mutagen._skip_save()
+                return
+        self.__state = None
+        if self.__wanted is not None: values.extend(skipped)
 
         # Find the old atoms.
-        fileobj = open(filename, "rb+")
+        fileobj, opened = open_for_update(filename)
         try:
             atoms = Atoms(fileobj)
             try:
                 path = atoms.path("moov", "udta", "meta", "ilst")
             except KeyError:
-                self.__save_new(fileobj, atoms, data)
+                data = Atom.render("ilst", bytearray().join(values))
+                self.__save_new(fileobj, atoms, data, padding, in_place_only)
             else:
-                self.__save_existing(fileobj, atoms, path, data)
+                data = Atom.render("ilst", bytearray().join(values))
+                self.__save_existing(
+                    fileobj, atoms, path, data, padding, in_place_only)
         finally:
-            fileobj.close()
-
-    def __pad_ilst(self, data, length=None):
-        if length is None:
-            length = ((len(data) + 1023) & ~1023) - len(data)
-        return Atom.render(b"free", b"\x00" * length)
+            if opened: fileobj.close()
+        if self.__wanted is None: self.__state = save_state(filename, data)
 
-    def __save_new(self, fileobj, atoms, ilst):
+    def __padding(self, fileobj, policy, data, available, offset,
+                  in_place_only):
+        """Return the size of the free atom to put after data, or 0
+        for none."""
+        fileobj.seek(0, 2)
+        info = PaddingInfo(available, fileobj.tell() - offset,
+                           ((len(data) + 1023) & ~1023) - len(data) + 8)
+        padding = info.choose(policy, in_place_only)
+        # A free atom can't be smaller than its header.
+        if padding and padding < 8:
+            if in_place_only: raise MoveRequiredError(8 - padding)
+            padding = 8
+        return padding
+
+    def __pad_ilst(self, padding):
+        if not padding: return b""
+        return Atom.render(b"free", b"\x00" * (padding - 8))
+
+    def __save_new(self, fileobj, atoms, ilst, policy, in_place_only):
         hdlr = Atom.render(b"hdlr", b"\x00" * 8 + b"mdirapplb" + b"\x00" * 9)
-        meta = Atom.render(
-            b"meta", b"\x00\x00\x00\x00" + hdlr + ilst + self.__pad_ilst(ilst))
         try:
             path = atoms.path("moov", "udta")
         except KeyError:
             # moov.udta not found -- create one
             path = atoms.path("moov")
-            meta = Atom.render("udta", meta)
         offset = path[-1].offset + 8
+        size = 12 + len(hdlr) + len(ilst)
+        if path[-1].name != b"udta": size += 8
+        padding = self.__padding(
+            fileobj, policy, ilst, -size, offset, in_place_only)
+        # Pad so that the new atoms can be inserted quickly.
+        size += padding
+        grow = insert_size(fileobj, size, offset)
+        if grow > size: padding = max(padding + grow - size, 8)
+        meta = Atom.render(b"meta", b"\x00\x00\x00\x00" + hdlr + ilst +
+                           self.__pad_ilst(padding))
+        if path[-1].name != b"udta":
+            meta = Atom.render("udta", meta)
+        report_padding(fileobj, padding)
         insert_bytes(fileobj, len(meta), offset)
         fileobj.seek(offset)
         fileobj.write(meta)
         self.__update_parents(fileobj, path, len(meta))
         self.__update_offsets(fileobj, atoms, len(meta), offset)
 
-    def __save_existing(self, fileobj, atoms, path, data):
+    def __save_existing(self, fileobj, atoms, path, data, policy,
+                        in_place_only):
         # Replace the old ilst atom.
         ilst = path.pop()
         offset = ilst.offset
@@ -338,17 +477,20 @@ class MP4Tags(DictProxy, Metadata):
         except IndexError:
             pass
 
-        delta = len(data) - length
-        if delta > 0 or (delta < 0 and delta > -8):
-            data += self.__pad_ilst(data)
-            delta = len(data) - length
+        padding = self.__padding(fileobj, policy, data, length - len(data),
+                                 offset + length, in_place_only)
+        delta = len(data) + padding - length
+        if delta > 0:
+            # Pad so that the space can be inserted quickly.
+            grow = insert_size(fileobj, delta, offset)
+            if grow > delta: padding = max(padding + grow - delta, 8)
+            delta = len(data) + padding - length
             insert_bytes(fileobj, delta, offset)
         elif delta < 0:
-            data += self.__pad_ilst(data, -delta - 8)
-            delta = 0
-
+            delete_bytes(fileobj, -delta, offset + len(data) + padding)
+        report_padding(fileobj, padding)
         fileobj.seek(offset)
-        fileobj.write(data)
+        write_changed(fileobj, data + self.__pad_ilst(padding))
         self.__update_parents(fileobj, path, delta)
         self.__update_offsets(fileobj, atoms, delta, offset)
 
@@ -420,13 +562,16 @@ class MP4Tags(DictProxy, Metadata):
             Atom.render(b"data", struct_pack(">2I", flags, 0) + data)
             for data in value]))
 
-    def __parse_freeform(self, atom, data):
+    def __freeform_key(self, atom, data):
         length = cdata.uint_be(data[:4])
         mean = data[12:length]
         pos = length
         length = cdata.uint_be(data[pos:pos+4])
         name = data[pos+12:pos+length]
-        pos += length
+        return atom.name + b":" + mean + b":" + name, pos + length
+
+    def __parse_freeform(self, atom, data):
+        key, pos = self.__freeform_key(atom, data)
         value = []
         while pos < atom.length - 8:
             length, atom_name = struct_unpack(">I4s", data[pos:pos+8])
@@ -436,7 +581,7 @@ class MP4Tags(DictProxy, Metadata):
             value.append(data[pos+16:pos+length])
             pos += length
         if value:
-            self[atom.name + b":" + mean + b":" + name] = value
+            self[key] = value
     def __render_freeform(self, key, value):
         if isinstance(key, text_type):
             key = key.encode()
@@ -543,6 +688,7 @@ class MP4Tags(DictProxy, Metadata):
 
     def delete(self, filename):
         self.clear()
+        self.__wanted = self.__skipped = None
         self.save(filename)
 
     __atoms = {
@@ -659,23 +805,35 @@ class MP4(FileType):
     
     _mimes = ["audio/mp4", "audio/x-m4a", "audio/mpeg4", "audio/aac"]
 
-    def load(self, filename):
-        self.filename = filename
-        fileobj = open(filename, "rb")
+    def load(self, filename, fileobj=None, tags=True, info=True,
+             keys=None):
+        """Load file information from a filename.
+
+        If keys is given, only those tags are read (see MP4Tags).
+        """
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        self.tags = self.info = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
             atoms = Atoms(fileobj)
-            try: self.info = MP4Info(atoms, fileobj)
-            except Exception as err:
-                reraise(MP4StreamInfoError, err, sys.exc_info()[2])
-            try: self.tags = self.MP4Tags(atoms, fileobj)
-            except MP4MetadataError:
-                self.tags = None
-            except Exception as err:
-                reraise(MP4MetadataError, err, sys.exc_info()[2])
+            if info:
+                try: self.info = MP4Info(atoms, fileobj)
+                except Exception as err:
+                    reraise(MP4StreamInfoError, err, sys.exc_info()[2])
+            if tags:
+                kwargs = {}
+                if keys is not None: kwargs["keys"] = keys
+                try: self.tags = self.MP4Tags(atoms, fileobj, **kwargs)
+                except MP4MetadataError:
+                    self.tags = None
+                except Exception as err:
+                    reraise(MP4MetadataError, err, sys.exc_info()[2])
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
 
     def add_tags(self):
+        self._check_tags()
         self.tags = self.MP4Tags()
 
     def score(filename, fileobj, header):
@@ -19,7 +19,6 @@ For more information, see http://www.musepack.net/.
 __all__ = ["Musepack", "Open", "delete"]
 
 from mutagen.apev2 import APEv2File, error, delete
-from mutagen.id3 import BitPaddedInt
 from mutagen._util import cdata, struct_unpack
 
 class MusepackHeaderError(error): pass
@@ -52,7 +51,8 @@ class MusepackInfo(object):
             raise MusepackHeaderError("not a Musepack file")
         # Skip ID3v2 tags
         if header[:3] == b"ID3":
-            size = 10 + BitPaddedInt(header[6:10])
+            from mutagen.id3 import syncsafe_decode
+            size = 10 + syncsafe_decode(header[6:10])
             fileobj.seek(size)
             header = bytearray(fileobj.read(32))
             if len(header) != 32:
@@ -22,13 +22,23 @@ import zlib
 from struct import error as struct_error
 from io import BytesIO
 
-from mutagen import FileType
-from mutagen._util import cdata, insert_bytes, delete_bytes, struct_pack, struct_unpack, reraise, buffer
+import mutagen
+from mutagen import FileType, PaddingInfo, MoveRequiredError
+from mutagen._util import cdata, insert_bytes, delete_bytes, struct_pack, struct_unpack, reraise, buffer, open_fileobj, open_for_update, report_padding, save_state, write_changed, source_name
 
 class error(IOError):
     """Ogg stream parsing errors."""
     pass
 
+def _crc(data):
+    """Return the CRC field for an Ogg page whose CRC field is zero."""
+    # Python's CRC is swapped relative to Ogg's needs.
+    crc = zlib.crc32(buffer(data.translate(cdata.bitswap)), -1) & 0xffffffff
+    crc = ((crc & 0x80000000) <<1) - crc - 1
+    # Although we're using to_int_be, this actually makes the CRC
+    # a proper le integer, since Python's CRC is byteswapped.
+    return cdata.to_int_be(crc).translate(cdata.bitswap)
+
 class OggPage(object):
     """A single Ogg page (not necessarily a single encoded packet).
 
@@ -147,14 +157,7 @@ class OggPage(object):
         data.append(lacing_data)
         data.extend(self.packets)
         data = bytearray().join(data)
-
-        # Python's CRC is swapped relative to Ogg's needs.
-        crc = zlib.crc32(buffer(data.translate(cdata.bitswap)), -1) & 0xffffffff
-        crc = ((crc & 0x80000000) <<1) - crc - 1
-        # Although we're using to_int_be, this actually makes the CRC
-        # a proper le integer, since Python's CRC is byteswapped.
-        crc = cdata.to_int_be(crc).translate(cdata.bitswap)
-        data = data[:22] + crc + data[26:]
+        data[22:26] = _crc(data)
         return data
 
     def __size(self):
@@ -220,11 +223,15 @@ class OggPage(object):
                 if page.serial != serial:
                     # Wrong stream, skip this page.
                     continue
-                # Changing the number can't change the page size,
-                # so seeking back based on the current size is safe.
-                fileobj.seek(-page.size, 1)
-            page.sequence = number
-            fileobj.write(page.write())
+            if page.sequence != number:
+                # Only the number and CRC change, so only they are
+                # written; the CRC is taken over the page as it is.
+                fileobj.seek(page.offset, 0)
+                data = bytearray(fileobj.read(page.size))
+                data[18:26] = struct_pack("<I", number) + b"\x00" * 4
+                data[22:26] = _crc(data)
+                fileobj.seek(page.offset + 18, 0)
+                fileobj.write(data[18:26])
             fileobj.seek(page.offset + page.size, 0)
             number += 1
     renumber = classmethod(renumber)
@@ -323,7 +330,7 @@ class OggPage(object):
         return pages
     from_packets = classmethod(from_packets)
 
-    def replace(klass, fileobj, old_pages, new_pages):
+    def replace(klass, fileobj, old_pages, new_pages, in_place_only=False):
         """Replace old_pages with new_pages within fileobj.
 
         old_pages must have come from reading fileobj originally.
@@ -332,7 +339,9 @@ class OggPage(object):
         the flags for the first and last pages.
 
         fileobj will be resized and pages renumbered as necessary. As
-        such, it must be opened r+b or w+b.
+        such, it must be opened r+b or w+b. If in_place_only is true,
+        mutagen.MoveRequiredError is raised instead, before anything
+        is written.
         """
 
         # Number the new pages starting from the first old page.
@@ -352,23 +361,40 @@ class OggPage(object):
             new_pages[-1].position = -1
 
         new_data = bytearray().join(map(klass.write, new_pages))
-
-        # Make room in the file for the new data.
-        delta = len(new_data)
-        fileobj.seek(old_pages[0].offset, 0)
-        insert_bytes(fileobj, delta, old_pages[0].offset)
-        fileobj.seek(old_pages[0].offset, 0)
-        fileobj.write(new_data)
-        new_data_end = old_pages[0].offset + delta
-
-        # Go through the old pages and delete them. Since we shifted
-        # the data down the file, we need to adjust their offsets. We
-        # also need to go backwards, so we don't adjust the deltas of
-        # the other pages.
-        old_pages.reverse()
-        for old_page in old_pages:
-            adj_offset = old_page.offset + delta
-            delete_bytes(fileobj, old_page.size, adj_offset)
+        start = old_pages[0].offset
+        old_size = sum([page.size for page in old_pages])
+        new_data_end = start + len(new_data)
+
+        if in_place_only and (
+            old_pages[-1].offset + old_pages[-1].size - start != old_size or
+            len(new_data) != old_size or len(old_pages) != len(new_pages)):
+            raise MoveRequiredError(max(0, len(new_data) - old_size))
+
+        if old_pages[-1].offset + old_pages[-1].size - start == old_size:
+            # The old pages are together, so they can be overwritten,
+            # and only the difference in size has to be made up.
+            if len(new_data) > old_size:
+                insert_bytes(fileobj, len(new_data) - old_size,
+                             start + old_size)
+            elif len(new_data) < old_size:
+                delete_bytes(fileobj, old_size - len(new_data),
+                             new_data_end)
+            fileobj.seek(start, 0)
+            write_changed(fileobj, new_data)
+        else:
+            # Make room in the file for the new data.
+            delta = len(new_data)
+            insert_bytes(fileobj, delta, start)
+            fileobj.seek(start, 0)
+            fileobj.write(new_data)
+
+            # Go through the old pages and delete them. Since we
+            # shifted the data down the file, we need to adjust their
+            # offsets. We also need to go backwards, so we don't
+            # adjust the deltas of the other pages.
+            for old_page in reversed(old_pages):
+                adj_offset = old_page.offset + delta
+                delete_bytes(fileobj, old_page.size, adj_offset)
 
         # Finally, if there's any discrepency in length, we need to
         # renumber the pages for the logical stream.
@@ -426,6 +452,28 @@ class OggPage(object):
             return best_page
     find_last = classmethod(find_last)
 
+def packet_state(fileobj, packet):
+    """Return what Ogg comment classes keep as their _saved attribute:
+    the save state (see mutagen._util.save_state) of the comment
+    packet read from fileobj, and its size."""
+    return save_state(source_name(fileobj), packet), len(packet)
+
+def pad_packet(fileobj, old_pages, old, new, policy, in_place_only=False):
+    """Return new, a comment packet replacing old in old_pages, with
+    the padding policy asks for, or all the space of old if
+    in_place_only is true (see PaddingInfo.choose).
+
+    Pages are rewritten in place when they keep their size, so
+    padding the packet to the size of the old one means nothing has
+    to be moved.
+    """
+    fileobj.seek(0, 2)
+    end = old_pages[-1].offset + old_pages[-1].size
+    info = PaddingInfo(len(old) - len(new), fileobj.tell() - end, 0)
+    padding = info.choose(policy, in_place_only)
+    report_padding(fileobj, padding)
+    return new + b"\x00" * padding
+
 class OggFileType(FileType):
     """An generic Ogg file."""
 
@@ -434,17 +482,28 @@ class OggFileType(FileType):
     _Error = None
     _mimes = ["application/ogg", "application/x-ogg"]
 
-    def load(self, filename):
-        """Load file information from a filename."""
+    def load(self, filename, fileobj=None, tags=True, info=True):
+        """Load file information from a filename.
+
+        The stream's first page is read even if info is false, since
+        the tags are found through it; info=False skips looking for
+        the last page to get the length.
+        """
 
-        self.filename = filename
-        fileobj = open(filename, "rb")
+        self.filename = source_name(filename)
+        self._tags_skipped = not tags
+        self.tags = None
+        fileobj, opened = open_fileobj(filename, fileobj)
         try:
             try:
                 self.info = self._Info(fileobj)
-                self.tags = self._Tags(fileobj, self.info)
+                if tags:
+                    self.tags = self._Tags(fileobj, self.info)
 
-                if self.info.length:
+                if not info:
+                    self.info = None
+                    return
+                elif self.info.length:
                     # The streaminfo gave us real length information,
                     # don't waste time scanning the Ogg.
                     return
@@ -462,40 +521,58 @@ class OggFileType(FileType):
             except EOFError:
                 raise self._Error("no appropriate stream found")
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
 
     def delete(self, filename=None):
         """Remove tags from a file.
 
         If no filename is given, the one most recently loaded is used.
         """
+        self._check_tags()
         if filename is None:
             filename = self.filename
 
         self.tags.clear()
-        fileobj = open(filename, "rb+")
-        try:
-            try: self.tags._inject(fileobj)
-            except error as e:
-                reraise(self._Error, e, sys.exc_info()[2])
-            except EOFError:
-                raise self._Error("no appropriate stream found")
-        finally:
-            fileobj.close()
+        self.__inject(filename, None, False)
 
-    def save(self, filename=None):
+    def save(self, filename=None, padding=None, in_place_only=False):
         """Save a tag to a file.
 
         If no filename is given, the one most recently loaded is used.
+
+        padding is a mutagen.PaddingPolicy deciding the padding after
+        the comments, for formats other than Ogg FLAC. By default the
+        old comment packet's space is kept if the new comments fit,
+        and otherwise they get no padding.
+
+        If in_place_only is true, the comment pages are rewritten only
+        if they keep their size and number, and otherwise
+        mutagen.MoveRequiredError is raised. The comment packet is
+        padded to the size of the old one; Ogg FLAC comments must not
+        grow or shrink at all.
         """
+        self._check_tags()
         if filename is None:
             filename = self.filename
-        fileobj = open(filename, "rb+")
+        if padding is None:
+            # Saving pads the packet to its old size if it fits.
+            state, size = self.tags._saved
+            packet = self.tags._packet()
+            packet += b"\x00" * (size - len(packet))
+            if state is not None and state == save_state(filename, packet):
+                mutagen._skip_save()
+                return
+        self.__inject(filename, padding, in_place_only)
+
+    def __inject(self, filename, padding, in_place_only):
+        self.tags._saved = (None, 0)
+        fileobj, opened = open_for_update(filename)
         try:
-            try: self.tags._inject(fileobj)
+            try: packet = self.tags._inject(fileobj, padding, in_place_only)
             except error as e:
                 reraise(self._Error, e, sys.exc_info()[2])
             except EOFError:
                 raise self._Error("no appropriate stream found")
         finally:
-            fileobj.close()
+            if opened: fileobj.close()
+        self.tags._saved = save_state(filename, packet), len(packet)
@@ -22,7 +22,7 @@ __all__ = ["OggFLAC", "Open", "delete"]
 from io import BytesIO
 
 from mutagen.flac import StreamInfo, VCFLACDict
-from mutagen.ogg import OggPage, OggFileType, error as OggError
+from mutagen.ogg import OggPage, OggFileType, packet_state, error as OggError
 from mutagen._util import struct_pack, struct_unpack
 
 class error(OggError): pass
@@ -73,11 +73,21 @@ class OggFLACVComment(VCFLACDict):
             if page.serial == info.serial:
                 pages.append(page)
                 complete = page.complete or (len(page.packets) > 1)
-        comment = BytesIO(OggPage.to_packets(pages)[0][4:])
-        super(OggFLACVComment, self).load(comment, errors=errors)
+        packet = OggPage.to_packets(pages)[0]
+        self._saved = packet_state(data, packet)
+        self.__code = packet[:1]
+        super(OggFLACVComment, self).load(BytesIO(packet[4:]), errors=errors)
 
-    def _inject(self, fileobj):
-        """Write tag data into the FLAC Vorbis comment packet/page."""
+    def _packet(self):
+        data = self.write()
+        return self.__code + struct_pack(">I", len(data))[-3:] + data
+
+    def _inject(self, fileobj, padding=None, in_place_only=False):
+        """Write tag data into the FLAC Vorbis comment packet/page.
+
+        The comment block is a metadata block of its own, so it
+        can't be padded; padding is ignored.
+        """
 
         # Ogg FLAC has no convenient data marker like Vorbis, but the
         # second packet - and second page - must be the comment data.
@@ -99,12 +109,12 @@ class OggFLACVComment(VCFLACDict):
         packets = OggPage.to_packets(old_pages, strict=False)
 
         # Set the new comment block.
-        data = self.write()
-        data = bytearray([packets[0][0]]) + struct_pack(">I", len(data))[-3:] + data
-        packets[0] = data
+        self.__code = packets[0][:1]
+        packets[0] = self._packet()
 
         new_pages = OggPage.from_packets(packets, old_pages[0].sequence)
-        OggPage.replace(fileobj, old_pages, new_pages)
+        OggPage.replace(fileobj, old_pages, new_pages, in_place_only)
+        return packets[0]
 
 class OggFLAC(OggFileType):
     """An Ogg FLAC file."""
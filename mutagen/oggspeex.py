@@ -22,7 +22,7 @@ http://lists.xiph.org/pipermail/speex-dev/2006-July/004676.html.
 __all__ = ["OggSpeex", "Open", "delete"]
 
 from mutagen._vorbis import VCommentDict
-from mutagen.ogg import OggPage, OggFileType, error as OggError
+from mutagen.ogg import OggPage, OggFileType, pad_packet, packet_state, error as OggError
 from mutagen._util import cdata
 
 class error(OggError): pass
@@ -68,10 +68,14 @@ class OggSpeexVComment(VCommentDict):
             if page.serial == info.serial:
                 pages.append(page)
                 complete = page.complete or (len(page.packets) > 1)
-        data = OggPage.to_packets(pages)[0] + b"\x01"
-        super(OggSpeexVComment, self).__init__(data, framing=False)
+        packet = OggPage.to_packets(pages)[0]
+        self._saved = packet_state(fileobj, packet)
+        super(OggSpeexVComment, self).__init__(packet + b"\x01", framing=False)
 
-    def _inject(self, fileobj):
+    def _packet(self):
+        return self.write(framing=False)
+
+    def _inject(self, fileobj, padding=None, in_place_only=False):
         """Write tag data into the Speex comment packet/page."""
 
         fileobj.seek(0)
@@ -99,10 +103,12 @@ class OggSpeexVComment(VCommentDict):
         packets = OggPage.to_packets(old_pages, strict=False)
 
         # Set the new comment packet.
-        packets[0] = self.write(framing=False)
+        packets[0] = pad_packet(fileobj, old_pages, packets[0],
+                                self._packet(), padding, in_place_only)
 
         new_pages = OggPage.from_packets(packets, old_pages[0].sequence)
-        OggPage.replace(fileobj, old_pages, new_pages)
+        OggPage.replace(fileobj, old_pages, new_pages, in_place_only)
+        return packets[0]
 
 class OggSpeex(OggFileType):
     """An Ogg Speex file."""
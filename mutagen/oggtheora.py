@@ -19,7 +19,7 @@ Based on the specification at http://theora.org/doc/Theora_I_spec.pdf.
 __all__ = ["OggTheora", "Open", "delete"]
 
 from mutagen._vorbis import VCommentDict
-from mutagen.ogg import OggPage, OggFileType, error as OggError
+from mutagen.ogg import OggPage, OggFileType, pad_packet, packet_state, error as OggError
 from mutagen._util import struct_unpack
 
 class error(OggError): pass
@@ -66,10 +66,14 @@ class OggTheoraCommentDict(VCommentDict):
             if page.serial == info.serial:
                 pages.append(page)
                 complete = page.complete or (len(page.packets) > 1)
-        data = OggPage.to_packets(pages)[0][7:]
-        super(OggTheoraCommentDict, self).__init__(data + b"\x01")
+        packet = OggPage.to_packets(pages)[0]
+        self._saved = packet_state(fileobj, packet)
+        super(OggTheoraCommentDict, self).__init__(packet[7:], framing=False)
 
-    def _inject(self, fileobj):
+    def _packet(self):
+        return b"\x81theora" + self.write(framing=False)
+
+    def _inject(self, fileobj, padding=None, in_place_only=False):
         """Write tag data into the Theora comment packet/page."""
 
         fileobj.seek(0)
@@ -85,10 +89,12 @@ class OggTheoraCommentDict(VCommentDict):
 
         packets = OggPage.to_packets(old_pages, strict=False)
 
-        packets[0] = b"\x81theora" + self.write(framing=False)
+        packets[0] = pad_packet(fileobj, old_pages, packets[0],
+                                self._packet(), padding, in_place_only)
 
         new_pages = OggPage.from_packets(packets, old_pages[0].sequence)
-        OggPage.replace(fileobj, old_pages, new_pages)
+        OggPage.replace(fileobj, old_pages, new_pages, in_place_only)
+        return packets[0]
 
 class OggTheora(OggFileType):
     """An Ogg Theora file."""
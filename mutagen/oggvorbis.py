@@ -20,7 +20,7 @@ on the specification at http://www.xiph.org/vorbis/doc/Vorbis_I_spec.html.
 __all__ = ["OggVorbis", "Open", "delete"]
 
 from mutagen._vorbis import VCommentDict
-from mutagen.ogg import OggPage, OggFileType, error as OggError
+from mutagen.ogg import OggPage, OggFileType, pad_packet, packet_state, error as OggError
 from mutagen._util import struct_unpack
 
 class error(OggError): pass
@@ -81,10 +81,15 @@ class OggVCommentDict(VCommentDict):
             if page.serial == info.serial:
                 pages.append(page)
                 complete = page.complete or (len(page.packets) > 1)
-        data = OggPage.to_packets(pages)[0][7:] # Strip off b"\x03vorbis".
+        packet = OggPage.to_packets(pages)[0]
+        self._saved = packet_state(fileobj, packet)
+        data = packet[7:] # Strip off b"\x03vorbis".
         super(OggVCommentDict, self).__init__(data)
 
-    def _inject(self, fileobj):
+    def _packet(self):
+        return b"\x03vorbis" + self.write()
+
+    def _inject(self, fileobj, padding=None, in_place_only=False):
         """Write tag data into the Vorbis comment packet/page."""
 
         # Find the old pages in the file; we'll need to remove them,
@@ -103,10 +108,12 @@ class OggVCommentDict(VCommentDict):
         packets = OggPage.to_packets(old_pages, strict=False)
 
         # Set the new comment packet.
-        packets[0] = b"\x03vorbis" + self.write()
+        packets[0] = pad_packet(fileobj, old_pages, packets[0],
+                                self._packet(), padding, in_place_only)
 
         new_pages = OggPage.from_packets(packets, old_pages[0].sequence)
-        OggPage.replace(fileobj, old_pages, new_pages)
+        OggPage.replace(fileobj, old_pages, new_pages, in_place_only)
+        return packets[0]
 
 class OggVorbis(OggFileType):
     """An Ogg Vorbis file."""
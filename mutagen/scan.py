@@ -0,0 +1,165 @@
+# Copyright 2026 agent
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Load many files at once.
+
+    from mutagen.scan import scan
+    for path, result in scan(paths, executor="process"):
+        if isinstance(result, Exception): ...
+
+scan takes an iterable of paths and yields (path, result) pairs, where
+result is whatever the loader returned (a FileType, or None for
+unknown files from mutagen.File) or the exception it raised.
+
+Files can be loaded inline, in a thread pool (good for slow network
+filesystems) or in a process pool (good for CPU-bound tag parsing).
+Pools come from the concurrent.futures module; on Python 2 this
+needs the 'futures' backport.
+"""
+
+import time
+from collections import deque
+
+# seconds between checks for queued chunks that started loading
+_POLL = 0.05
+
+class ScanTimeout(Exception):
+    """A file was not loaded within the scan timeout."""
+
+def _load_chunk(loader, chunk):
+    results = []
+    for path in chunk:
+        try: result = loader(path)
+        except Exception as err: result = err
+        results.append((path, result))
+    return results
+
+def _chunks(paths, size):
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _executor(executor, workers):
+    """Return an executor for a name, its number of workers, and
+    whether scan must shut it down."""
+
+    if executor == "thread":
+        from concurrent.futures import ThreadPoolExecutor
+        workers = workers or 4
+        return ThreadPoolExecutor(workers), workers, True
+    elif executor == "process":
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import cpu_count
+        workers = workers or cpu_count()
+        return ProcessPoolExecutor(workers), workers, True
+    elif hasattr(executor, "submit"):
+        return executor, workers or 4, False
+    else:
+        raise ValueError("unknown executor %r" % (executor,))
+
+def _shutdown(executor):
+    try: executor.shutdown(wait=False, cancel_futures=True)
+    except TypeError: executor.shutdown(wait=False)
+
+def scan(paths, loader=None, executor=None, workers=None, chunksize=1,
+         max_pending=None, timeout=None, ordered=True):
+    """Load every path, yielding (path, result) pairs.
+
+    loader is called with each path and defaults to mutagen.File.
+    With a process pool it must be picklable (a module-level function
+    or a class), as must its results.
+
+    executor is None or 'inline' to load in the calling thread,
+    'thread' or 'process' for a new pool of workers (default: 4
+    threads, or a process per CPU), or a concurrent.futures.Executor,
+    which is used but not shut down; workers should then say how many
+    workers it has (default: 4).
+
+    Paths are sent to the pool in lists of chunksize, and at most
+    max_pending lists (default: twice the workers) are in flight at
+    once, so paths are consumed and results are kept no faster than
+    the caller reads them.
+
+    If timeout is given, a file whose result takes more than timeout
+    seconds (counted from when the pool starts loading its chunk, so
+    time spent queued doesn't count) is yielded with a ScanTimeout.
+    Workers can not be interrupted, so the file keeps loading in the
+    background and its result is dropped. Inline scans ignore timeout.
+
+    Results are yielded in the order of paths, unless ordered is
+    false, in which case they are yielded as soon as they are ready.
+    """
+
+    if loader is None:
+        from mutagen import File as loader
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if executor is None or executor == "inline":
+        for path in paths:
+            try: result = loader(path)
+            except Exception as err: result = err
+            yield path, result
+        return
+
+    from concurrent.futures import wait, FIRST_COMPLETED
+    executor, workers, owned = _executor(executor, workers)
+    if max_pending is None:
+        max_pending = 2 * workers
+    chunks = _chunks(paths, chunksize)
+    # [future, chunk, deadline]; the deadline is set once the future
+    # is seen running, since a queued chunk can wait for a long time.
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < max_pending:
+                for chunk in chunks:
+                    future = executor.submit(_load_chunk, loader, chunk)
+                    pending.append([future, chunk, None])
+                    break
+                else: break
+            if not pending:
+                break
+
+            if ordered: waiting = [pending[0]]
+            else: waiting = list(pending)
+            left = None
+            if timeout is not None:
+                now = time.time()
+                for item in waiting:
+                    if item[2] is None and item[0].running():
+                        item[2] = now + timeout * len(item[1])
+                deadlines = [d for (f, c, d) in waiting if d is not None]
+                if deadlines: left = max(0, min(deadlines) - now)
+                if len(deadlines) < len(waiting):
+                    # check again for chunks that start meanwhile
+                    left = min(_POLL, _POLL if left is None else left)
+            wait([f for (f, c, d) in waiting], left, FIRST_COMPLETED)
+
+            now = time.time()
+            for item in waiting:
+                future, chunk, deadline = item
+                if future.done():
+                    try: results = future.result()
+                    except Exception as err:
+                        results = [(path, err) for path in chunk]
+                elif deadline is not None and now >= deadline:
+                    future.cancel()
+                    err = ScanTimeout("no result after %s seconds" % timeout)
+                    results = [(path, err) for path in chunk]
+                else: continue
+                pending.remove(item)
+                for result in results:
+                    yield result
+    finally:
+        for future, chunk, deadline in pending:
+            future.cancel()
+        if owned: _shutdown(executor)
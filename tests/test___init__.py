@@ -3,13 +3,14 @@ import os
 from io import BytesIO
 
 from tests import TestCase, add
-from mutagen import File, Metadata, FileType
+from mutagen import File, Metadata, FileType, PaddingInfo, KeepPadding, ProportionalPadding, FixedPadding, MoveRequiredError, skipped_saves
 from mutagen.oggvorbis import OggVorbis
 from mutagen.oggflac import OggFLAC
 from mutagen.oggspeex import OggSpeex
 from mutagen.oggtheora import OggTheora
 from mutagen.mp3 import MP3, EasyMP3
-from mutagen.apev2 import APEv2File
+from mutagen.id3 import ID3FileType, ID3, TIT2
+from mutagen.apev2 import APEv2File, APEv2
 from mutagen.flac import FLAC
 from mutagen.wavpack import WavPack
 from mutagen.trueaudio import TrueAudio, EasyTrueAudio
@@ -86,6 +87,27 @@ class TFile(TestCase):
             filename = os.path.join("tests", "data", "empty.ogg")
             self.failIf(File(filename, options=[]))
 
+    def test_load_without_fileobj(self):
+        class Kind(FileType):
+            def load(self, filename):
+                self.filename = filename
+            @staticmethod
+            def score(filename, fileobj, header): return 1
+        filename = os.path.join("tests", "data", "empty.ogg")
+        self.failUnlessEqual(File(filename, options=[Kind]).filename, filename)
+
+    def test_load_type_error(self):
+        loads = []
+        class Kind(FileType):
+            def load(self, filename, fileobj=None):
+                loads.append(filename)
+                raise TypeError("parse error")
+            @staticmethod
+            def score(filename, fileobj, header): return 1
+        filename = os.path.join("tests", "data", "empty.ogg")
+        self.failUnlessRaises(TypeError, File, filename, options=[Kind])
+        self.failUnlessEqual(loads, [filename])
+
     def test_oggvorbis(self):
         self.failUnless(isinstance(
             File(os.path.join("tests", "data", "empty.ogg")), OggVorbis))
@@ -174,6 +196,422 @@ class TFile(TestCase):
         self.failUnless(isinstance(
             File(os.path.join("tests", "data", "silence-3.wma")), ASF))
 
+    def test_opens_once(self):
+        try: import builtins
+        except ImportError: import __builtin__ as builtins
+        real_open = builtins.open
+        opened = []
+        def counting_open(*args, **kwargs):
+            opened.append(args[0])
+            return real_open(*args, **kwargs)
+        builtins.open = counting_open
+        try:
+            for filename in ["empty.ogg", "empty.oggflac", "empty.spx",
+                             "sample.oggtheora", "silence-44-s.mp3",
+                             "silence-44-s.flac", "click.mpc",
+                             "mac-399.ape", "oldtag.apev2", "empty.tta",
+                             "silence-44-s.wv", "has-tags.m4a",
+                             "empty.ofr", "silence-1.wma"]:
+                filename = os.path.join("tests", "data", filename)
+                for easy in [False, True]:
+                    del(opened[:])
+                    self.failIf(File(filename, easy=easy) is None)
+                    self.failUnlessEqual(opened, [filename])
+        finally:
+            builtins.open = real_open
+
+    def test_sources(self):
+        import mmap
+        for filename in ["empty.ogg", "silence-44-s.mp3", "silence-44-s.flac",
+                         "has-tags.m4a", "silence-1.wma", "click.mpc"]:
+            filename = os.path.join("tests", "data", filename)
+            ref = File(filename)
+            fileobj = open(filename, "rb")
+            try:
+                data = fileobj.read()
+                memmap = mmap.mmap(
+                    fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                for source in [data, bytearray(data), memoryview(data),
+                               BytesIO(data), memmap, fileobj]:
+                    audio = File(source)
+                    self.failUnless(isinstance(audio, type(ref)))
+                    self.failUnlessEqual(audio.info.length, ref.info.length)
+                    self.failUnlessEqual(audio.pprint(), ref.pprint())
+                memmap.close()
+            finally:
+                fileobj.close()
+
+    def test_source_filename(self):
+        filename = os.path.join("tests", "data", "silence-44-s.mp3")
+        fileobj = open(filename, "rb")
+        try: self.failUnlessEqual(File(fileobj).filename, filename)
+        finally: fileobj.close()
+        self.failUnless(File(BytesIO(open(filename, "rb").read())).filename
+                        is None)
+
+    def test_source_path(self):
+        try: from pathlib import Path
+        except ImportError: return
+        import shutil, tempfile
+        from mutagen._util import source_name
+        filename = os.path.abspath(os.path.join(
+            "tests", "data", "silence-44-s-path.mp3"))
+        shutil.copy(os.path.join("tests", "data", "silence-44-s.mp3"),
+                    filename)
+        cwd = os.getcwd()
+        other = tempfile.mkdtemp()
+        try:
+            self.failUnlessEqual(source_name(Path(filename)), filename)
+            audio = File(Path(filename))
+            os.chdir(other)
+            audio["TIT2"].text = ["Moved"]
+            audio.save()
+            self.failUnlessEqual(os.listdir(other), [])
+            self.failUnlessEqual(File(Path(filename))["TIT2"], "Moved")
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(other)
+            os.unlink(filename)
+
+    def test_registry_matches_all_options(self):
+        options = [MP3, TrueAudio, OggTheora, OggSpeex, OggVorbis, OggFLAC,
+                   FLAC, APEv2File, MP4, ID3FileType, WavPack, Musepack,
+                   MonkeysAudio, OptimFROG, ASF]
+        datadir = os.path.join("tests", "data")
+        for filename in sorted(os.listdir(datadir)):
+            filename = os.path.join(datadir, filename)
+            try: expected = type(File(filename, options=options))
+            except Exception as err: expected = type(err)
+            try: found = type(File(filename))
+            except Exception as err: found = type(err)
+            self.failUnlessEqual(found, expected, filename)
+
+    def test_dispatch_matches_scoring(self):
+        from mutagen import _dispatch, _best, _formats, _kind
+        datadir = os.path.join("tests", "data")
+        for filename in sorted(os.listdir(datadir)):
+            filename = os.path.join(datadir, filename)
+            fileobj = open(filename, "rb")
+            try:
+                header = fileobj.read(128)
+                for easy in [False, True]:
+                    kinds = [_kind(fmt, easy) for fmt in _formats]
+                    expected = _best(kinds, filename, fileobj, header)
+                    found = _dispatch(filename, fileobj, header, easy)
+                    if expected[0][0] > 0:
+                        self.failUnlessEqual(found, expected, filename)
+                    else:
+                        self.failUnless(found is None or found[0][0] <= 0,
+                                        filename)
+            finally:
+                fileobj.close()
+
+    def test_imports_only_matching(self):
+        import subprocess, sys
+        code = ("import sys, mutagen; mutagen.File(%r); "
+                "print(' '.join(sorted(sys.modules)))" %
+                os.path.join("tests", "data", "empty.ogg"))
+        proc = subprocess.Popen([sys.executable, "-c", code],
+                                stdout=subprocess.PIPE)
+        modules = proc.communicate()[0].decode().split()
+        self.failUnless("mutagen.oggvorbis" in modules)
+        for name in ["mutagen.id3", "mutagen.mp4", "mutagen.asf",
+                     "mutagen.flac", "mutagen.apev2"]:
+            self.failIf(name in modules, name)
+
+    def test_partial(self):
+        class CountingFile(object):
+            def __init__(self, filename):
+                self.name, self.read_bytes = filename, 0
+                self.fileobj = open(filename, "rb")
+            def read(self, size=-1):
+                data = self.fileobj.read(size)
+                self.read_bytes += len(data)
+                return data
+            def seek(self, *args): return self.fileobj.seek(*args)
+            def tell(self): return self.fileobj.tell()
+            def close(self): self.fileobj.close()
+
+        for filename in ["empty.ogg", "empty.oggflac", "empty.spx",
+                         "sample.oggtheora", "multipagecomment.ogg",
+                         "silence-44-s.mp3", "xing.mp3",
+                         "silence-44-s.flac", "click.mpc", "mac-399.ape",
+                         "empty.tta", "silence-44-s.wv", "has-tags.m4a",
+                         "empty.ofr", "silence-1.wma"]:
+            filename = os.path.join("tests", "data", filename)
+            sources = [CountingFile(filename) for i in range(3)]
+            full = File(sources[0])
+            no_tags = File(sources[1], tags=False)
+            no_info = File(sources[2], info=False)
+            for source in sources: source.close()
+
+            self.failUnless(no_tags.tags is None, filename)
+            self.failUnlessEqual(no_tags.info.length, full.info.length)
+            self.failUnlessEqual(no_info.tags, full.tags)
+            if not isinstance(no_info, FLAC):
+                self.failUnless(no_info.info is None, filename)
+            self.failUnless(sources[1].read_bytes <= sources[0].read_bytes)
+            self.failUnless(sources[2].read_bytes <= sources[0].read_bytes)
+            self.failUnlessRaises(ValueError, no_tags.save)
+            self.failUnlessRaises(ValueError, no_tags.add_tags)
+
+    def test_read_calls(self):
+        from mutagen._util import BufferedReader
+        class UnbufferedFile(object):
+            def __init__(self, filename):
+                self.fileobj = open(filename, "rb", 0)
+                self.reads = 0
+            def read(self, size=-1):
+                self.reads += 1
+                return self.fileobj.read(size)
+            def seek(self, *args): return self.fileobj.seek(*args)
+            def tell(self): return self.fileobj.tell()
+            def close(self): self.fileobj.close()
+
+        datadir = os.path.join("tests", "data")
+        for filename in sorted(os.listdir(datadir)):
+            filename = os.path.join(datadir, filename)
+            fileobj = UnbufferedFile(filename)
+            try: File(fileobj)
+            except Exception: pass
+            fileobj.close()
+            # A read for the header, one for the footer, and one for
+            # anything else per chunk of the file at most.
+            chunks = os.path.getsize(filename) // BufferedReader.CHUNK
+            self.failUnless(fileobj.reads <= 3 + chunks, filename)
+
+    def test_save_to(self):
+        import shutil, tempfile
+        for filename in ["empty.ogg", "empty.oggflac", "empty.spx",
+                         "sample.oggtheora", "multipagecomment.ogg",
+                         "silence-44-s.mp3", "silence-44-s.flac",
+                         "click.mpc", "mac-399.ape", "empty.tta",
+                         "silence-44-s.wv", "has-tags.m4a", "no-tags.m4a",
+                         "empty.ofr", "silence-1.wma"]:
+            ext = os.path.splitext(filename)[1]
+            fd, source = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            fd, dest = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                shutil.copy(os.path.join("tests", "data", filename), source)
+                original = open(source, "rb").read()
+                audio = File(source)
+                if audio.tags is None: audio.add_tags()
+                if isinstance(audio.tags, ID3):
+                    audio.tags.add(TIT2(encoding=3, text=[u"x" * 5000]))
+                elif isinstance(audio, MP4): audio[b"\xa9nam"] = [u"x" * 5000]
+                elif isinstance(audio, ASF): audio["Title"] = [u"x" * 5000]
+                else: audio["title"] = [u"x" * 5000]
+
+                audio.save_to(dest)
+                self.failUnlessEqual(open(source, "rb").read(), original)
+                copy = BytesIO()
+                copy.write(b"junk")
+                audio.save_to(copy)
+                self.failUnlessEqual(copy.getvalue()[4:],
+                                     open(dest, "rb").read())
+                self.failUnlessRaises(ValueError, audio.save_to, source)
+
+                audio.save()
+                self.failUnlessEqual(open(source, "rb").read(),
+                                     open(dest, "rb").read(), filename)
+                copy = File(dest)
+                self.failUnlessEqual(copy.info.pprint(), audio.info.pprint())
+                self.failUnlessEqual(sorted(map(repr, copy.keys())),
+                                     sorted(map(repr, audio.keys())))
+            finally:
+                os.unlink(source)
+                os.unlink(dest)
+
+        self.failUnlessRaises(ValueError, File(BytesIO(original)).save_to,
+                              BytesIO())
+
+    def test_plan_save(self):
+        import shutil, tempfile
+        for filename in ["silence-44-s.mp3", "silence-44-s.flac",
+                         "has-tags.m4a", "multipagecomment.ogg",
+                         "silence-1.wma", "silence-44-s.wv"]:
+            ext = os.path.splitext(filename)[1]
+            fd, source = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                shutil.copy(os.path.join("tests", "data", filename), source)
+                original = open(source, "rb").read()
+                for length in [10, 20000]:
+                    audio = File(source)
+                    if isinstance(audio.tags, ID3):
+                        audio.tags.add(TIT2(encoding=3, text=[u"x" * length]))
+                    elif isinstance(audio, MP4):
+                        audio[b"\xa9nam"] = [u"x" * length]
+                    elif isinstance(audio, ASF):
+                        audio["Title"] = [u"x" * length]
+                    else: audio["title"] = [u"x" * length]
+                    plan = audio.plan_save()
+                    self.failUnlessEqual(open(source, "rb").read(), original)
+                    self.failUnlessEqual(plan.size, len(original))
+                    self.failUnlessEqual(plan.io,
+                                         plan.written + 2 * plan.moved)
+                    if isinstance(audio, (MP3, FLAC, MP4)):
+                        self.failUnlessEqual(plan.in_place, length == 10)
+                    if isinstance(audio, WavPack):
+                        self.failUnless(plan.padding is None)
+                    else: self.failUnless(plan.padding >= 0)
+
+                    audio.save()
+                    self.failUnlessEqual(os.path.getsize(source),
+                                         plan.new_size)
+                    shutil.copy(
+                        os.path.join("tests", "data", filename), source)
+            finally:
+                os.unlink(source)
+
+    def test_padding(self):
+        import shutil, tempfile
+        for filename in ["silence-44-s.mp3", "silence-44-s.flac",
+                         "has-tags.m4a", "no-tags.m4a", "empty.ogg",
+                         "empty.spx", "sample.oggtheora", "silence-1.wma"]:
+            ext = os.path.splitext(filename)[1]
+            fd, source = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                shutil.copy(os.path.join("tests", "data", filename), source)
+                for policy, expected in [
+                    (FixedPadding(5000), 5000), (FixedPadding(), 0),
+                    (FixedPadding(100), 100), (KeepPadding(), 100),
+                    (FixedPadding(3000), 3000)]:
+                    audio = File(source)
+                    if audio.tags is None: audio.add_tags()
+                    if isinstance(audio.tags, ID3):
+                        audio.tags.add(TIT2(encoding=3, text=[u"title"]))
+                    elif isinstance(audio, MP4): audio[b"\xa9nam"] = [u"title"]
+                    elif isinstance(audio, ASF): audio["Title"] = [u"title"]
+                    else: audio["title"] = [u"title"]
+                    plan = audio.plan_save(padding=policy)
+                    # Containers may need a few bytes more.
+                    self.failUnless(
+                        expected <= plan.padding < expected + 25, filename)
+                    if isinstance(policy, KeepPadding):
+                        self.failUnless(plan.in_place, filename)
+                    audio.save(padding=policy)
+                    self.failUnlessEqual(
+                        os.path.getsize(source), plan.new_size, filename)
+                    saved = File(source)
+                    self.failUnlessEqual(
+                        saved.info.pprint(), audio.info.pprint(), filename)
+                    self.failUnlessEqual(sorted(map(repr, saved.keys())),
+                                         sorted(map(repr, audio.keys())))
+            finally:
+                os.unlink(source)
+
+    def test_skipped_saves(self):
+        import shutil, tempfile
+        for filename in ["silence-44-s.mp3", "silence-44-s.flac",
+                         "has-tags.m4a", "empty.ogg", "empty.oggflac",
+                         "empty.spx", "sample.oggtheora", "click.mpc",
+                         "silence-44-s.wv", "silence-1.wma"]:
+            ext = os.path.splitext(filename)[1]
+            fd, source = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                shutil.copy(os.path.join("tests", "data", filename), source)
+                for title in [u"title", u"other title"]:
+                    audio = File(source)
+                    if isinstance(audio.tags, ID3):
+                        audio.tags.add(TIT2(encoding=3, text=[title]))
+                    elif isinstance(audio, MP4): audio[b"\xa9nam"] = [title]
+                    elif isinstance(audio, ASF): audio["Title"] = [title]
+                    else: audio["title"] = [title]
+                    skipped = skipped_saves()
+                    audio.save()
+                    self.failUnlessEqual(skipped_saves(), skipped, filename)
+                    data = open(source, "rb").read()
+                    # Just written, so a change in the same tick could
+                    # go unnoticed.
+                    audio.save()
+                    self.failUnlessEqual(skipped_saves(), skipped, filename)
+                    os.utime(source, (1, 1))
+                    audio = File(source)
+                    audio.save()
+                    audio.save()
+                    self.failUnlessEqual(skipped_saves(), skipped + 2, filename)
+                    self.failUnlessEqual(open(source, "rb").read(), data)
+
+                # Changes made behind its back are saved over.
+                audio = File(source)
+                os.utime(source, (0, 0))
+                audio.save()
+                self.failUnlessEqual(skipped_saves(), skipped + 2, filename)
+                # So are tags asked to be padded, where padding is used.
+                os.utime(source, (1, 1))
+                audio = File(source)
+                audio.save(padding=KeepPadding())
+                if isinstance(audio.tags, APEv2): skipped += 1
+                self.failUnlessEqual(skipped_saves(), skipped + 2, filename)
+            finally:
+                os.unlink(source)
+
+    def test_in_place_only(self):
+        import shutil, tempfile
+        from mutagen.ogg import OggFileType
+        for filename in ["silence-44-s.mp3", "silence-44-s.flac",
+                         "has-tags.m4a", "no-tags.m4a", "empty.ogg",
+                         "empty.oggflac", "empty.spx", "sample.oggtheora",
+                         "click.mpc", "silence-1.wma"]:
+            ext = os.path.splitext(filename)[1]
+            fd, source = tempfile.mkstemp(suffix=ext)
+            os.close(fd)
+            try:
+                shutil.copy(os.path.join("tests", "data", filename), source)
+                audio = File(source)
+                if isinstance(audio, MP4) and audio.tags is None:
+                    # A file without an ilst atom has no room at all.
+                    audio.add_tags()
+                    audio[b"\xa9nam"] = [u"title"]
+                    self.failUnlessRaises(
+                        MoveRequiredError, audio.save, in_place_only=True)
+                if audio.tags is None: audio.add_tags()
+                if not isinstance(audio, OggFLAC):
+                    audio.save(padding=FixedPadding(1000))
+                size = os.path.getsize(source)
+                for title in [u"x", u"x" * 100, u"y"]:
+                    audio = File(source)
+                    if isinstance(audio.tags, ID3):
+                        audio.tags.add(TIT2(encoding=3, text=[title]))
+                    elif isinstance(audio, MP4): audio[b"\xa9nam"] = [title]
+                    elif isinstance(audio, ASF): audio["Title"] = [title]
+                    else: audio["title"] = [title]
+                    if isinstance(audio, OggFLAC) or isinstance(
+                        audio.tags, APEv2): continue
+                    audio.save(in_place_only=True)
+                    self.failUnlessEqual(os.path.getsize(source), size)
+                    self.failUnlessEqual(
+                        repr(File(source).tags[list(audio.keys())[0]]),
+                        repr(audio.tags[list(audio.keys())[0]]))
+
+                data = open(source, "rb").read()
+                audio = File(source)
+                if isinstance(audio.tags, ID3):
+                    audio.tags.add(TIT2(encoding=3, text=[u"x" * 5000]))
+                elif isinstance(audio, MP4): audio[b"\xa9nam"] = [u"x" * 5000]
+                elif isinstance(audio, ASF): audio["Title"] = [u"x" * 5000]
+                else: audio["title"] = [u"x" * 5000]
+                if isinstance(audio.tags, APEv2):
+                    # Tags at the end of the file can always grow.
+                    audio.save(in_place_only=True)
+                    continue
+                try: audio.save(in_place_only=True)
+                except MoveRequiredError as err: needed = err.needed
+                else: self.fail("saved in place: %s" % filename)
+                self.failUnlessEqual(open(source, "rb").read(), data)
+                # That much more space is what saving without padding adds.
+                plan = audio.plan_save(padding=FixedPadding())
+                if isinstance(audio, OggFileType):
+                    self.failUnless(0 < needed <= plan.new_size - plan.size)
+                else: self.failUnlessEqual(needed, plan.new_size - plan.size)
+            finally:
+                os.unlink(source)
+
     def test_id3_indicates_mp3_not_tta(self):
         header = b"ID3 the rest of this is garbage"
         fileobj = BytesIO(header)
@@ -183,6 +621,35 @@ class TFile(TestCase):
 
 add(TFile)
 
+class TPaddingPolicy(TestCase):
+    uses_mmap = False
+
+    def test_keep(self):
+        self.failUnlessEqual(KeepPadding().padding(
+            PaddingInfo(100, 10**6, 1024)), 100)
+        self.failUnlessEqual(KeepPadding().padding(
+            PaddingInfo(-100, 10**6, 1024)), 1024)
+        self.failUnlessEqual(KeepPadding(50).padding(
+            PaddingInfo(-100, 10**6, 1024)), 50)
+
+    def test_proportional(self):
+        policy = ProportionalPadding(0.01, 1000, 50000)
+        self.failUnlessEqual(policy.padding(PaddingInfo(100, 10**6, 0)), 100)
+        self.failUnlessEqual(policy.padding(PaddingInfo(-1, 10**6, 0)), 10000)
+        self.failUnlessEqual(policy.padding(PaddingInfo(-1, 10, 0)), 1000)
+        self.failUnlessEqual(
+            policy.padding(PaddingInfo(-1, 10**9, 0)), 50000)
+        self.failUnlessEqual(
+            policy.padding(PaddingInfo(60000, 10**6, 0)), 10000)
+
+    def test_choose(self):
+        info = PaddingInfo(-100, 10, 1024)
+        self.failUnlessEqual(info.choose(), 1024)
+        self.failUnlessEqual(info.choose(FixedPadding(-5)), 0)
+        self.failUnlessEqual(info.choose(FixedPadding(7.5)), 7)
+
+add(TPaddingPolicy)
+
 class TMutagen(TestCase):
     uses_mmap = False
 
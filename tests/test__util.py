@@ -1,4 +1,4 @@
-from mutagen._util import DictMixin, cdata, utf8, insert_bytes, delete_bytes, byte_types
+from mutagen._util import DictMixin, DictProxy, BytesFile, BufferedReader, open_fileobj, cdata, utf8, insert_bytes, delete_bytes, copy_bytes, Overlay, write_changed, save_state, byte_types
 from tests import TestCase, add
 import mmap
 import random
@@ -131,12 +131,30 @@ class TDictMixin(TestCase):
     def test_len(self):
         self.failUnlessEqual(len(self.rdict), len(self.fdict))
 
+    def test_iter_methods(self):
+        self.fdict["a"] = self.rdict["a"] = 1
+        self.failUnlessEqual(
+            sorted(self.fdict.iterkeys()), sorted(self.rdict.keys()))
+        self.failUnlessEqual(
+            sorted(self.fdict.itervalues(), key=str),
+            sorted(self.rdict.values(), key=str))
+        self.failUnlessEqual(
+            sorted(self.fdict.iteritems()), sorted(self.rdict.items()))
+
     def tearDown(self):
         self.failUnlessEqual(self.fdict, self.rdict)
         self.failUnlessEqual(self.rdict, self.fdict)
 
 add(TDictMixin)
 
+class TDictProxy(TDictMixin):
+    def setUp(self):
+        self.fdict = DictProxy()
+        self.rdict = {}
+        self.fdict["foo"] = self.rdict["foo"] = "bar"
+
+add(TDictProxy)
+
 class Tcdata(TestCase):
     uses_mmap = False
 
@@ -190,6 +208,166 @@ class Tcdata(TestCase):
 
 add(Tcdata)
 
+class TBytesFile(TestCase):
+    uses_mmap = False
+
+    def setUp(self):
+        self.data = bytearray(b"0123456789")
+        self.fileobj = BytesFile(self.data)
+
+    def test_read(self):
+        self.failUnlessEqual(self.fileobj.read(3), b"012")
+        self.failUnlessEqual(self.fileobj.tell(), 3)
+        self.failUnlessEqual(self.fileobj.read(), b"3456789")
+        self.failUnlessEqual(self.fileobj.read(1), b"")
+
+    def test_seek(self):
+        self.fileobj.seek(-3, 2)
+        self.failUnlessEqual(self.fileobj.read(2), b"78")
+        self.fileobj.seek(-5, 1)
+        self.failUnlessEqual(self.fileobj.read(1), b"4")
+        self.fileobj.seek(20)
+        self.failUnlessEqual(self.fileobj.read(1), b"")
+
+    def test_seek_before_start(self):
+        self.failUnlessRaises(IOError, self.fileobj.seek, -11, 2)
+
+    def test_no_copy(self):
+        self.data[0:1] = b"x"
+        self.failUnlessEqual(self.fileobj.read(1), b"x")
+
+    def test_open_fileobj(self):
+        from io import BytesIO
+        fileobj, opened = open_fileobj(BytesIO(b"abc"))
+        self.failUnless(opened)
+        self.failUnlessEqual(fileobj.read(), b"abc")
+        fileobj, opened = open_fileobj(memoryview(b"abc"))
+        self.failUnlessEqual(fileobj.read(), b"abc")
+
+    def tearDown(self):
+        self.fileobj.close()
+
+add(TBytesFile)
+
+class CountingFile(BytesFile):
+    """A BytesFile counting read and seek calls."""
+
+    def __init__(self, data):
+        super(CountingFile, self).__init__(data)
+        self.reads, self.seeks = [], 0
+
+    def read(self, size=-1):
+        self.reads.append((self.tell(), size))
+        return super(CountingFile, self).read(size)
+
+    def seek(self, *args):
+        self.seeks += 1
+        return super(CountingFile, self).seek(*args)
+
+class TBufferedReader(TestCase):
+    uses_mmap = False
+
+    def setUp(self):
+        self.data = bytes(bytearray(range(256))) * 40
+        self.raw = CountingFile(self.data)
+        self.fileobj = BufferedReader(self.raw, chunk=1024)
+
+    def test_small_reads(self):
+        for i in range(100):
+            self.failUnlessEqual(self.fileobj.read(3), self.data[i*3:i*3+3])
+        self.failUnlessEqual(self.raw.reads, [(0, 1024)])
+        self.failUnlessEqual(self.fileobj.tell(), 300)
+
+    def test_aligned(self):
+        self.fileobj.seek(1500)
+        self.failUnlessEqual(self.fileobj.read(10), self.data[1500:1510])
+        self.failUnlessEqual(self.raw.reads, [(1024, 1024)])
+
+    def test_across_chunks(self):
+        self.fileobj.seek(1020)
+        self.failUnlessEqual(self.fileobj.read(10), self.data[1020:1030])
+        self.failUnlessEqual(self.fileobj.read(1), self.data[1030:1031])
+        self.failUnlessEqual(self.raw.reads, [(0, 2048)])
+
+    def test_forward_seek_in_chunk(self):
+        self.fileobj.read(4)
+        self.fileobj.seek(100, 1)
+        self.failUnlessEqual(self.fileobj.read(4), self.data[104:108])
+        self.fileobj.seek(10)
+        self.failUnlessEqual(self.fileobj.read(4), self.data[10:14])
+        self.failUnlessEqual(len(self.raw.reads), 1)
+        self.failUnlessEqual(self.raw.seeks, 0)
+
+    def test_large_read(self):
+        self.fileobj.seek(1000)
+        self.failUnlessEqual(self.fileobj.read(4000), self.data[1000:5000])
+        self.failUnlessEqual(self.raw.reads, [(1000, 4000)])
+
+    def test_large_read_after_small(self):
+        self.fileobj.read(10)
+        self.failUnlessEqual(self.fileobj.read(3000), self.data[10:3010])
+        self.failUnlessEqual(self.raw.reads, [(0, 1024), (1024, 1986)])
+
+    def test_header_and_footer(self):
+        self.fileobj.read(10)
+        self.fileobj.seek(-128, 2)
+        self.failUnlessEqual(self.fileobj.read(), self.data[-128:])
+        self.fileobj.seek(4)
+        self.failUnlessEqual(self.fileobj.read(4), self.data[4:8])
+        self.fileobj.seek(-16, 2)
+        self.failUnlessEqual(self.fileobj.read(), self.data[-16:])
+        self.failUnlessEqual(len(self.raw.reads), 2)
+
+    def test_read_across_buffers(self):
+        self.fileobj.seek(2000)
+        self.fileobj.read(1)
+        self.fileobj.seek(0)
+        self.fileobj.read(1)
+        self.fileobj.seek(1000)
+        self.failUnlessEqual(self.fileobj.read(2000), self.data[1000:3000])
+        self.failUnlessEqual(self.raw.reads,
+                             [(1024, 1024), (0, 1024), (2048, 1024)])
+
+    def test_read_all(self):
+        self.fileobj.read(10)
+        self.failUnlessEqual(self.fileobj.read(), self.data[10:])
+        self.failUnlessEqual(self.fileobj.read(), b"")
+        self.failUnlessEqual(self.fileobj.read(1), b"")
+
+    def test_seek_end(self):
+        self.fileobj.seek(-128, 2)
+        self.failUnlessEqual(self.fileobj.tell(), len(self.data) - 128)
+        self.failUnlessEqual(self.fileobj.read(3), self.data[-128:-125])
+        self.fileobj.seek(-10, 2)
+        self.failUnlessEqual(self.raw.seeks, 2)
+        self.failUnlessEqual(self.fileobj.read(20), self.data[-10:])
+
+    def test_seek_before_start(self):
+        self.failUnlessRaises(IOError, self.fileobj.seek, -1)
+        self.failUnlessRaises(IOError, self.fileobj.seek, -1 - len(self.data), 2)
+
+    def test_past_end(self):
+        self.fileobj.seek(len(self.data) + 10)
+        self.failUnlessEqual(self.fileobj.read(4), b"")
+
+    def test_open_fileobj(self):
+        fileobj, opened = open_fileobj(__file__)
+        try:
+            self.failUnless(opened)
+            self.failUnless(isinstance(fileobj, BufferedReader))
+            self.failUnlessEqual(fileobj.name, __file__)
+            self.failUnlessEqual(open_fileobj(__file__, fileobj),
+                                 (fileobj, False))
+        finally: fileobj.close()
+        raw = open(__file__, "rb", 0)
+        try:
+            fileobj, opened = open_fileobj(raw)
+            self.failIf(opened)
+            self.failUnless(isinstance(fileobj, BufferedReader))
+        finally: raw.close()
+
+add(TBufferedReader)
+
 class FileHandling(TestCase):
     def file(self, contents):
         import tempfile
@@ -349,4 +527,221 @@ class FileHandling(TestCase):
             fobj.seek(0)
             self.failUnless(fobj.read() == data)
 
+    def check_move(self, size, offset, length=5 * 4096 + 7):
+        data = bytes(bytearray(random.randrange(256) for i in range(length)))
+        o = self.file(data)
+        insert_bytes(o, size, offset)
+        moved = self.read(o)
+        self.assertEquals(len(moved), length + size)
+        self.assertEquals(moved[:offset], data[:offset])
+        self.assertEquals(moved[offset + size:], data[offset:])
+        # Also check that nothing buffered is stale.
+        o.seek(offset + size)
+        self.assertEquals(o.read(10), data[offset:offset + 10])
+        delete_bytes(o, size, offset)
+        self.assertEquals(self.read(o), data)
+
+    def test_move_blocks(self):
+        for offset in [0, 100, 4096, 4097, 5 * 4096]:
+            self.check_move(8192, offset)
+
+    def test_move_large(self):
+        for offset in [0, 100, 4097]:
+            self.check_move(2**16 + 3, offset, length=3 * 2**16 + 11)
+
+    def test_move_without_kernel_help(self):
+        import os
+        import mutagen._util
+        fallocate = mutagen._util._fallocate
+        copy_file_range = getattr(os, "copy_file_range", None)
+        mutagen._util._fallocate = False
+        if copy_file_range is not None: del(os.copy_file_range)
+        try:
+            self.check_move(8192, 100)
+            self.check_move(2**16 + 3, 100, length=3 * 2**16 + 11)
+        finally:
+            mutagen._util._fallocate = fallocate
+            if copy_file_range is not None:
+                os.copy_file_range = copy_file_range
+
+    def test_insert_uses_fallocate(self):
+        import mutagen._util
+        o = self.file(b"x" * 3 * 4096)
+        if mutagen._util._block_size(o) is None: return
+        calls = []
+        fallocate = mutagen._util._fallocate
+        def counting(*args):
+            calls.append(args[1:])
+            return fallocate(*args)
+        mutagen._util._fallocate = counting
+        try:
+            self.assertEquals(mutagen._util.insert_size(o, 100, 10), 100)
+            size = mutagen._util.insert_size(o, 100, 10, MOVE_SIZE=0)
+            self.assertEquals(size, mutagen._util._block_size(o))
+            insert_bytes(o, size, 10)
+            delete_bytes(o, size, 10)
+        finally:
+            mutagen._util._fallocate = fallocate
+        self.assertEquals(self.read(o), b"x" * 3 * 4096)
+        self.assertEquals(len(calls), 2)
+
 add(FileHandling)
+
+class TOverlay(TestCase):
+    def file(self, contents):
+        import tempfile
+        temp = tempfile.TemporaryFile()
+        temp.write(contents)
+        temp.flush()
+        temp.seek(0)
+        return temp
+
+    def read(self, fobj):
+        fobj.seek(0, 0)
+        return fobj.read()
+
+    def check(self, overlay, reference, source, data):
+        out = self.file(b"")
+        overlay.write_to(out)
+        self.assertEquals(self.read(out), self.read(reference))
+        self.assertEquals(self.read(source), data)
+        overlay.seek(0)
+        self.assertEquals(overlay.read(), self.read(reference))
+
+    def test_unchanged(self):
+        data = b"abcdefghij" * 1000
+        source = self.file(data)
+        self.check(Overlay(source), self.file(data), source, data)
+
+    def test_changes(self):
+        data = b"abcdefghij" * 1000
+        source, reference = self.file(data), self.file(data)
+        overlay = Overlay(source)
+        for fobj in [overlay, reference]:
+            insert_bytes(fobj, 100, 5)
+            fobj.seek(3)
+            fobj.write(b"x" * 200)
+            delete_bytes(fobj, 50, 9000)
+            fobj.seek(-20, 2)
+            fobj.truncate()
+            fobj.seek(0, 2)
+            fobj.write(b"tail")
+        self.check(overlay, reference, source, data)
+
+    def test_many_changes(self, num_changes=300):
+        data = bytes(bytearray(random.randrange(256) for i in range(20000)))
+        source, reference = self.file(data), self.file(data)
+        overlay = Overlay(source)
+        for i in range(num_changes):
+            reference.seek(0, 2)
+            size = reference.tell()
+            offset = random.randrange(size)
+            change = random.randrange(1, 500)
+            action = random.randrange(3)
+            for fobj in [overlay, reference]:
+                if action == 0:
+                    # The contents of inserted space are undefined.
+                    insert_bytes(fobj, change, offset)
+                    fobj.seek(offset)
+                    fobj.write(b"i" * change)
+                elif action == 1 and offset + change < size:
+                    delete_bytes(fobj, change, offset)
+                else:
+                    fobj.seek(offset)
+                    fobj.write(b"%d" % i * change)
+            overlay.seek(offset)
+            reference.seek(offset)
+            self.assertEquals(overlay.read(change), reference.read(change))
+        self.check(overlay, reference, source, data)
+
+    def test_write_into_inserted(self):
+        data = b"abcdefghij" * 100
+        source, reference = self.file(data), self.file(data)
+        overlay = Overlay(source)
+        for fobj in [overlay, reference]:
+            insert_bytes(fobj, 300, 500)
+            fobj.seek(600)
+            fobj.write(b"x" * 10)
+            fobj.seek(800)
+            fobj.write(b"y" * 10)
+            fobj.seek(500)
+            fobj.write(b"\x00" * 100)
+            fobj.seek(610)
+            fobj.write(b"\x00" * 190)
+        self.check(overlay, reference, source, data)
+
+    def test_write_changed(self):
+        data = b"abcdefghij" * 1000
+        for fobj in [self.file(data), Overlay(self.file(data))]:
+            fobj.seek(10)
+            self.assertEquals(write_changed(fobj, data[10:9000]), 0)
+            self.assertEquals(fobj.tell(), 9000)
+            fobj.seek(10)
+            new = data[10:5000] + b"x" + data[5001:9000]
+            self.assertEquals(write_changed(fobj, new), 1)
+            fobj.seek(9999)
+            self.assertEquals(write_changed(fobj, b"j" + b"z" * 20), 20)
+            self.assertEquals(
+                self.read(fobj), data[:5000] + b"x" + data[5001:] + b"z" * 20)
+        if isinstance(fobj, Overlay): self.assertEquals(fobj.written, 21)
+
+    def test_save_state(self):
+        import tempfile, os
+        fd, name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            # too new to tell from a change in the same tick
+            self.failUnless(save_state(name, b"ab", b"c") is None)
+            os.utime(name, (0, 0))
+            state = save_state(name, b"ab", b"c")
+            self.failIf(state is None)
+            self.assertEquals(state, save_state(name, b"ab", b"c"))
+            self.assertNotEquals(state, save_state(name, b"a", b"bc"))
+            fileobj = open(name, "wb")
+            fileobj.write(b"x")
+            fileobj.close()
+            os.utime(name, (0, 0))
+            self.assertNotEquals(state, save_state(name, b"ab", b"c"))
+        finally: os.unlink(name)
+        self.failUnless(save_state(name) is None)
+        self.failUnless(save_state(self.file(b"")) is None)
+
+    def test_counts(self):
+        source = self.file(b"x" * 1000)
+        overlay = Overlay(source)
+        self.assertEquals((overlay.written, overlay.moved), (0, 0))
+        overlay.seek(10)
+        overlay.write(b"abc")
+        insert_bytes(overlay, 100, 400)
+        delete_bytes(overlay, 50, 800)
+        self.assertEquals(overlay.written, 3)
+        self.assertEquals(overlay.moved, 600 + 250)
+        self.assertEquals(overlay.source_size, 1000)
+        self.assertEquals(overlay.size(), 1050)
+        self.failUnless(overlay.padding is None)
+
+    def test_write_over_source(self):
+        import tempfile, os
+        fd, name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            source = open(name, "rb")
+            try:
+                overlay = Overlay(source)
+                self.failUnlessRaises(ValueError, overlay.write_to, name)
+            finally: source.close()
+        finally: os.unlink(name)
+
+    def test_copy_bytes(self):
+        from io import BytesIO
+        data = b"0123456789" * 10000
+        for src in [self.file(data), BytesIO(data)]:
+            for dst in [self.file(b"head"), BytesIO(b"head")]:
+                dst.seek(0, 2)
+                copy_bytes(src, 5, 50000, dst)
+                self.assertEquals(dst.tell(), 50004)
+                self.assertEquals(self.read(dst), b"head" + data[5:50005])
+        self.failUnlessRaises(
+            IOError, copy_bytes, BytesIO(data), 5, len(data), BytesIO())
+
+add(TOverlay)
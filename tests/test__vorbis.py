@@ -212,4 +212,23 @@ class TVCommentDict(TestCase):
         self.failUnlessEqual(len(list(self.c.keys())), 1)
         self.failUnlessEqual(len(self.c.as_dict()), 1)
 
+    def test_selected_keys(self):
+        c = self.Kind(self.c.write(), keys=["TITLE"])
+        self.failUnlessEqual(list(c.keys()), ["title"])
+        self.failIf("artist" in c)
+        # Skipped comments are written after the others.
+        self.failUnlessEqual(sorted(self.Kind(c.write())), sorted(self.c))
+
+    def test_selected_keys_set_skipped(self):
+        c = self.Kind(self.c.write(), keys=["title"])
+        c["artist"] = "new"
+        self.failUnlessEqual(self.Kind(c.write())["artist"], ["new"])
+        del(c["artist"])
+        self.failIf("artist" in self.Kind(c.write()))
+        c = self.Kind(self.c.write(), keys=["title"])
+        del(c["artist"])
+        self.failUnlessEqual(list(self.Kind(c.write()).keys()), ["title"])
+        c.clear()
+        self.failIf(self.Kind(c.write()))
+
 add(TVCommentDict)
@@ -0,0 +1,161 @@
+import os
+import time
+import shutil
+import asyncio
+import threading
+from tempfile import mkstemp
+from concurrent.futures import ThreadPoolExecutor
+
+from tests import TestCase, add
+from mutagen import aio
+from mutagen.mp3 import MP3, HeaderNotFoundError
+
+class SlowFile(object):
+    """A file object that blocks for a while on every read."""
+
+    def __init__(self, data, delay=0.005):
+        self.data, self.pos, self.delay, self.reads = data, 0, delay, 0
+    def read(self, size=-1):
+        time.sleep(self.delay)
+        self.reads += 1
+        if size < 0: size = len(self.data)
+        data = self.data[self.pos:self.pos + size]
+        self.pos += len(data)
+        return data
+    def seek(self, offset, whence=0):
+        if whence == 1: offset += self.pos
+        elif whence == 2: offset += len(self.data)
+        self.pos = offset
+    def tell(self):
+        return self.pos
+    def close(self):
+        pass
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try: return loop.run_until_complete(coro)
+    finally: loop.close()
+
+async def ticking(coro, interval=0.001):
+    """Run coro while counting how often the loop gets to run a ticker."""
+    ticks = [0]
+    async def ticker():
+        while True:
+            await asyncio.sleep(interval)
+            ticks[0] += 1
+    task = asyncio.ensure_future(ticker())
+    try: result = await coro
+    finally: task.cancel()
+    return result, ticks[0]
+
+class TAio(TestCase):
+    uses_mmap = False
+
+    SAMPLE = os.path.join("tests", "data", "silence-44-s.mp3")
+
+    def setUp(self):
+        fd, self.filename = mkstemp(suffix='.mp3')
+        os.close(fd)
+        shutil.copy(self.SAMPLE, self.filename)
+        self.data = open(self.SAMPLE, "rb").read()
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_file(self):
+        audio = run(aio.File(self.filename))
+        self.failUnless(isinstance(audio, MP3))
+        self.failUnlessEqual(audio["TIT2"], ["Silence"])
+
+    def test_file_easy(self):
+        audio = run(aio.File(self.filename, easy=True))
+        self.failUnlessEqual(audio["title"], ["Silence"])
+
+    def test_responsive(self):
+        fileobj = SlowFile(self.data)
+        audio, ticks = run(ticking(aio.File(fileobj)))
+        self.failUnlessEqual(audio["TIT2"], ["Silence"])
+        self.failUnless(fileobj.reads >= 2)
+        # The loop kept running while the reads blocked a worker.
+        self.failUnless(ticks >= fileobj.reads)
+
+    def test_save(self):
+        async def edit():
+            audio = await aio.File(self.filename)
+            audio["TIT2"].text = ["Edited"]
+            await audio.save_async()
+        run(edit())
+        self.failUnlessEqual(MP3(self.filename)["TIT2"], ["Edited"])
+
+    def test_cancel_before_save(self):
+        pool = ThreadPoolExecutor(1)
+        release = threading.Event()
+        pool.submit(release.wait, 10)
+        audio = MP3(self.filename)
+        audio["TIT2"].text = ["Edited"]
+        async def cancel():
+            task = asyncio.ensure_future(audio.save_async(executor=pool))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            try: await task
+            except asyncio.CancelledError: return True
+        try: self.failUnless(run(cancel()))
+        finally:
+            release.set()
+            pool.shutdown()
+        self.failUnlessEqual(open(self.filename, "rb").read(), self.data)
+
+    def test_cancel_during_save(self):
+        started, release = threading.Event(), threading.Event()
+        audio = MP3(self.filename)
+        audio["TIT2"].text = ["Edited"]
+        save = audio.tags.save
+        def slow_save(*args, **kwargs):
+            started.set()
+            release.wait(10)
+            save(*args, **kwargs)
+        audio.tags.save = slow_save
+        async def cancel():
+            task = asyncio.ensure_future(audio.save_async())
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            self.failIf(task.done())
+            release.set()
+            try: await task
+            except asyncio.CancelledError: return True
+        try: self.failUnless(run(cancel()))
+        finally: release.set()
+        self.failUnlessEqual(MP3(self.filename)["TIT2"], ["Edited"])
+
+    def test_scan(self):
+        paths = [self.filename, "tests/data/emptyfile.mp3", self.SAMPLE]
+        async def collect(**kwargs):
+            return [r async for r in aio.scan(paths, **kwargs)]
+        results = run(collect())
+        self.failUnlessEqual([p for (p, r) in results], paths)
+        self.failUnless(isinstance(results[0][1], MP3))
+        self.failUnless(isinstance(results[1][1], HeaderNotFoundError))
+        results = run(collect(ordered=False, limit=1))
+        self.failUnlessEqual(sorted(p for (p, r) in results), sorted(paths))
+
+    def test_scan_limit(self):
+        active, most = [0], [0]
+        lock = threading.Lock()
+        def loader(fileobj):
+            with lock:
+                active[0] += 1
+                most[0] = max(most[0], active[0])
+            try: return MP3(fileobj)
+            finally:
+                with lock: active[0] -= 1
+        files = [SlowFile(self.data) for i in range(8)]
+        async def collect():
+            return [r async for r in aio.scan(files, loader, limit=2)]
+        (results, ticks) = run(ticking(collect()))
+        self.failUnlessEqual(len(results), 8)
+        self.failUnless(most[0] <= 2)
+        self.failUnless(ticks > 8)
+
+add(TAio)
@@ -4,6 +4,7 @@ from tempfile import mkstemp
 from tests import TestCase, add
 from mutagen.asf import ASF, ASFHeaderError, ASFValue, UNICODE, DWORD, QWORD
 from mutagen.asf import BOOL, WORD, BYTEARRAY
+from mutagen import FixedPadding
 
 class TASFFile(TestCase):
 
@@ -69,6 +70,18 @@ class TASF(TestCase):
     def test_pprint(self):
         self.failUnless(self.audio.pprint())
 
+    def test_save_twice(self):
+        self.audio["Title"] = ["x" * 3000]
+        self.audio.save()
+        self.audio["Title"] = ["y" * 6000]
+        self.audio.save()
+        audio = ASF(self.filename)
+        self.failUnlessEqual(audio["Title"], ["y" * 6000])
+        self.failUnlessEqual(audio.info.pprint(), self.audio.info.pprint())
+        audio.save(padding=FixedPadding())
+        self.failUnlessEqual(os.path.getsize(self.filename), audio.size +
+                             os.path.getsize(self.original) - ASF(self.original).size)
+
     def set_key(self, key, value, result=None, expected=True):
         self.audio[key] = value
         self.audio.save()
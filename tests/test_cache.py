@@ -0,0 +1,149 @@
+import os
+import time
+import shutil
+from tempfile import mkstemp, mkdtemp
+
+from tests import TestCase, add
+from mutagen.cache import Cache
+from mutagen.mp3 import MP3
+from mutagen.flac import FLAC
+
+class TCache(TestCase):
+    uses_mmap = False
+
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.mp3 = os.path.join(self.dir, "a.mp3")
+        self.flac = os.path.join(self.dir, "b.flac")
+        shutil.copy(os.path.join("tests", "data", "silence-44-s.mp3"),
+                    self.mp3)
+        shutil.copy(os.path.join("tests", "data", "silence-44-s.flac"),
+                    self.flac)
+        self.age(self.mp3)
+        self.age(self.flac)
+        self.db = os.path.join(self.dir, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def age(self, filename, seconds=60):
+        then = time.time() - seconds
+        os.utime(filename, (then, then))
+
+    def test_hit(self):
+        cache = Cache()
+        first = cache.File(self.mp3)
+        second = cache.File(self.mp3)
+        self.failUnlessEqual((cache.hits, cache.misses), (1, 1))
+        self.failUnless(isinstance(second, MP3))
+        self.failUnlessEqual(second["TIT2"], first["TIT2"])
+        self.failUnlessEqual(second.info.length, first.info.length)
+        self.failIf(first is second)
+
+    def test_copies(self):
+        cache = Cache()
+        cache.File(self.mp3)["TIT2"].text = ["Changed"]
+        self.failUnlessEqual(cache.File(self.mp3)["TIT2"], ["Silence"])
+
+    def test_persistent(self):
+        cache = Cache(self.db)
+        cache.File(self.mp3)
+        cache.File(self.flac, easy=True)
+        cache.close()
+        cache = Cache(self.db)
+        self.failUnlessEqual(cache.File(self.flac, easy=True)["title"],
+                             ["Silence"])
+        self.failUnlessEqual(cache.File(self.mp3)["TIT2"], ["Silence"])
+        self.failUnlessEqual((cache.hits, cache.misses), (2, 0))
+        cache.close()
+
+    def test_kinds(self):
+        cache = Cache()
+        cache.File(self.mp3)
+        cache.File(self.mp3, easy=True)
+        cache.File(self.mp3, options=[MP3])
+        self.failUnless(isinstance(cache.open(MP3, self.mp3), MP3))
+        self.failUnlessEqual((cache.hits, cache.misses), (0, 4))
+        self.failUnlessEqual(cache.File(self.mp3, easy=True)["title"],
+                             ["Silence"])
+        self.failUnlessEqual((cache.hits, cache.misses), (1, 4))
+
+    def test_save_invalidates(self):
+        cache = Cache(self.db)
+        audio = cache.File(self.mp3)
+        audio["TIT2"].text = ["Edited"]
+        audio.save()
+        self.age(self.mp3, 30)
+        self.failUnlessEqual(cache.File(self.mp3)["TIT2"], ["Edited"])
+        self.failUnlessEqual((cache.hits, cache.misses), (0, 2))
+        self.failUnlessEqual(cache.File(self.mp3)["TIT2"], ["Edited"])
+        self.failUnlessEqual(cache.hits, 1)
+        cache.close()
+
+    def test_delete_invalidates(self):
+        cache = Cache()
+        cache.File(self.flac).delete()
+        self.age(self.flac, 30)
+        self.failIf(cache.File(self.flac).tags)
+        self.failUnlessEqual(cache.misses, 2)
+
+    def test_recent_not_stored(self):
+        cache = Cache()
+        os.utime(self.mp3, None)
+        cache.File(self.mp3)
+        cache.File(self.mp3)
+        self.failUnlessEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_invalidate(self):
+        cache = Cache(self.db)
+        cache.File(self.mp3)
+        cache.invalidate(self.mp3)
+        cache.File(self.mp3)
+        self.failUnlessEqual((cache.hits, cache.misses), (0, 2))
+        cache.close()
+
+    def test_lru(self):
+        cache = Cache(size=1)
+        cache.File(self.mp3)
+        cache.File(self.flac)
+        cache.File(self.flac)
+        cache.File(self.mp3)
+        self.failUnlessEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_lru_before_disk(self):
+        cache = Cache(self.db, size=1)
+        cache.File(self.mp3)
+        cache.File(self.flac)
+        cache.File(self.mp3)
+        self.failUnlessEqual((cache.hits, cache.misses), (1, 2))
+        cache.close()
+
+    def test_other_name(self):
+        cache = Cache()
+        cache.File(self.mp3)
+        other = os.path.join(self.dir, "c.mp3")
+        os.rename(self.mp3, other)
+        audio = cache.File(other)
+        self.failUnlessEqual(cache.hits, 1)
+        self.failUnlessEqual(audio.filename, other)
+        self.failUnlessEqual(audio.tags.filename, other)
+
+    def test_unknown(self):
+        cache = Cache()
+        other = os.path.join(self.dir, "c.txt")
+        open(other, "wb").write(b"not audio" * 100)
+        self.age(other)
+        self.failUnless(cache.File(other) is None)
+        self.failUnless(cache.File(other) is None)
+        self.failUnlessEqual(cache.hits, 1)
+
+    def test_errors_not_cached(self):
+        cache = Cache()
+        other = os.path.join(self.dir, "c.flac")
+        open(other, "wb").write(b"fLaC" + b"\xff" * 100)
+        self.age(other)
+        self.failUnlessRaises(Exception, cache.open, FLAC, other)
+        self.failUnlessRaises(Exception, cache.open, FLAC, other)
+        self.failUnlessEqual((cache.hits, cache.misses), (0, 2))
+
+add(TCache)
@@ -251,6 +251,24 @@ class TEasyID3(TestCase):
         self.failIf("replaygain_foo_gain" in list(self.id3.keys()))
         self.failIf("replaygain_bar_gain" in list(self.id3.keys()))
 
+    def test_selected_keys(self):
+        self.id3["title"] = "a title"
+        self.id3["artist"] = "an artist"
+        self.id3["date"] = "2004"
+        self.id3["performer:piano"] = "a pianist"
+        self.id3.save(self.filename)
+        id3 = EasyID3(self.filename, keys=["Title", "date", "performer:foo"])
+        self.failUnlessEqual(sorted(id3.keys()),
+                             ["date", "performer:piano", "title"])
+        self.failUnlessEqual(id3["date"], ["2004"])
+
+    def test_selected_unknown_key(self):
+        self.id3["title"] = "a title"
+        self.id3["artist"] = "an artist"
+        self.id3.save(self.filename)
+        id3 = EasyID3(self.filename, keys=["title", "unregistered"])
+        self.failUnlessEqual(sorted(id3.keys()), ["artist", "title"])
+
     def tearDown(self):
         os.unlink(self.filename)
 
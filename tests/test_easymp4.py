@@ -143,6 +143,18 @@ class TEasyMP4(TestCase):
             self.failUnlessRaises(
                 ValueError, self.mp4.__setitem__, tag, "hello")
 
+    def test_selected_keys(self):
+        self.mp4["title"] = "a title"
+        self.mp4["artist"] = "an artist"
+        self.mp4["tracknumber"] = "1/2"
+        self.mp4["musicbrainz_trackid"] = "an id"
+        self.mp4.save()
+        mp4 = EasyMP4(self.filename,
+                      keys=["title", "TrackNumber", "musicbrainz_trackid"])
+        self.failUnlessEqual(sorted(mp4.keys()),
+                             ["musicbrainz_trackid", "title", "tracknumber"])
+        self.failUnlessEqual(mp4["tracknumber"], ["1/2"])
+
     def tearDown(self):
         os.unlink(self.filename)
 
@@ -1,6 +1,7 @@
 
 from __future__ import print_function
 import shutil, os
+import pickle
 from tests import TestCase, add
 from mutagen.id3 import ID3, TIT2, ID3NoHeaderError
 from mutagen.flac import to_int_be, Padding, VCFLACDict, MetadataBlock
@@ -111,6 +112,8 @@ class TSeekTable(TestCase):
     def test_repr(self): repr(self.st)
     def test_roundtrip(self):
         self.failUnlessEqual(SeekTable(self.st.write()), self.st)
+    def test_pickle(self):
+        self.failUnlessEqual(pickle.loads(pickle.dumps(self.st)), self.st)
 add(TSeekTable)
 
 class TCueSheet(TestCase):
@@ -152,6 +155,8 @@ class TCueSheet(TestCase):
     def test_repr(self): repr(self.cs)
     def test_roundtrip(self):
         self.failUnlessEqual(CueSheet(self.cs.write()), self.cs)
+    def test_pickle(self):
+        self.failUnlessEqual(pickle.loads(pickle.dumps(self.cs)), self.cs)
 add(TCueSheet)
 
 class TPicture(TestCase):
@@ -391,6 +396,29 @@ class TFLAC(TestCase):
     def test_variable_block_size(self):
         FLAC(os.path.join("tests", "data", "variable-block.flac"))
 
+    def test_selected_keys(self):
+        flac = FLAC(self.NEW, keys=["title", "ARTIST"])
+        self.failUnlessEqual(sorted(flac.keys()), ["artist", "title"])
+        self.failUnlessEqual(flac["artist"], self.flac["artist"])
+        self.failIf(flac.pictures)
+
+    def test_selected_keys_save(self):
+        flac = FLAC(self.NEW, keys=["title"])
+        flac["title"] = "changed"
+        flac.save()
+        flac = FLAC(self.NEW)
+        self.failUnlessEqual(flac["title"], ["changed"])
+        self.failUnlessEqual(flac["album"], self.flac["album"])
+        self.failUnlessEqual(len(flac.pictures), 1)
+        self.failUnlessEqual(flac.pictures[0].data,
+                             self.flac.pictures[0].data)
+
+    def test_selected_keys_clear_pictures(self):
+        flac = FLAC(self.NEW, keys=["title"])
+        flac.clear_pictures()
+        flac.save()
+        self.failIf(FLAC(self.NEW).pictures)
+
     def tearDown(self):
         os.unlink(self.NEW)
 
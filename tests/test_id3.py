@@ -1,5 +1,6 @@
 import os; from os.path import join
 import shutil
+import struct
 from unittest import TestCase
 from tests import add
 from mutagen.id3 import ID3, BitPaddedInt, COMR, Frames, Frames_2_2, ID3Warning, ID3JunkFrameError
@@ -63,6 +64,26 @@ class ID3GetSetDel(TestCase):
         self.assertEquals(self.i["FOOB:az"], t2)
         self.assert_(self.i.getall("FOOB") in [[t, t2], [t2, t]])
 
+    def test_getprefix(self):
+        self.i["TXXX:QuodLibet::a"] = 5
+        self.i["TXXX:QuodLibet::b"] = 6
+        self.i["TXXX:QuodLibetx:c"] = 7
+        self.assertEquals(sorted(self.i.getall("TXXX:QuodLibet:")), [5, 6])
+        self.assertEquals(sorted(self.i.getall("TXXX")), [5, 6, 7])
+        self.assertEquals(self.i.getall("TXXX:Quod"), [])
+        self.assertEquals(self.i.getall("FOO"), [])
+
+    def test_index_follows_dict(self):
+        del(self.i["FOOB:ar"])
+        self.assertEquals(self.i.getall("FOOB"), [4])
+        self.i.pop("FOOB:az")
+        self.assertEquals(self.i.getall("FOOB"), [])
+        self.i["FOOB:ar"] = 8
+        self.i["FOOB:ar"] = 9
+        self.assertEquals(self.i.getall("FOOB"), [9])
+        self.i.clear()
+        self.assertEquals(self.i.getall("FOOB"), [])
+
 class ID3Loading(TestCase):
     uses_mmap = False
 
@@ -270,6 +291,18 @@ class ID3Tags(TestCase):
     def test_junkframe(self):
         self.assertRaises(ValueError, Frames["TPE1"].fromData, _24, 0, b"")
 
+    def test_fromdata_view(self):
+        data = memoryview(b"xx\x00abc")
+        tpe1 = Frames["TPE1"].fromData(_24, 0, data[2:])
+        self.assertEquals(tpe1, "abc")
+        self.failUnless(isinstance(tpe1._rawdata, bytearray))
+
+    def test_22_padding(self):
+        data = b"TT2\x00\x00\x04\x00abc" + b"\x00" * 20
+        frames = list(_22._ID3__read_frames(data, Frames_2_2))
+        self.assertEquals(1, len(frames))
+        self.assertEquals("abc", frames[0])
+
     def test_bad_sylt(self):
         self.assertRaises(
             ID3JunkFrameError, Frames["SYLT"].fromData, _24, 0x0,
@@ -882,6 +915,21 @@ class BitPaddedIntTest(TestCase):
         self.assertEquals(BitPaddedInt(238).as_str(),
                 BitPaddedInt(pack('>L', 238)).as_str())
 
+    def test_syncsafe_decode(self):
+        from mutagen.id3 import syncsafe_decode
+        for data in [b'\x00\x00\x00\x00', b'\x00\x00\x01\x01',
+                     b'\x7f\x7f\x7f\x7f', b'\x00\x00\x01\x81', b'\x01']:
+            self.assertEquals(syncsafe_decode(data), BitPaddedInt(data))
+            self.assertEquals(type(syncsafe_decode(data)), int)
+
+    def test_syncsafe_encode(self):
+        from mutagen.id3 import syncsafe_encode
+        for value in [0, 1, 129, 0xFFFF, 0xFFFFFFF]:
+            self.assertEquals(
+                syncsafe_encode(value), BitPaddedInt.to_str(value))
+        self.assertRaises(ValueError, syncsafe_encode, 0x10000000)
+        self.assertRaises(ValueError, syncsafe_encode, -1)
+
     def test_varwidth(self):
         self.assertEquals(len(BitPaddedInt.to_str(100)), 4)
         self.assertEquals(len(BitPaddedInt.to_str(100, width=-1)), 4)
@@ -951,9 +999,36 @@ class SpecSanityChecks(TestCase):
         self.assertEquals(b'\x04\x00', s.write(None, 2.0))
         self.assertEquals(b'\xfc\x00', s.write(None, -2.0))
 
+    def test_read_at(self):
+        from mutagen.id3 import EncodedTextSpec, Frame
+        s = EncodedTextSpec('name')
+        f = Frame(); f.encoding = 0
+        self.assertEquals(('cd', 5), s.read_at(f, bytearray(b'abcd\x00fg'), 2))
+        f.encoding = 1
+        data = bytearray(b'xx\xff\xfea\x00\x00\x00b\x00')
+        self.assertEquals(('a', 8), s.read_at(f, data, 2))
+
+    def test_read_only_spec(self):
+        from mutagen.id3 import Frame, ByteSpec, BinaryDataSpec
+        class UpperSpec(BinaryDataSpec):
+            def read(self, frame, data):
+                return bytes(data[:2]).upper(), data[2:]
+        class XUPP(Frame):
+            _framespec = [ ByteSpec('byte'), UpperSpec('upper'),
+                           BinaryDataSpec('rest') ]
+        frame = XUPP.fromData(_24, 0, b'\x01abcd')
+        self.assertEquals(1, frame.byte)
+        self.assertEquals(b'AB', frame.upper)
+        self.assertEquals(b'cd', frame.rest)
+
 class FrameSanityChecks(TestCase):
     uses_mmap = False
 
+    def test_codec_per_class(self):
+        from mutagen.id3 import APIC, PIC
+        self.failIf(APIC._get_codec() is PIC._get_codec())
+        self.failUnless(APIC._get_codec() is APIC._get_codec())
+
     def test_TF(self):
         from mutagen.id3 import TextFrame
         self.assert_(isinstance(TextFrame(text='text'), TextFrame))
@@ -1048,6 +1123,20 @@ class FrameSanityChecks(TestCase):
         self.assertRaises(ValueError, un.decode, bytearray(b'\xff\xe0'))
         self.assertEquals(b'\xff\x44', un.decode(bytearray(b'\xff\x44')))
 
+    def test_unsync_decode_zeros(self):
+        from mutagen.id3 import unsynch as un
+        self.assertEquals(b'\xff\x00', un.decode(b'\xff\x00\x00'))
+        self.assertEquals(b'\xff\xff', un.decode(b'\xff\x00\xff\x00'))
+        self.assertEquals(b'a\xffb', un.decode(memoryview(b'a\xff\x00b')))
+        self.assertRaises(ValueError, un.decode, b'ab\xff')
+
+    def test_unsync_encode_runs(self):
+        from mutagen.id3 import unsynch as un
+        self.assertEquals(b'\xff\x00\xff\x00\xff\x00',
+                          un.encode(b'\xff\xff\xff'))
+        self.assertEquals(b'\xff\x00\xe0\xff\x01',
+                          un.encode(memoryview(b'\xff\xe0\xff\x01')))
+
     def test_load_write(self):
         from mutagen.id3 import TPE1, Frames
         artists= [s.decode('utf8') for s in
@@ -1373,6 +1462,40 @@ class BrokenButParsed(TestCase):
         self.assertEquals('a'*127, tagsgood[0])
         self.assertEquals('a'*255, tagsbad[0])
 
+    def test_detect_23_ints_not_syncsafe(self):
+        from mutagen.id3 import Frames
+        head = b'TIT1\x00\x00\x00\x80\x00\x00\x00'
+        tail = b'TPE1\x00\x00\x00\x04\x00\x00Yay!'
+        tags = list(_24._ID3__read_frames(head + b'a'*127 + tail, Frames))
+        self.assertEquals(2, len(tags))
+        self.assertEquals('a'*127, tags[0])
+        self.assertEquals('Yay!', tags[1])
+
+    def test_detect_small_frames_with_padding(self):
+        from mutagen.id3 import Frames, syncsafe_int
+        data = (b'TIT1\x00\x00\x00\x02\x00\x00\x00a' +
+                b'TPE1\x00\x00\x00\x04\x00\x00Yay!' + b'\x00' * 100)
+        self.assertEquals(
+            syncsafe_int, _24._ID3__determine_bpi(data, Frames))
+        tags = list(_24._ID3__read_frames(data, Frames))
+        self.assertEquals(['a', 'Yay!'], [str(t) for t in tags])
+
+    def test_detect_large_tag_in_one_walk(self):
+        import mutagen.id3
+        from mutagen.id3 import Frames, syncsafe_int
+        # 200 byte frames, where syncsafe and plain sizes disagree
+        frame = b'TXXX\x00\x00\x01\x48\x00\x00\x03desc\x00' + b'v' * 194
+        data = frame * 300 + b'\x00' * 100
+        walks = []
+        def walk(*args):
+            walks.append(args)
+            return orig(*args)
+        orig, mutagen.id3._walk_frames = mutagen.id3._walk_frames, walk
+        try: bpi = _24._ID3__determine_bpi(data, Frames)
+        finally: mutagen.id3._walk_frames = orig
+        self.assertEquals(syncsafe_int, bpi)
+        self.assertEquals(1, len(walks))
+
 
 class TimeStamp(TestCase):
     uses_mmap = False
@@ -1483,6 +1606,12 @@ class WriteRoundtrip(TestCase):
         self.assertEquals(id3["TIT2"], "Silence")
         self.assertEquals(id3["TPE1"], ["jzig"])
 
+    def test_same_in_place(self):
+        size = os.path.getsize(self.newsilence)
+        ID3(self.newsilence).save()
+        ID3(self.newsilence).save()
+        self.assertEquals(size, os.path.getsize(self.newsilence))
+
     def test_addframe(self):
         from mutagen.id3 import TIT3
         f = ID3(self.newsilence)
@@ -1577,6 +1706,309 @@ class WriteRoundtrip(TestCase):
         try: os.unlink(self.newsilence)
         except EnvironmentError: pass
 
+class LazyLoading(TestCase):
+    silence = join('tests', 'data', 'silence-44-s.mp3')
+    newsilence = join('tests', 'data', 'silence-lazy.mp3')
+
+    def setUp(self):
+        shutil.copy(self.silence, self.newsilence)
+        # rewrite as ID3v2.4 so frames can be copied unchanged
+        ID3(self.newsilence).save()
+
+    def test_nothing_decoded(self):
+        id3 = ID3(self.newsilence, lazy=True)
+        self.failIf(id3._DictProxy__dict.get("TALB"))
+        self.failUnless("TALB" in id3._ID3__pending)
+
+    def test_decode_on_access(self):
+        id3 = ID3(self.newsilence, lazy=True)
+        self.assertEquals(id3["TALB"], "Quod Libet Test Data")
+        self.failIf("TALB" in id3._ID3__pending)
+        self.failUnless("TIT2" in id3._ID3__pending)
+        self.assertEquals(id3.getall("TPE1"), [["jzig"]])
+
+    def test_len_iter(self):
+        eager = ID3(self.newsilence)
+        self.assertEquals(len(ID3(self.newsilence, lazy=True)), len(eager))
+        self.assertEquals(sorted(ID3(self.newsilence, lazy=True)),
+                          sorted(eager))
+        self.assertEquals(len(ID3(self.newsilence, lazy=True).items()),
+                          len(eager))
+
+    def test_same_as_eager(self):
+        lazy = ID3(self.newsilence, lazy=True)
+        eager = ID3(self.newsilence)
+        self.assertEquals(sorted(lazy.keys()), sorted(eager.keys()))
+        for key in eager.keys():
+            self.assertEquals(repr(lazy[key]), repr(eager[key]))
+
+    def test_pickle(self):
+        import pickle
+        eager = ID3(self.newsilence)
+        for kwargs in [{'lazy': True}, {'frames': ['TIT2']},
+                       {'frames': ['TIT2'], 'lazy': True}]:
+            id3 = pickle.loads(pickle.dumps(ID3(self.newsilence, **kwargs)))
+            self.assertEquals(id3.pprint(),
+                              ID3(self.newsilence, **kwargs).pprint())
+            id3["TIT2"].text = ["Changed"]
+            id3.save()
+            saved = ID3(self.newsilence)
+            self.assertEquals(saved["TIT2"], "Changed")
+            self.assertEquals(sorted(saved.keys()), sorted(eager.keys()))
+
+    def test_save_untouched(self):
+        f = open(self.newsilence, 'rb')
+        try: before = f.read()
+        finally: f.close()
+        ID3(self.newsilence, lazy=True).save()
+        f = open(self.newsilence, 'rb')
+        try: after = f.read()
+        finally: f.close()
+        self.assertEquals(before, after)
+
+    def test_save_changed(self):
+        from mutagen.id3 import TIT3
+        id3 = ID3(self.newsilence, lazy=True)
+        id3["TIT2"].text = ["Changed"]
+        id3.add(TIT3(encoding=0, text="A subtitle!"))
+        id3.save()
+        id3 = ID3(self.newsilence)
+        self.assertEquals(id3["TIT2"], "Changed")
+        self.assertEquals(id3["TIT3"], "A subtitle!")
+        self.assertEquals(id3["TALB"], "Quod Libet Test Data")
+
+    def test_delall(self):
+        id3 = ID3(self.newsilence, lazy=True)
+        id3.delall("TPE1")
+        id3.save()
+        self.failIf("TPE1" in ID3(self.newsilence))
+
+    def test_v23_decoded_on_save(self):
+        shutil.copy(self.silence, self.newsilence)
+        ID3(self.newsilence, lazy=True).save()
+        self.assertEquals(ID3(self.newsilence)["TPE1"], ["jzig"])
+
+    def tearDown(self):
+        os.unlink(self.newsilence)
+
+class SelectedFrames(TestCase):
+    silence = join('tests', 'data', 'silence-44-s.mp3')
+    newsilence = join('tests', 'data', 'silence-selected.mp3')
+
+    def setUp(self):
+        shutil.copy(self.silence, self.newsilence)
+
+    def test_only_selected(self):
+        id3 = ID3(self.newsilence, frames=["TIT2", "TPE1"])
+        self.assertEquals(sorted(id3.keys()), ["TIT2", "TPE1"])
+        self.assertEquals(id3["TIT2"], "Silence")
+        self.failIf("TALB" in id3)
+
+    def test_translated(self):
+        id3 = ID3(self.newsilence, frames=["TDRC"])
+        self.assertEquals(list(id3.keys()), ["TDRC"])
+        self.assertEquals(id3["TDRC"], ID3(self.newsilence)["TDRC"])
+
+    def test_v22(self):
+        filename = join('tests', 'data', 'id3v22-test.mp3')
+        id3 = ID3(filename, frames=["TIT2", "APIC"])
+        self.assertEquals(sorted(id3.keys()), ["TIT2"])
+
+    def test_v1(self):
+        filename = join('tests', 'data', 'silence-44-s-v1.mp3')
+        self.assertEquals(list(ID3(filename, frames=["TALB"]).keys()),
+                          ["TALB"])
+
+    def test_save_keeps_skipped(self):
+        eager = ID3(self.newsilence)
+        for version in [3, 4]:
+            id3 = ID3(self.newsilence, frames=["TIT2"])
+            id3["TIT2"].text = ["Changed %d" % version]
+            id3.save()
+            after = ID3(self.newsilence)
+            self.assertEquals(after["TIT2"], "Changed %d" % version)
+            self.assertEquals(sorted(after.keys()), sorted(eager.keys()))
+            for key in eager.keys():
+                if key != "TIT2":
+                    self.assertEquals(repr(after[key]), repr(eager[key]))
+
+    def test_set_skipped(self):
+        from mutagen.id3 import TALB
+        ID3(self.newsilence).save()
+        id3 = ID3(self.newsilence, frames=["TIT2"])
+        id3.add(TALB(encoding=0, text="New"))
+        id3.save()
+        self.assertEquals(ID3(self.newsilence).getall("TALB"), [["New"]])
+
+    def test_delall_skipped(self):
+        ID3(self.newsilence).save()
+        id3 = ID3(self.newsilence, frames=["TIT2"])
+        id3.delall("TPE1")
+        id3.save()
+        id3 = ID3(self.newsilence)
+        self.failIf("TPE1" in id3)
+        self.failUnless("TALB" in id3)
+
+    def test_lazy(self):
+        ID3(self.newsilence).save()
+        id3 = ID3(self.newsilence, frames=["TIT2", "TALB"], lazy=True)
+        self.failUnless("TALB" in id3._ID3__pending)
+        self.failIf("TPE1" in id3._ID3__pending)
+        self.assertEquals(sorted(id3.keys()), ["TALB", "TIT2"])
+
+    def tearDown(self):
+        os.unlink(self.newsilence)
+
+class AppendedTags(TestCase):
+    silence = join('tests', 'data', 'silence-44-s.mp3')
+    newsilence = join('tests', 'data', 'silence-appended.mp3')
+
+    def setUp(self):
+        shutil.copy(self.silence, self.newsilence)
+        ID3(self.newsilence).save()
+        self.size = os.path.getsize(self.newsilence)
+
+    def read(self):
+        f = open(self.newsilence, 'rb')
+        try: return f.read()
+        finally: f.close()
+
+    def add_big_frame(self, id3):
+        from mutagen.id3 import TXXX
+        id3.add(TXXX(encoding=0, desc="big", text="x" * 5000))
+
+    def test_fits_in_place(self):
+        from mutagen.id3 import TIT3
+        id3 = ID3(self.newsilence)
+        id3.add(TIT3(encoding=0, text="A subtitle!"))
+        id3.save(append=True)
+        self.assertEquals(os.path.getsize(self.newsilence), self.size)
+        self.failIf(b'3DI' in self.read())
+
+    def test_append_keeps_audio(self):
+        before = self.read()
+        id3 = ID3(self.newsilence)
+        self.add_big_frame(id3)
+        id3.save(append=True)
+        after = self.read()
+        # the first tag keeps its size, the audio data doesn't move
+        self.assertEquals(after[id3.size:len(before) - 128],
+                          before[id3.size:-128])
+        self.assertEquals(after[-128:-125], b'TAG')
+        self.assertEquals(after[-138:-135], b'3DI')
+
+    def test_load_appended(self):
+        id3 = ID3(self.newsilence)
+        self.add_big_frame(id3)
+        id3.save(append=True)
+        for lazy in [False, True]:
+            new = ID3(self.newsilence, lazy=lazy)
+            self.assertEquals(new.size, id3.size)
+            self.assertEquals(new["TXXX:big"], "x" * 5000)
+            self.assertEquals(new["TALB"], "Quod Libet Test Data")
+            self.failIf("SEEK" in new)
+
+    def write_front_and_appended(self, front_flags=0, appended=None,
+                                 appended_flags=0):
+        from mutagen.id3 import syncsafe_encode
+        def frame(name, data):
+            return name + syncsafe_encode(len(data)) + b'\x00\x00' + data
+        def tag(frames, flags):
+            return (b'ID3\x04\x00' + bytearray([flags]) +
+                    syncsafe_encode(len(frames)) + frames)
+        audio = self.read()[ID3(self.newsilence).size:-128]
+        f = open(self.newsilence, 'wb')
+        try:
+            f.write(tag(frame(b'TIT2', b'\x03old') + frame(
+                b'SEEK', struct.pack('>I', len(audio))), front_flags))
+            f.write(audio)
+            frames = bytearray().join(
+                [frame(name, data) for (name, data) in
+                 appended or [(b'TIT2', b'\x03newtitle')]])
+            f.write(tag(frames, 0x10 | appended_flags))
+            f.write(b'3DI\x04\x00' + bytearray([0x10 | appended_flags]) +
+                    syncsafe_encode(len(frames)))
+        finally: f.close()
+
+    def test_lazy_save_keeps_appended_frames(self):
+        self.write_front_and_appended()
+        for kwargs in [{}, {'lazy': True}, {'frames': ['TALB']},
+                       {'frames': ['TALB'], 'lazy': True}]:
+            shutil.copy(self.newsilence, self.newsilence + '.tmp')
+            try:
+                ID3(self.newsilence + '.tmp', **kwargs).save()
+                self.assertEquals(self.read_tmp().count(b'TIT2'), 1)
+                id3 = ID3(self.newsilence + '.tmp')
+                self.assertEquals(id3["TIT2"], "newtitle")
+            finally: os.unlink(self.newsilence + '.tmp')
+
+    def test_appended_unsynch(self):
+        # the same frame data reads differently with unsynchronisation
+        badsync = [(b'TPE1', b'\x00\xff\x00ab\x00')]
+        for front, appended, value in [(0x80, 0, [u"\xff", u"ab"]),
+                                       (0, 0x80, [u"\xffab"])]:
+            self.write_front_and_appended(front, badsync, appended)
+            for kwargs in [{}, {'lazy': True}, {'frames': ['TALB']}]:
+                shutil.copy(self.newsilence, self.newsilence + '.tmp')
+                try:
+                    id3 = ID3(self.newsilence + '.tmp', **kwargs)
+                    if 'frames' not in kwargs:
+                        self.assertEquals(id3["TPE1"], value)
+                    id3.save()
+                    id3 = ID3(self.newsilence + '.tmp')
+                    self.assertEquals(id3["TPE1"], value)
+                    self.assertEquals(id3["TIT2"], "old")
+                finally: os.unlink(self.newsilence + '.tmp')
+
+    def read_tmp(self):
+        f = open(self.newsilence + '.tmp', 'rb')
+        try: return f.read()
+        finally: f.close()
+
+    def test_append_again_replaces(self):
+        id3 = ID3(self.newsilence)
+        self.add_big_frame(id3)
+        id3.save(append=True)
+        size = os.path.getsize(self.newsilence)
+        id3["TIT2"].text = ["Changed"]
+        id3.save(append=True)
+        self.assertEquals(os.path.getsize(self.newsilence), size)
+        self.assertEquals(ID3(self.newsilence)["TIT2"], "Changed")
+
+    def test_no_tag_at_start(self):
+        from mutagen.id3 import TIT2
+        ID3(self.newsilence).delete()
+        size = os.path.getsize(self.newsilence)
+        id3 = ID3()
+        id3.add(TIT2(encoding=3, text="appended"))
+        id3.save(self.newsilence, append=True)
+        self.assertEquals(self.read()[:size], open(self.silence, 'rb').read(
+            )[ID3(self.silence).size:-128])
+        id3 = ID3(self.newsilence)
+        self.assertEquals(id3.size, 0)
+        self.assertEquals(id3.version, (2, 4, 0))
+        self.assertEquals(id3["TIT2"], "appended")
+
+    def test_save_at_start_removes_appended(self):
+        id3 = ID3(self.newsilence)
+        self.add_big_frame(id3)
+        id3.save(append=True)
+        ID3(self.newsilence).save()
+        self.failIf(b'3DI' in self.read())
+        self.assertEquals(ID3(self.newsilence)["TXXX:big"], "x" * 5000)
+
+    def test_delete(self):
+        from mutagen.id3 import delete
+        id3 = ID3(self.newsilence)
+        self.add_big_frame(id3)
+        id3.save(append=True)
+        delete(self.newsilence)
+        self.assertEquals(os.path.getsize(self.newsilence),
+                          self.size - id3.size - 128)
+
+    def tearDown(self):
+        os.unlink(self.newsilence)
+
 class WriteForEyeD3(TestCase):
     silence = join('tests', 'data', 'silence-44-s.mp3')
     newsilence = join('tests', 'data', 'silence-written.mp3')
@@ -1763,6 +2195,9 @@ add(BadTYER)
 add(BadPOPM)
 add(TimeStampTextFrame)
 add(Issue69_BadV1Year)
+add(LazyLoading)
+add(SelectedFrames)
+add(AppendedTags)
 
 try: import eyeD3
 except ImportError: pass
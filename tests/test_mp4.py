@@ -119,6 +119,27 @@ class TMP4Tags(TestCase):
         fileobj = BytesIO(data)
         return MP4Tags(Atoms(fileobj), fileobj)
 
+    def test_state_ilst_first(self):
+        # a free atom at the end of meta is not before the ilst atom
+        data = Atom.render("data", b"\x00\x00\x00\x01" + b"\x00" * 4 + b"a")
+        ilst = Atom.render("ilst", Atom.render(b"\xa9nam", data))
+        meta = Atom.render("meta", b"\x00" * 4 + ilst + Atom.render(
+            "free", b"\x00" * 8))
+        fd, filename = mkstemp(suffix='.m4a')
+        os.close(fd)
+        try:
+            fileobj = open(filename, "wb")
+            fileobj.write(Atom.render("moov", Atom.render("udta", meta)))
+            fileobj.close()
+            os.utime(filename, (1, 1))
+            fileobj = open(filename, "rb")
+            try: tags = MP4Tags(Atoms(fileobj), fileobj)
+            finally: fileobj.close()
+            self.failUnlessEqual(tags[b"\xa9nam"], ["a"])
+            self.failIf(tags._MP4Tags__state is None)
+        finally:
+            os.unlink(filename)
+
     def test_genre(self):
         data = Atom.render("data", b"\x00" * 8 + b"\x00\x01")
         genre = Atom.render("gnre", data)
@@ -502,6 +523,94 @@ class TMP4HasTags(TMP4):
         self.failUnlessRaises(
             IOError, MP4, os.path.join("tests", "data", "empty.ogg"))
 
+    def test_selected_keys(self):
+        keys = [b"\xa9ART", b"----:com.apple.iTunes:iTunNORM"]
+        audio = MP4(self.filename, keys=keys)
+        self.failUnlessEqual(sorted(audio.keys()),
+                             sorted([k for k in keys if k in self.audio]))
+        self.failUnlessEqual(audio[keys[0]], self.audio[keys[0]])
+        audio = MP4(self.filename, keys=[b"----:com.apple.iTunes:other"])
+        self.failIf(audio.keys())
+
+    def test_selected_keys_save(self):
+        audio = MP4(self.filename, keys=[b"\xa9nam"])
+        audio[b"\xa9nam"] = ["title"]
+        audio[b"\xa9ART"] = ["artist"]
+        audio.save()
+        audio = MP4(self.filename)
+        self.failUnlessEqual(audio[b"\xa9nam"], ["title"])
+        self.failUnlessEqual(audio[b"\xa9ART"], ["artist"])
+        for key in self.audio.keys():
+            if key != b"\xa9ART":
+                self.failUnlessEqual(audio[key], self.audio[key])
+        self.faad()
+
+    def skipped_key(self):
+        return sorted(k for k in self.audio.keys() if k != b"\xa9nam")[0]
+
+    def test_selected_keys_save_to_other(self):
+        key = self.skipped_key()
+        fd, other = mkstemp(suffix='.m4a')
+        os.close(fd)
+        try:
+            shutil.copy(self.original, other)
+            audio = MP4(other)
+            del(audio[key])
+            audio.save()
+            MP4(self.filename, keys=[b"\xa9nam"]).save(other)
+            self.failUnlessEqual(MP4(other)[key], self.audio[key])
+        finally:
+            os.unlink(other)
+
+    def test_selected_keys_del_skipped(self):
+        key = self.skipped_key()
+        audio = MP4(self.filename, keys=[b"\xa9nam"])
+        del(audio.tags[key])
+        self.failUnlessRaises(KeyError, audio.tags.__delitem__, key)
+        audio.save()
+        audio = MP4(self.filename)
+        self.failUnlessEqual(sorted(audio.keys()),
+                             sorted(k for k in self.audio.keys() if k != key))
+
+    def write_gnre(self):
+        # MP4Tags only writes b'\xa9gen'; write an ID3v1 genre (17,
+        # Reggae) as a text atom and rename it.
+        audio = MP4(self.filename)
+        audio.pop(b"\xa9gen", None)
+        audio[b"gnrx"] = [u"\x00\x11"]
+        audio.save()
+        f = open(self.filename, "rb+")
+        try:
+            data = f.read()
+            f.seek(data.index(b"gnrx"))
+            f.write(b"gnre")
+        finally: f.close()
+
+    def test_selected_keys_gnre(self):
+        from mutagen.easymp4 import EasyMP4
+        self.write_gnre()
+        self.failUnlessEqual(MP4(self.filename)[b"\xa9gen"], ["Reggae"])
+        self.failUnlessEqual(
+            EasyMP4(self.filename, keys=["genre"])["genre"], ["Reggae"])
+        for key in [b"gnre", b"\xa9gen", b"\xa9nam"]:
+            self.write_gnre()
+            audio = MP4(self.filename, keys=[key])
+            if key != b"\xa9nam":
+                self.failUnlessEqual(audio[b"\xa9gen"], ["Reggae"])
+            audio.save()
+            self.failUnlessEqual(MP4(self.filename)[b"\xa9gen"], ["Reggae"])
+
+    def test_selected_keys_pickle(self):
+        import pickle
+        key = self.skipped_key()
+        audio = pickle.loads(pickle.dumps(MP4(self.filename, keys=[])))
+        audio.save()
+        self.failUnlessEqual(MP4(self.filename)[key], self.audio[key])
+
+    def test_selected_keys_delete(self):
+        MP4(self.filename, keys=[b"\xa9nam"]).delete()
+        self.failIf(MP4(self.filename).tags)
+
 add(TMP4HasTags)
 
 class TMP4CovrWithName(TMP4):
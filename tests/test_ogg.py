@@ -104,6 +104,18 @@ class TOggPage(TestCase):
         pages = [OggPage(fileobj) for i in range(3)]
         self.failUnlessEqual([page.sequence for page in pages], [20, 21, 22])
 
+    def test_renumber_writes_headers(self):
+        from mutagen._util import Overlay
+        source = BytesIO(bytearray().join([p.write() for p in self.pages]))
+        overlay = Overlay(source)
+        OggPage.renumber(overlay, 1, 10)
+        self.failUnlessEqual(overlay.written, 3 * 8)
+        for seq, page in enumerate(self.pages): page.sequence = 10 + seq
+        fileobj = BytesIO()
+        overlay.write_to(fileobj)
+        self.failUnlessEqual(fileobj.getvalue(),
+                             bytearray().join([p.write() for p in self.pages]))
+
     def test_renumber_extradata(self):
         fileobj = BytesIO()
         for page in self.pages:
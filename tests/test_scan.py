@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+
+from tests import TestCase, add
+from mutagen import File
+from mutagen.mp3 import MP3, HeaderNotFoundError
+from mutagen.flac import FLAC
+from mutagen.scan import scan, ScanTimeout
+
+class TScan(TestCase):
+    uses_mmap = False
+
+    paths = [os.path.join("tests", "data", name) for name in [
+        "silence-44-s.mp3", "silence-44-s.flac", "empty.ogg",
+        "has-tags.m4a", "emptyfile.mp3", "nonexistent", "silence-1.wma"]]
+
+    def check(self, results):
+        results = dict(results)
+        self.failUnlessEqual(sorted(results), sorted(self.paths))
+        self.failUnless(isinstance(results[self.paths[0]], MP3))
+        self.failUnlessEqual(results[self.paths[0]]["TIT2"], ["Silence"])
+        self.failUnless(isinstance(results[self.paths[1]], FLAC))
+        self.failUnless(
+            isinstance(results[self.paths[4]], HeaderNotFoundError))
+        self.failUnless(isinstance(results[self.paths[5]], IOError))
+
+    def test_inline(self):
+        results = list(scan(self.paths))
+        self.failUnlessEqual([p for (p, r) in results], self.paths)
+        self.check(results)
+
+    def test_thread(self):
+        results = list(scan(self.paths, executor="thread", workers=3))
+        self.failUnlessEqual([p for (p, r) in results], self.paths)
+        self.check(results)
+
+    def test_thread_chunks_unordered(self):
+        self.check(scan(self.paths, executor="thread", chunksize=3,
+                        ordered=False))
+
+    def test_process(self):
+        results = list(scan(self.paths, executor="process", workers=2,
+                            chunksize=2))
+        self.failUnlessEqual([p for (p, r) in results], self.paths)
+        self.check(results)
+
+    def test_loader(self):
+        results = list(scan(self.paths[::4], loader=MP3))
+        self.failUnless(isinstance(results[0][1], MP3))
+        self.failUnless(isinstance(results[1][1], HeaderNotFoundError))
+
+    def test_bad_executor(self):
+        self.failUnlessRaises(
+            ValueError, list, scan(self.paths, executor="foo"))
+        self.failUnlessRaises(ValueError, list,
+                              scan(self.paths, executor="thread", chunksize=0))
+
+    def test_bounded(self):
+        taken = []
+        def paths():
+            for i in range(1000):
+                taken.append(i)
+                yield str(i)
+        results = scan(paths(), len, "thread", workers=2, chunksize=5,
+                       max_pending=3)
+        self.failUnlessEqual(next(results), ("0", 1))
+        self.failUnless(len(taken) <= 3 * 5 + 1)
+        results.close()
+        self.failUnless(len(taken) < 1000)
+
+    def test_timeout(self):
+        release = threading.Event()
+        def loader(path):
+            if path == "slow": release.wait(10)
+            return path
+        try:
+            results = list(scan(["fast", "slow", "fast2"], loader, "thread",
+                                workers=2, timeout=0.2))
+        finally: release.set()
+        self.failUnlessEqual(results[0], ("fast", "fast"))
+        self.failUnlessEqual(results[1][0], "slow")
+        self.failUnless(isinstance(results[1][1], ScanTimeout))
+        self.failUnlessEqual(results[2], ("fast2", "fast2"))
+
+    def test_timeout_not_counted_while_queued(self):
+        def loader(path):
+            time.sleep(0.15)
+            return path
+        paths = ["a", "b", "c", "d"]
+        results = list(scan(paths, loader, "thread", workers=1, timeout=0.3))
+        self.failUnlessEqual(results, [(p, p) for p in paths])
+
+    def test_unordered_streams(self):
+        release = threading.Event()
+        def loader(path):
+            if path == "slow": release.wait(10)
+            return path
+        try:
+            results = scan(["slow", "fast"], loader, "thread", workers=2,
+                           ordered=False)
+            self.failUnlessEqual(next(results), ("fast", "fast"))
+        finally: release.set()
+        self.failUnlessEqual(list(results), [("slow", "slow")])
+
+add(TScan)